@@ -0,0 +1,20 @@
+"""
+Bench module - Reproducible performance measurement
+
+This module contains:
+- A fixed set of diverse benchmark positions
+- The bench run: fixed-depth or fixed-node searches with a node signature
+  and nodes per second
+- Micro-benchmarks of the hot board, evaluation, hashing and table
+  operations with baseline comparison
+- A sampling profiler writing collapsed stacks and per-module summaries
+"""
+
+from .positions import BENCH_FENS
+from .search_bench import run_bench, format_bench, DEFAULT_BENCH_NODES
+from .micro import MICRO_BENCHMARKS, run_micro_benchmarks, compare_results
+from .profiler import StackSampler
+
+__all__ = ['BENCH_FENS', 'run_bench', 'format_bench', 'DEFAULT_BENCH_NODES',
+           'MICRO_BENCHMARKS', 'run_micro_benchmarks', 'compare_results',
+           'StackSampler']
@@ -0,0 +1,343 @@
+"""
+Micro-Benchmarks
+
+This module implements:
+- Timed micro-benchmarks of the engine's hot operations (make/undo, legal
+  move generation, check detection, evaluation, each evaluation term and
+  batch evaluation, Zobrist hashing, transposition table get/put, FEN
+  parse/serialize and board copies) over the bench positions
+- Warm-up runs and repeated timings, summarized as nanoseconds per operation
+- JSON results and comparison against a stored baseline with per-benchmark
+  regression thresholds
+"""
+
+import json
+import math
+import os
+import platform
+import statistics
+import time
+from typing import Callable, Dict, Any, List, Optional
+from ..board.board import ChessBoard
+from ..board.move_generator import MoveGenerator
+from ..eval.evaluation import EvaluationEngine
+from ..search.zobrist import ZobristHash
+from ..search.transposition import LRUTranspositionTable, TranspositionEntry, NodeType
+from .positions import BENCH_FENS
+
+# Baseline shipped with the package (see compare_results)
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Allowed slowdown of the median time per operation before a benchmark
+# counts as a regression (0.25 = 25% slower)
+DEFAULT_THRESHOLD = 0.25
+
+# Minimum duration of one timed sample (seconds)
+MIN_SAMPLE_TIME = 0.05
+
+# Positions per call of the batch evaluation benchmark
+BATCH_SIZE = 4096
+
+# Evaluation terms timed one by one (EvaluationEngine._evaluate_<term>)
+EVALUATION_TERMS = [
+    'material', 'position', 'king_safety', 'pawn_structure',
+    'mobility', 'center_control', 'development', 'tempo'
+]
+
+def _legal_moves(board: ChessBoard) -> list:
+    """Legal moves of the side to move"""
+    return MoveGenerator(board).generate_legal_moves(board.current_player)
+
+def _make_undo(boards: List[ChessBoard]) -> Callable[[], int]:
+    """Make and take back every legal move"""
+    moves = [(board, _legal_moves(board)) for board in boards]
+    
+    def run():
+        count = 0
+        for board, board_moves in moves:
+            for move in board_moves:
+                board.make_move(move)
+                board.undo_move()
+            count += len(board_moves)
+        return count
+    return run
+
+def _legal_move_generation(boards: List[ChessBoard]) -> Callable[[], int]:
+    """Generate the legal moves of the side to move"""
+    generators = [(MoveGenerator(board), board.current_player) for board in boards]
+    
+    def run():
+        for generator, color in generators:
+            generator.generate_legal_moves(color)
+        return len(generators)
+    return run
+
+def _is_check(boards: List[ChessBoard]) -> Callable[[], int]:
+    """Test the side to move for check"""
+    def run():
+        for board in boards:
+            board.is_check(board.current_player)
+        return len(boards)
+    return run
+
+def _evaluate(boards: List[ChessBoard]) -> Callable[[], int]:
+    """Full static evaluation"""
+    evaluator = EvaluationEngine()
+    
+    def run():
+        for board in boards:
+            evaluator.evaluate(board, board.current_player)
+        return len(boards)
+    return run
+
+def _evaluate_batch(boards: List[ChessBoard]) -> Callable[[], int]:
+    """Batch evaluation of FEN strings (the positions repeated to BATCH_SIZE)"""
+    evaluator = EvaluationEngine()
+    fens = [board._get_fen() for board in boards]
+    fens = (fens * (BATCH_SIZE // len(fens) + 1))[:BATCH_SIZE]
+    
+    def run():
+        evaluator.evaluate_batch(fens)
+        return len(fens)
+    return run
+
+def _evaluation_term(term: str) -> Callable[[List[ChessBoard]], Callable[[], int]]:
+    """Factory timing one evaluation term"""
+    def factory(boards):
+        evaluate_term = getattr(EvaluationEngine(), f"_evaluate_{term}")
+        
+        def run():
+            for board in boards:
+                evaluate_term(board, board.current_player)
+            return len(boards)
+        return run
+    return factory
+
+def _hash_position(boards: List[ChessBoard]) -> Callable[[], int]:
+    """Zobrist hash computed from scratch"""
+    zobrist = ZobristHash()
+    
+    def run():
+        for board in boards:
+            zobrist.hash_position(board)
+        return len(boards)
+    return run
+
+def _child_keys(boards: List[ChessBoard]) -> List[int]:
+    """Position keys of the bench positions and all their children"""
+    keys = []
+    for board in boards:
+        keys.append(board.zobrist_key)
+        for move in _legal_moves(board):
+            board.make_move(move)
+            keys.append(board.zobrist_key)
+            board.undo_move()
+    return keys
+
+def _table_put(boards: List[ChessBoard]) -> Callable[[], int]:
+    """Store entries in a table half the size of the key set (evictions included)"""
+    keys = _child_keys(boards)
+    table = LRUTranspositionTable(max_size=len(keys) // 2)
+    
+    def run():
+        for depth, key in enumerate(keys):
+            table.put(key, TranspositionEntry(depth & 15, 0, NodeType.EXACT))
+        return len(keys)
+    return run
+
+def _table_get(boards: List[ChessBoard]) -> Callable[[], int]:
+    """Probe a table holding half of the keys"""
+    keys = _child_keys(boards)
+    table = LRUTranspositionTable(max_size=len(keys))
+    for key in keys[::2]:
+        table.put(key, TranspositionEntry(1, 0, NodeType.EXACT))
+    
+    def run():
+        for key in keys:
+            table.get(key)
+        return len(keys)
+    return run
+
+def _fen_parse(boards: List[ChessBoard]) -> Callable[[], int]:
+    """Build boards from FEN"""
+    fens = [board._get_fen() for board in boards]
+    
+    def run():
+        for fen in fens:
+            ChessBoard(fen)
+        return len(fens)
+    return run
+
+def _fen_serialize(boards: List[ChessBoard]) -> Callable[[], int]:
+    """Write boards as FEN"""
+    def run():
+        for board in boards:
+            board._get_fen()
+        return len(boards)
+    return run
+
+def _copy(boards: List[ChessBoard]) -> Callable[[], int]:
+    """Copy boards"""
+    def run():
+        for board in boards:
+            board.copy()
+        return len(boards)
+    return run
+
+# Benchmark name -> factory building the timed function from the positions.
+# The timed function returns the number of operations it performed.
+MICRO_BENCHMARKS: Dict[str, Callable[[List[ChessBoard]], Callable[[], int]]] = {
+    'board.make_undo': _make_undo,
+    'board.copy': _copy,
+    'board.is_check': _is_check,
+    'movegen.legal_moves': _legal_move_generation,
+    'eval.evaluate': _evaluate,
+    'eval.evaluate_batch': _evaluate_batch,
+    **{f'eval.{term}': _evaluation_term(term) for term in EVALUATION_TERMS},
+    'zobrist.hash_position': _hash_position,
+    'tt.put': _table_put,
+    'tt.get': _table_get,
+    'fen.parse': _fen_parse,
+    'fen.serialize': _fen_serialize,
+}
+
+def time_function(run: Callable[[], int], repeats: int = 5, warmup: int = 1,
+                  min_sample_time: float = MIN_SAMPLE_TIME) -> Dict[str, Any]:
+    """
+    Time a benchmark function
+    
+    Every sample repeats run until it has taken at least min_sample_time,
+    so short benchmarks are not dominated by timer resolution and noise.
+    
+    Args:
+        run: Function returning the number of operations it performed
+        repeats: Timed samples
+        warmup: Untimed runs before the timed ones
+        min_sample_time: Minimum duration of one sample (seconds)
+    
+    Returns:
+        Dictionary with the operations per sample and the minimum and
+        median time per operation in nanoseconds
+    """
+    for _ in range(warmup):
+        run()
+    
+    # Calibrate the number of runs per sample from one timed run
+    start_time = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start_time
+    loops = max(1, math.ceil(min_sample_time / elapsed)) if elapsed > 0 else 1
+    
+    samples = []
+    operations = 0
+    for _ in range(max(1, repeats)):
+        operations = 0
+        start_time = time.perf_counter()
+        for _ in range(loops):
+            operations += run()
+        elapsed = time.perf_counter() - start_time
+        samples.append(elapsed * 1e9 / max(1, operations))
+    
+    return {
+        'operations': operations,
+        'min_ns': round(min(samples), 1),
+        'median_ns': round(statistics.median(samples), 1),
+        'samples_ns': [round(sample, 1) for sample in samples]
+    }
+
+def run_micro_benchmarks(names: Optional[List[str]] = None, fens: Optional[List[str]] = None,
+                         repeats: int = 5, warmup: int = 1,
+                         min_sample_time: float = MIN_SAMPLE_TIME) -> Dict[str, Any]:
+    """
+    Run micro-benchmarks over a fixed position set
+    
+    Args:
+        names: Benchmarks to run (all of MICRO_BENCHMARKS if None)
+        fens: Positions (defaults to BENCH_FENS)
+        repeats: Timed runs per benchmark
+        warmup: Untimed runs per benchmark
+        min_sample_time: Minimum duration of one timed sample (seconds)
+    
+    Returns:
+        JSON-serializable results: environment, settings and one entry
+        per benchmark (see time_function)
+    """
+    if names is None:
+        names = list(MICRO_BENCHMARKS)
+    if fens is None:
+        fens = BENCH_FENS
+    
+    unknown = [name for name in names if name not in MICRO_BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}")
+    
+    results = {}
+    for name in names:
+        # Fresh boards per benchmark, so no benchmark sees another's history
+        boards = [ChessBoard(fen) for fen in fens]
+        results[name] = time_function(MICRO_BENCHMARKS[name](boards), repeats, warmup,
+                                      min_sample_time)
+    
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'positions': len(fens),
+        'repeats': repeats,
+        'warmup': warmup,
+        'min_sample_time': min_sample_time,
+        'benchmarks': results
+    }
+
+def save_results(results: Dict[str, Any], path: str):
+    """Write micro-benchmark results as JSON"""
+    with open(path, 'w') as results_file:
+        json.dump(results, results_file, indent=2)
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Read micro-benchmark results written by save_results"""
+    with open(path, 'r') as results_file:
+        return json.load(results_file)
+
+def compare_results(results: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD,
+                    thresholds: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """
+    Compare results against a baseline
+    
+    Benchmarks are compared by median time per operation; benchmarks
+    missing from either side are skipped.
+    
+    Args:
+        results: Results of run_micro_benchmarks
+        baseline: Earlier results (e.g. load_results(BASELINE_PATH))
+        threshold: Allowed relative slowdown
+        thresholds: Per-benchmark overrides of threshold
+    
+    Returns:
+        One dictionary per compared benchmark with the baseline and current
+        medians, the relative change and whether it is a regression
+    """
+    thresholds = thresholds or {}
+    comparison = []
+    for name, current in results['benchmarks'].items():
+        reference = baseline.get('benchmarks', {}).get(name)
+        if reference is None:
+            continue
+        change = current['median_ns'] / reference['median_ns'] - 1.0 if reference['median_ns'] else 0.0
+        comparison.append({
+            'name': name,
+            'baseline_ns': reference['median_ns'],
+            'current_ns': current['median_ns'],
+            'change': round(change, 4),
+            'regression': change > thresholds.get(name, threshold)
+        })
+    return comparison
+
+def format_comparison(comparison: List[Dict[str, Any]]) -> List[str]:
+    """Table lines of a comparison (see compare_results)"""
+    lines = [f"{'benchmark':<24} {'baseline ns':>12} {'current ns':>12} {'change':>8}"]
+    for row in comparison:
+        flag = "  REGRESSION" if row['regression'] else ""
+        lines.append(f"{row['name']:<24} {row['baseline_ns']:>12.1f} {row['current_ns']:>12.1f} "
+                     f"{row['change']:>+8.1%}{flag}")
+    return lines
@@ -0,0 +1,196 @@
+"""
+Sampling Profiler
+
+This module implements:
+- A stack sampler: a background thread records the Python stacks of the
+  other threads at a fixed interval, keeping the stacks that run search code
+- Collapsed-stack output ("frame;frame;frame count" per line), readable by
+  flamegraph.pl, speedscope and other flame graph tools
+- A summary of sampled time (self and inclusive) per module and of the
+  functions with the most self time
+
+Sampling only reads frames of the other threads, so the profiled code
+runs unmodified; its cost is the sampler thread taking the interpreter
+lock once per interval.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+
+# Module prefix of the stacks kept with search_only
+SEARCH_MODULE_PREFIX = "chess_engine.search."
+
+class StackSampler:
+    """Samples the stacks of running threads and aggregates them"""
+    
+    def __init__(self, interval: float = 0.005, search_only: bool = True):
+        """
+        Initialize the sampler
+        
+        Args:
+            interval: Time between two samples (seconds)
+            search_only: Keep only stacks that pass through the search
+                         package, so idle threads (e.g. a UCI loop waiting
+                         for input) and setup code are left out
+        """
+        self.interval = interval
+        self.search_only = search_only
+        # Collapsed stack (tuple of frame labels, root first) -> samples
+        self.samples: Counter = Counter()
+        self.ticks = 0
+        self.elapsed = 0.0
+        self._labels: Dict[Any, str] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_time = 0.0
+    
+    def start(self):
+        """Start sampling in a background thread"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop sampling (the collected samples are kept)"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self.elapsed += time.perf_counter() - self._start_time
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    def _run(self):
+        """Sampling loop"""
+        sampler_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            self.ticks += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id:
+                    continue
+                stack = self._stack(frame)
+                if stack is not None:
+                    self.samples[stack] += 1
+    
+    def _label(self, frame) -> str:
+        """Frame label "module:function" (cached per code object)"""
+        code = frame.f_code
+        label = self._labels.get(code)
+        if label is None:
+            module = frame.f_globals.get('__name__', '?')
+            label = f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+            self._labels[code] = label
+        return label
+    
+    def _stack(self, frame) -> Optional[Tuple[str, ...]]:
+        """Labels of a thread's stack, root first (None if filtered out)"""
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame))
+            frame = frame.f_back
+        if self.search_only and not any(label.startswith(SEARCH_MODULE_PREFIX) for label in labels):
+            return None
+        labels.reverse()
+        return tuple(labels)
+    
+    def sample_time(self) -> float:
+        """Wall time represented by one sample (seconds)"""
+        return self.elapsed / self.ticks if self.ticks else self.interval
+    
+    def collapsed_lines(self) -> List[str]:
+        """Samples in collapsed-stack format, most frequent first"""
+        return [f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common()]
+    
+    def write_collapsed(self, path: str):
+        """Write the samples in collapsed-stack format"""
+        with open(path, 'w') as collapsed_file:
+            for line in self.collapsed_lines():
+                collapsed_file.write(line + "\n")
+    
+    def save(self, path: str) -> str:
+        """
+        Write the collapsed stacks to path and the summary next to it
+        
+        Returns:
+            Path of the summary file
+        """
+        self.write_collapsed(path)
+        summary_path = path + ".summary.txt"
+        with open(summary_path, 'w') as summary_file:
+            summary_file.write("\n".join(self.format_summary()) + "\n")
+        return summary_path
+    
+    def module_summary(self) -> List[Dict[str, Any]]:
+        """
+        Sampled time per module
+        
+        Returns:
+            One dictionary per module with its self samples (module of the
+            innermost frame) and inclusive samples (module anywhere on the
+            stack), sorted by self time
+        """
+        self_samples = Counter()
+        inclusive_samples = Counter()
+        for stack, count in self.samples.items():
+            modules = [label.split(':', 1)[0] for label in stack]
+            self_samples[modules[-1]] += count
+            for module in set(modules):
+                inclusive_samples[module] += count
+        return self._rows(self_samples, inclusive_samples)
+    
+    def function_summary(self) -> List[Dict[str, Any]]:
+        """Sampled time per function "module:function" (as module_summary)"""
+        self_samples = Counter()
+        inclusive_samples = Counter()
+        for stack, count in self.samples.items():
+            self_samples[stack[-1]] += count
+            for label in set(stack):
+                inclusive_samples[label] += count
+        return self._rows(self_samples, inclusive_samples)
+    
+    def _rows(self, self_samples: Counter, inclusive_samples: Counter) -> List[Dict[str, Any]]:
+        """Summary rows with fractions of all samples and estimated seconds"""
+        total = sum(self.samples.values())
+        sample_time = self.sample_time()
+        rows = []
+        for name, inclusive in inclusive_samples.items():
+            own = self_samples.get(name, 0)
+            rows.append({
+                'name': name,
+                'self_samples': own,
+                'inclusive_samples': inclusive,
+                'self_fraction': own / total if total else 0.0,
+                'inclusive_fraction': inclusive / total if total else 0.0,
+                'self_time': own * sample_time,
+                'inclusive_time': inclusive * sample_time
+            })
+        rows.sort(key=lambda row: (row['self_samples'], row['inclusive_samples']), reverse=True)
+        return rows
+    
+    def format_summary(self, top: int = 20) -> List[str]:
+        """Summary lines: per-module table followed by the top functions by self time"""
+        total = sum(self.samples.values())
+        lines = [f"Samples: {total} over {self.elapsed:.2f} s "
+                 f"(about {self.sample_time() * 1000:.1f} ms each)", ""]
+        header = f"{'self %':>7} {'self s':>8} {'total %':>8}  "
+        lines.append(header + "module")
+        for row in self.module_summary():
+            lines.append(f"{row['self_fraction']:>7.1%} {row['self_time']:>8.2f} "
+                         f"{row['inclusive_fraction']:>8.1%}  {row['name']}")
+        lines.extend(["", header + "function"])
+        for row in self.function_summary()[:top]:
+            lines.append(f"{row['self_fraction']:>7.1%} {row['self_time']:>8.2f} "
+                         f"{row['inclusive_fraction']:>8.1%}  {row['name']}")
+        return lines
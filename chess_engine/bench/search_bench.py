@@ -0,0 +1,132 @@
+"""
+Search Benchmark
+
+This module implements:
+- The bench run: every bench position searched to a fixed depth or node
+  count with cleared tables, so node counts depend on the code only
+- A signature over the per-position node counts and best moves that
+  changes whenever the search behaves differently
+- Nodes per second over the whole run to track speed between builds
+"""
+
+import time
+import zlib
+from typing import Optional, List, Dict, Any, Callable
+from ..board.board import ChessBoard
+from ..search.minimax import MinimaxEngine
+from ..search.transposition import MAX_PLY
+from .positions import BENCH_FENS
+
+# Node limit per position when neither depth nor nodes is given. A fixed
+# depth is too uneven across the positions: quiescence search alone needs
+# tens of thousands of nodes in the tactical ones
+DEFAULT_BENCH_NODES = 1000
+
+# Search statistics summed over all positions and reported with the run
+BENCH_COUNTERS = [
+    'nodes_searched', 'quiescence_nodes', 'cutoffs', 'transposition_hits',
+    'check_extensions', 'recapture_extensions', 'passed_pawn_extensions',
+    'singular_extensions', 'reverse_futility_prunes', 'futility_prunes',
+    'razoring_prunes', 'iid_searches', 'iir_reductions'
+]
+
+def run_bench(depth: Optional[int] = None, nodes: Optional[int] = None,
+              fens: Optional[List[str]] = None, engine: Optional[MinimaxEngine] = None,
+              report: Optional[Callable[[int, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Search the bench positions and measure node counts and speed
+    
+    Each position starts from cleared transposition, killer and history
+    tables and is searched single-threaded without a time limit, so two
+    runs of the same code visit exactly the same nodes.
+    
+    Args:
+        depth: Search depth (unlimited if None)
+        nodes: Node limit per position (DEFAULT_BENCH_NODES if neither depth
+               nor nodes is given)
+        fens: Positions to search (defaults to BENCH_FENS)
+        engine: Engine to benchmark (a default MinimaxEngine if None); its
+                tables are cleared and its time limit is removed
+        report: Called with (index, position result) after every position
+    
+    Returns:
+        Dictionary with the per-position results, total nodes, elapsed
+        time, nodes per second, signature and summed search counters
+    """
+    if depth is None and nodes is None:
+        nodes = DEFAULT_BENCH_NODES
+    if depth is None:
+        depth = MAX_PLY - 1
+    if fens is None:
+        fens = BENCH_FENS
+    if engine is None:
+        engine = MinimaxEngine()
+    engine.time_limit = None
+    engine.set_threads(1)
+    
+    positions = []
+    counters = {name: 0 for name in BENCH_COUNTERS}
+    total_nodes = 0
+    total_time = 0.0
+    signature = 0
+    
+    for index, fen in enumerate(fens):
+        board = ChessBoard(fen)
+        engine.clear_tables()
+        start_time = time.perf_counter()
+        result = engine.search(board, depth=depth, nodes=nodes)
+        elapsed = time.perf_counter() - start_time
+        
+        position_nodes = engine.time_manager.nodes
+        stats = engine.get_search_stats()
+        for name in BENCH_COUNTERS:
+            counters[name] += stats[name]
+        
+        position = {
+            'fen': fen,
+            'nodes': position_nodes,
+            'time': elapsed,
+            'depth': result.depth,
+            'move': str(result.move) if result.move is not None else None,
+            'score': result.score
+        }
+        positions.append(position)
+        total_nodes += position_nodes
+        total_time += elapsed
+        signature = zlib.crc32(f"{position_nodes} {position['move']};".encode(), signature)
+        if report is not None:
+            report(index, position)
+    
+    return {
+        'positions': positions,
+        'depth': depth,
+        'node_limit': nodes,
+        'nodes': total_nodes,
+        'time': total_time,
+        'nps': int(total_nodes / total_time) if total_time > 0 else 0,
+        'signature': f"{signature:08x}",
+        'counters': counters
+    }
+
+def format_bench(result: Dict[str, Any]) -> List[str]:
+    """Summary lines of a bench run (see run_bench)"""
+    limits = []
+    if result['depth'] < MAX_PLY - 1:
+        limits.append(f"depth {result['depth']}")
+    if result['node_limit'] is not None:
+        limits.append(f"nodes {result['node_limit']}")
+    lines = [
+        "=" * 40,
+        f"Positions       : {len(result['positions'])} ({', '.join(limits)})",
+        f"Total time (ms) : {int(result['time'] * 1000)}",
+        f"Nodes searched  : {result['nodes']}",
+        f"Nodes/second    : {result['nps']}",
+        f"Signature       : {result['signature']}"
+    ]
+    lines.extend(f"{name:<24}: {value}" for name, value in result['counters'].items())
+    return lines
+
+def format_position(index: int, position: Dict[str, Any], count: int) -> str:
+    """Progress line of one bench position"""
+    return (f"Position {index + 1}/{count}: {position['fen']} -> {position['move']} "
+            f"nodes {position['nodes']} time {int(position['time'] * 1000)}")
@@ -6,12 +6,24 @@ This module provides a complete chess board representation with:
 - Piece movement validation
 - Game state tracking (castling, en passant, etc.)
 - Move history
+- Material key (piece counts per type and color) kept up to date by
+  make_move and undo_move
 """
 
-import copy
+from array import array
 from typing import List, Tuple, Optional, Dict, Any
 from enum import Enum
 
+_zobrist = None
+
+def _get_zobrist():
+    """Get the shared Zobrist keys (imported lazily, the search package imports this module)"""
+    global _zobrist
+    if _zobrist is None:
+        from ..search.zobrist import zobrist
+        _zobrist = zobrist
+    return _zobrist
+
 class PieceType(Enum):
     """Chess piece types"""
     PAWN = 1
@@ -26,6 +38,24 @@ class Color(Enum):
     WHITE = 1
     BLACK = -1
 
+# Material key layout: a 4-bit count per piece type (kings excluded) and
+# color, white pawns in the lowest bits and black pieces above the white
+# ones. Counts stay below 16 even after promotions.
+MATERIAL_BITS = 4
+
+def material_shift(piece_type: PieceType, color: Color) -> int:
+    """Bit offset of the count of a piece kind in the material key"""
+    return MATERIAL_BITS * (piece_type.value - 1 + (0 if color == Color.WHITE else 5))
+
+def material_key_count(material_key: int, piece_type: PieceType, color: Color) -> int:
+    """Number of pieces of a kind in a material key"""
+    return (material_key >> material_shift(piece_type, color)) & ((1 << MATERIAL_BITS) - 1)
+
+# (piece type, color) -> amount one piece adds to the material key
+MATERIAL_INCREMENTS = {(piece_type, color): 0 if piece_type == PieceType.KING
+                       else 1 << material_shift(piece_type, color)
+                       for piece_type in PieceType for color in Color}
+
 class Square:
     """Represents a square on the chess board"""
     def __init__(self, piece_type: Optional[PieceType] = None, color: Optional[Color] = None):
@@ -91,7 +121,17 @@ class ChessBoard:
         self.move_history = []
         self.position_history = []
         
+        # Zobrist key of the current position and of every position before it,
+        # one entry per ply (used for repetition detection)
+        self.zobrist_key = 0
+        self.hash_history = array('Q')
+        
+        # Piece counts of the position (see MATERIAL_BITS)
+        self.material_key = 0
+        
         self._load_from_fen(fen)
+        self.zobrist_key = _get_zobrist().hash_position(self)
+        self.material_key = self._compute_material_key()
     
     def _load_from_fen(self, fen: str):
         """Load board state from FEN string"""
@@ -137,6 +177,28 @@ class ChessBoard:
         self.halfmove_clock = int(parts[4])
         self.fullmove_number = int(parts[5])
     
+    def _compute_material_key(self) -> int:
+        """Material key of the pieces on the board"""
+        key = 0
+        for row in self.board:
+            for square in row:
+                if not square.empty:
+                    key += MATERIAL_INCREMENTS[(square.piece_type, square.color)]
+        return key
+    
+    def material_count(self, piece_type: PieceType, color: Color) -> int:
+        """
+        Number of pieces of a kind on the board, read from the material key
+        
+        Args:
+            piece_type: Piece type (kings are not counted)
+            color: Piece color
+        
+        Returns:
+            Number of such pieces
+        """
+        return material_key_count(self.material_key, piece_type, color)
+    
     def _char_to_piece(self, char: str) -> Tuple[PieceType, Color]:
         """Convert character to piece type and color"""
         piece_map = {
@@ -188,16 +250,34 @@ class ChessBoard:
             if piece.empty or piece.color != self.current_player:
                 return False
             
-            # Store current state for undo
+            # Store current state for undo. Squares are never modified in
+            # place, so the move works on fresh rows and the snapshot keeps
+            # the old ones
             board_state = {
-                'board': copy.deepcopy(self.board),
+                'board': self.board,
                 'castling_rights': self.castling_rights.copy(),
                 'en_passant_target': self.en_passant_target,
                 'halfmove_clock': self.halfmove_clock,
                 'fullmove_number': self.fullmove_number,
-                'current_player': self.current_player
+                'current_player': self.current_player,
+                'zobrist_key': self.zobrist_key,
+                'material_key': self.material_key
             }
             self.position_history.append(board_state)
+            self.hash_history.append(self.zobrist_key)
+            self.board = [row[:] for row in self.board]
+            
+            # Incrementally update the position hash: side, castling and en passant
+            # are XORed out here and back in once the move has been applied
+            keys = _get_zobrist()
+            key = self.zobrist_key ^ keys.side_to_move_key
+            for right, available in self.castling_rights.items():
+                if available:
+                    key ^= keys.castling_keys[right]
+            if self.en_passant_target:
+                key ^= keys.en_passant_keys[self.en_passant_target[0]]
+            
+            material_key = self.material_key
             
             # Handle special moves
             captured_piece = None
@@ -205,36 +285,49 @@ class ChessBoard:
             # En passant capture
             if move.is_en_passant:
                 # Remove the captured pawn
-                if self.current_player == Color.WHITE:
-                    captured_piece = self.board[to_rank + 1][to_file]
-                    self.board[to_rank + 1][to_file] = Square()
-                else:
-                    captured_piece = self.board[to_rank - 1][to_file]
-                    self.board[to_rank - 1][to_file] = Square()
+                captured_rank = to_rank + 1 if self.current_player == Color.WHITE else to_rank - 1
+                captured_piece = self.board[captured_rank][to_file]
+                self.board[captured_rank][to_file] = Square()
+                if not captured_piece.empty:
+                    key ^= keys.piece_keys[captured_piece.piece_type][captured_piece.color][captured_rank * 8 + to_file]
+                    material_key -= MATERIAL_INCREMENTS[(captured_piece.piece_type, captured_piece.color)]
             
             # Regular capture
             elif move.is_capture:
                 captured_piece = self.board[to_rank][to_file]
             
+            target = self.board[to_rank][to_file]
+            if not target.empty:
+                key ^= keys.piece_keys[target.piece_type][target.color][to_rank * 8 + to_file]
+                material_key -= MATERIAL_INCREMENTS[(target.piece_type, target.color)]
+            
             # Castling
             if move.is_castling:
                 # Move the rook
                 if to_file > from_file:  # Kingside
-                    rook = self.board[from_rank][7]
-                    self.board[from_rank][5] = rook
-                    self.board[from_rank][7] = Square()
+                    rook_from, rook_to = 7, 5
                 else:  # Queenside
-                    rook = self.board[from_rank][0]
-                    self.board[from_rank][3] = rook
-                    self.board[from_rank][0] = Square()
+                    rook_from, rook_to = 0, 3
+                rook = self.board[from_rank][rook_from]
+                self.board[from_rank][rook_to] = rook
+                self.board[from_rank][rook_from] = Square()
+                if not rook.empty:
+                    rook_keys = keys.piece_keys[rook.piece_type][rook.color]
+                    key ^= rook_keys[from_rank * 8 + rook_from] ^ rook_keys[from_rank * 8 + rook_to]
             
             # Make the move
             self.board[to_rank][to_file] = piece
             self.board[from_rank][from_file] = Square()
+            key ^= keys.piece_keys[piece.piece_type][piece.color][from_rank * 8 + from_file]
             
             # Handle promotion
             if move.promotion:
                 self.board[to_rank][to_file] = Square(move.promotion, piece.color)
+                key ^= keys.piece_keys[move.promotion][piece.color][to_rank * 8 + to_file]
+                material_key += (MATERIAL_INCREMENTS[(move.promotion, piece.color)]
+                                 - MATERIAL_INCREMENTS[(piece.piece_type, piece.color)])
+            else:
+                key ^= keys.piece_keys[piece.piece_type][piece.color][to_rank * 8 + to_file]
             
             # Update castling rights
             self._update_castling_rights(move)
@@ -242,6 +335,14 @@ class ChessBoard:
             # Update en passant target
             self._update_en_passant_target(move)
             
+            for right, available in self.castling_rights.items():
+                if available:
+                    key ^= keys.castling_keys[right]
+            if self.en_passant_target:
+                key ^= keys.en_passant_keys[self.en_passant_target[0]]
+            self.zobrist_key = key
+            self.material_key = material_key
+            
             # Update halfmove clock
             if piece.piece_type == PieceType.PAWN or captured_piece:
                 self.halfmove_clock = 0
@@ -286,6 +387,7 @@ class ChessBoard:
             
             # Restore previous state
             previous_state = self.position_history.pop()
+            self.hash_history.pop()
             
             self.board = previous_state['board']
             self.castling_rights = previous_state['castling_rights']
@@ -293,12 +395,43 @@ class ChessBoard:
             self.halfmove_clock = previous_state['halfmove_clock']
             self.fullmove_number = previous_state['fullmove_number']
             self.current_player = previous_state['current_player']
+            self.zobrist_key = previous_state['zobrist_key']
+            self.material_key = previous_state['material_key']
             
             return True
             
         except Exception:
             return False
     
+    def is_repetition(self, count: int = 2) -> bool:
+        """
+        Check if the current position has occurred at least ``count`` times
+        
+        Only positions since the last irreversible move (capture or pawn move)
+        can repeat, so the scan is bounded by the halfmove clock and steps back
+        two plies at a time to compare positions with the same side to move.
+        
+        Args:
+            count: Required number of occurrences, including the current one
+                   (2 for any repetition, 3 for threefold)
+            
+        Returns:
+            True if the position has been repeated ``count`` times
+        """
+        history = self.hash_history
+        end = len(history)
+        start = max(0, end - self.halfmove_clock)
+        key = self.zobrist_key
+        occurrences = 1
+        
+        for index in range(end - 2, start - 1, -2):
+            if history[index] == key:
+                occurrences += 1
+                if occurrences >= count:
+                    return True
+        
+        return False
+    
     def is_check(self, color: Color) -> bool:
         """
         Check if given color is in check
@@ -352,6 +485,9 @@ class ChessBoard:
         # Check if any legal moves exist by generating pseudo-legal moves
         # and checking if any are actually legal
         has_legal_move = False
+        # Moves are tried on a copy with the tested color to move
+        board_copy = self.copy()
+        board_copy.current_player = color
         
         for rank in range(8):
             for file in range(8):
@@ -360,20 +496,13 @@ class ChessBoard:
                     # Generate pseudo-legal moves for this piece
                     pseudo_moves = self._generate_pseudo_legal_moves_for_piece((file, rank), square)
                     
-                    # Test if any move is legal
+                    # Test if any move is legal (make_move rejects moves
+                    # leaving the king in check)
                     for move in pseudo_moves:
-                        board_copy = self.copy()
-                        # Temporarily set the current player to the color we're testing
-                        original_player = board_copy.current_player
-                        board_copy.current_player = color
-                        
                         if board_copy.make_move(move):
-                            if not board_copy.is_check(color):
-                                has_legal_move = True
-                                break
-                        
-                        # Restore original player (though we're using a copy)
-                        board_copy.current_player = original_player
+                            board_copy.undo_move()
+                            has_legal_move = True
+                            break
                     
                     if has_legal_move:
                         break
@@ -400,6 +529,9 @@ class ChessBoard:
         # Check if no legal moves exist by generating pseudo-legal moves
         # and checking if any are actually legal
         has_legal_move = False
+        # Moves are tried on a copy with the tested color to move
+        board_copy = self.copy()
+        board_copy.current_player = color
         
         for rank in range(8):
             for file in range(8):
@@ -408,20 +540,13 @@ class ChessBoard:
                     # Generate pseudo-legal moves for this piece
                     pseudo_moves = self._generate_pseudo_legal_moves_for_piece((file, rank), square)
                     
-                    # Test if any move is legal
+                    # Test if any move is legal (make_move rejects moves
+                    # leaving the king in check)
                     for move in pseudo_moves:
-                        board_copy = self.copy()
-                        # Temporarily set the current player to the color we're testing
-                        original_player = board_copy.current_player
-                        board_copy.current_player = color
-                        
                         if board_copy.make_move(move):
-                            if not board_copy.is_check(color):
-                                has_legal_move = True
-                                break
-                        
-                        # Restore original player (though we're using a copy)
-                        board_copy.current_player = original_player
+                            board_copy.undo_move()
+                            has_legal_move = True
+                            break
                     
                     if has_legal_move:
                         break
@@ -760,5 +885,17 @@ class ChessBoard:
         return moves
     
     def copy(self):
-        """Create a deep copy of the board"""
-        return copy.deepcopy(self)
\ No newline at end of file
+        """
+        Create an independent copy of the board
+        
+        Squares, moves and history snapshots are never modified in place,
+        so the copy shares them and only duplicates the containers.
+        """
+        board = ChessBoard.__new__(ChessBoard)
+        board.__dict__.update(self.__dict__)
+        board.board = [row[:] for row in self.board]
+        board.castling_rights = self.castling_rights.copy()
+        board.move_history = self.move_history[:]
+        board.position_history = self.position_history[:]
+        board.hash_history = array('Q', self.hash_history)
+        return board
\ No newline at end of file
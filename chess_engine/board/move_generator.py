@@ -37,18 +37,14 @@ class MoveGenerator:
                     piece_moves = self._generate_piece_moves((file, rank), square)
                     moves.extend(piece_moves)
         
-        # Filter out moves that would put own king in check
+        # Filter out moves that would put own king in check: make_move
+        # rejects them, accepted moves are taken back right away
+        board = self.board
         legal_moves = []
         for move in moves:
-            # Create a copy of the board to test the move
-            board_copy = self.board.copy()
-            
-            # Try to make the move on the copy
-            if board_copy.make_move(move):
-                # Check if this move puts own king in check
-                if not board_copy.is_check(color):
-                    legal_moves.append(move)
-                board_copy.undo_move()
+            if board.make_move(move):
+                legal_moves.append(move)
+                board.undo_move()
         
         return legal_moves
     
@@ -78,19 +74,23 @@ class MoveGenerator:
         file, rank = square
         direction = -1 if color == Color.WHITE else 1
         start_rank = 6 if color == Color.WHITE else 1
+        promotion_rank = 0 if color == Color.WHITE else 7
         
         # Forward moves
         new_rank = rank + direction
         if 0 <= new_rank < 8:
             # Single square forward
             if self.board.get_piece((file, new_rank)).empty:
-                moves.append(self._create_move(square, (file, new_rank), PieceType.PAWN, color))
+                if new_rank == promotion_rank:
+                    moves.extend(self._promotion_moves(square, (file, new_rank), color))
+                else:
+                    moves.append(self._create_move(square, (file, new_rank), PieceType.PAWN, color))
                 
                 # Double square forward from starting position
                 if rank == start_rank:
-                    new_rank = rank + 2 * direction
-                    if 0 <= new_rank < 8 and self.board.get_piece((file, new_rank)).empty:
-                        moves.append(self._create_move(square, (file, new_rank), PieceType.PAWN, color))
+                    double_rank = rank + 2 * direction
+                    if 0 <= double_rank < 8 and self.board.get_piece((file, double_rank)).empty:
+                        moves.append(self._create_move(square, (file, double_rank), PieceType.PAWN, color))
             
             # Diagonal captures
             for file_offset in [-1, 1]:
@@ -98,7 +98,11 @@ class MoveGenerator:
                 if 0 <= new_file < 8:
                     target_square = self.board.get_piece((new_file, new_rank))
                     if not target_square.empty and target_square.color != color:
-                        moves.append(self._create_move(square, (new_file, new_rank), PieceType.PAWN, color, is_capture=True))
+                        if new_rank == promotion_rank:
+                            moves.extend(self._promotion_moves(square, (new_file, new_rank), color,
+                                                               is_capture=True))
+                        else:
+                            moves.append(self._create_move(square, (new_file, new_rank), PieceType.PAWN, color, is_capture=True))
         
         # En passant
         if self.board.en_passant_target:
@@ -106,15 +110,15 @@ class MoveGenerator:
             if abs(file - ep_file) == 1 and rank == ep_rank - direction:
                 moves.append(self._create_move(square, (ep_file, ep_rank), PieceType.PAWN, color, is_en_passant=True))
         
-        # Promotion
-        promotion_rank = 0 if color == Color.WHITE else 7
-        if rank + direction == promotion_rank:
-            # Add promotion moves for each piece type
-            for piece_type in [PieceType.QUEEN, PieceType.ROOK, PieceType.BISHOP, PieceType.KNIGHT]:
-                moves.append(self._create_move(square, (file, promotion_rank), PieceType.PAWN, color, promotion=piece_type))
-        
         return moves
     
+    def _promotion_moves(self, from_square: Tuple[int, int], to_square: Tuple[int, int],
+                         color: Color, is_capture: bool = False) -> List[Move]:
+        """Promotion moves to every piece type (queen first)"""
+        return [self._create_move(from_square, to_square, PieceType.PAWN, color,
+                                  is_capture=is_capture, promotion=piece_type)
+                for piece_type in [PieceType.QUEEN, PieceType.ROOK, PieceType.BISHOP, PieceType.KNIGHT]]
+    
     def _generate_knight_moves(self, square: Tuple[int, int], color: Color) -> List[Move]:
         """Generate knight moves"""
         moves = []
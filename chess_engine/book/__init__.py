@@ -0,0 +1,13 @@
+"""
+Book module - Opening books
+
+This module contains:
+- The Polyglot position hash and move encoding
+- A memory-mapped Polyglot book reader with weighted move selection
+- A book builder counting PGN games in a process pool (book.builder,
+  imported separately since it parses games with the training dataset)
+"""
+
+from .polyglot import PolyglotBook, BookEntry, polyglot_hash, encode_move
+
+__all__ = ['PolyglotBook', 'BookEntry', 'polyglot_hash', 'encode_move']
@@ -0,0 +1,295 @@
+"""
+Opening Book Builder
+
+This module implements:
+- Counting of the moves played from every position of a PGN collection up
+  to a maximum ply, with the game results from the mover's point of view
+- Parallel counting in a process pool over batches of streamed games,
+  every batch written as a run file sorted by (key, move)
+- An external merge of the run files, in passes of bounded fan-in, that
+  sums the counts of equal positions and moves
+- Pruning of rarely played moves and writing of a Polyglot book sorted by
+  key, with weights 2 * wins + draws
+
+Games are streamed from the PGN files and only a bounded number of
+batches is in flight, so memory use depends on the batch size and not on
+the size of the collection.
+"""
+
+import heapq
+import os
+import struct
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import groupby
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple, Callable
+from ..board.board import ChessBoard, Color
+from ..train.dataset import ChessDataset, ChessGame
+from .polyglot import ENTRY_FORMAT, polyglot_hash, encode_move
+
+# Run file records: key (u64), move (u16), wins, draws, losses (u32 each)
+RUN_RECORD = struct.Struct(">QHIII")
+ENTRY = struct.Struct(ENTRY_FORMAT)
+
+DEFAULT_MAX_PLY = 20
+DEFAULT_MIN_GAMES = 3
+DEFAULT_BATCH_SIZE = 1000
+
+# Run files merged at once (bounds the open files of a merge pass)
+DEFAULT_MERGE_FAN_IN = 64
+
+# Records read from a run file at a time
+READ_RECORDS = 4096
+
+MAX_WEIGHT = 0xFFFF
+
+# Game result -> (wins, draws, losses) of white
+RESULTS = {'1-0': (1, 0, 0), '1/2-1/2': (0, 1, 0), '0-1': (0, 0, 1)}
+
+def game_moves(dataset: ChessDataset, game: ChessGame, max_ply: int) -> Iterator[Tuple[int, int, Color]]:
+    """
+    Book keys and moves of the opening of a game
+    
+    Args:
+        dataset: Dataset used to parse the SAN moves
+        game: Parsed game
+        max_ply: Number of half-moves counted from the start
+    
+    Returns:
+        Iterator over (Polyglot key, encoded move, color of the mover);
+        stops at the first move that does not parse in the position
+    """
+    board = ChessBoard()
+    for move_str in game.moves[:max_ply]:
+        move = dataset._parse_move(move_str, board)
+        if move is None:
+            return
+        key = polyglot_hash(board)
+        color = board.current_player
+        if not board.make_move(move):
+            return
+        yield key, encode_move(move), color
+
+def count_games(dataset: ChessDataset, game_texts: Iterable[str],
+                max_ply: int) -> Tuple[Dict[Tuple[int, int], List[int]], int, int]:
+    """
+    Count the opening moves of games
+    
+    Args:
+        dataset: Dataset used to parse the games
+        game_texts: Raw PGN text of every game
+        max_ply: Number of half-moves counted per game
+    
+    Returns:
+        Tuple of ((key, move) -> [wins, draws, losses] of the mover, games
+        counted, games skipped for missing moves or an unknown result)
+    """
+    counts: Dict[Tuple[int, int], List[int]] = {}
+    counted = skipped = 0
+    for game_text in game_texts:
+        game = dataset._parse_single_game(game_text)
+        if game is None or game.result not in RESULTS:
+            skipped += 1
+            continue
+        counted += 1
+        white_result = RESULTS[game.result]
+        black_result = white_result[::-1]
+        for key, raw_move, color in game_moves(dataset, game, max_ply):
+            result = white_result if color == Color.WHITE else black_result
+            entry = counts.get((key, raw_move))
+            if entry is None:
+                counts[(key, raw_move)] = list(result)
+            else:
+                entry[0] += result[0]
+                entry[1] += result[1]
+                entry[2] += result[2]
+    return counts, counted, skipped
+
+def write_run(counts: Dict[Tuple[int, int], List[int]], path: str):
+    """Write counts as a run file sorted by (key, move)"""
+    with open(path, 'wb') as run_file:
+        for (key, raw_move), (wins, draws, losses) in sorted(counts.items()):
+            run_file.write(RUN_RECORD.pack(key, raw_move, wins, draws, losses))
+
+def write_records(records: Iterable[Tuple[int, int, int, int, int]], path: str):
+    """Write sorted (key, move, wins, draws, losses) records as a run file"""
+    with open(path, 'wb') as run_file:
+        for record in records:
+            run_file.write(RUN_RECORD.pack(*record))
+
+def read_run(path: str) -> Iterator[Tuple[int, int, int, int, int]]:
+    """(key, move, wins, draws, losses) records of a run file, in file order"""
+    with open(path, 'rb') as run_file:
+        while True:
+            chunk = run_file.read(RUN_RECORD.size * READ_RECORDS)
+            if not chunk:
+                return
+            yield from RUN_RECORD.iter_unpack(chunk[:len(chunk) // RUN_RECORD.size * RUN_RECORD.size])
+
+def merge_records(paths: List[str]) -> Iterator[Tuple[int, int, int, int, int]]:
+    """
+    Merge sorted run files, summing the counts of equal (key, move) pairs
+    
+    Args:
+        paths: Run files sorted by (key, move)
+    
+    Returns:
+        Iterator over the merged records, sorted by (key, move)
+    """
+    current = None
+    for key, raw_move, wins, draws, losses in heapq.merge(*(read_run(path) for path in paths)):
+        if current is not None and current[0] == key and current[1] == raw_move:
+            current[2] += wins
+            current[3] += draws
+            current[4] += losses
+            continue
+        if current is not None:
+            yield tuple(current)
+        current = [key, raw_move, wins, draws, losses]
+    if current is not None:
+        yield tuple(current)
+
+def book_entries(records: Iterable[Tuple[int, int, int, int, int]],
+                 min_games: int) -> Iterator[Tuple[int, int, int]]:
+    """
+    Book entries of merged records
+    
+    Moves played in fewer than min_games games are dropped. The weight of
+    a move is 2 * wins + draws of the mover; weights of a position are
+    scaled down together when one of them does not fit in 16 bits.
+    
+    Args:
+        records: Merged records sorted by key
+        min_games: Minimum number of games a move was played in
+    
+    Returns:
+        Iterator over (key, move, weight), sorted by key and by weight
+        (highest first) within a key
+    """
+    for key, group in groupby(records, key=lambda record: record[0]):
+        moves = [(raw_move, 2 * wins + draws) for _, raw_move, wins, draws, losses in group
+                 if wins + draws + losses >= min_games]
+        if not moves:
+            continue
+        highest = max(weight for _, weight in moves)
+        if highest > MAX_WEIGHT:
+            moves = [(raw_move, weight * MAX_WEIGHT // highest) for raw_move, weight in moves]
+        moves.sort(key=lambda item: item[1], reverse=True)
+        for raw_move, weight in moves:
+            yield key, raw_move, weight
+
+def _count_batch(game_texts: List[str], max_ply: int, run_path: str) -> Tuple[str, int, int]:
+    """Count a batch of games into a run file (pool task)"""
+    dataset = ChessDataset(os.path.dirname(run_path))
+    counts, counted, skipped = count_games(dataset, game_texts, max_ply)
+    write_run(counts, run_path)
+    return run_path, counted, skipped
+
+def _batches(dataset: ChessDataset, pgn_paths: List[str], batch_size: int) -> Iterator[List[str]]:
+    """Raw game texts of the PGN files in batches"""
+    batch = []
+    for pgn_path in pgn_paths:
+        for game_text in dataset.iter_game_texts(pgn_path):
+            batch.append(game_text)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+def build_book(pgn_paths: List[str], output_path: str, max_ply: int = DEFAULT_MAX_PLY,
+               min_games: int = DEFAULT_MIN_GAMES, processes: Optional[int] = None,
+               batch_size: int = DEFAULT_BATCH_SIZE, merge_fan_in: int = DEFAULT_MERGE_FAN_IN,
+               report: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+    """
+    Build a Polyglot book from PGN files
+    
+    Run files are kept in a temporary directory next to the output, and
+    the book is written next to it and renamed over it, so a process
+    reading the old book never sees a partial file.
+    
+    Args:
+        pgn_paths: PGN files
+        output_path: Book file to write
+        max_ply: Number of half-moves counted per game
+        min_games: Minimum number of games a move was played in
+        processes: Pool size (None for the CPU count, 1 counts in the
+                   calling process)
+        batch_size: Games per counting task
+        merge_fan_in: Run files merged at once
+        report: Called with the number of games counted after every batch
+    
+    Returns:
+        Dictionary with the games counted and skipped, the run files
+        written and the positions and entries of the book
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    merge_fan_in = max(2, merge_fan_in)
+    directory = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(directory, exist_ok=True)
+    
+    stats = {'games': 0, 'skipped': 0, 'runs': 0, 'positions': 0, 'entries': 0}
+    with tempfile.TemporaryDirectory(dir=directory, prefix=".book-") as run_dir:
+        dataset = ChessDataset(run_dir)
+        batches = _batches(dataset, pgn_paths, batch_size)
+        runs = []
+        
+        def collect(run_path, counted, skipped):
+            runs.append(run_path)
+            stats['games'] += counted
+            stats['skipped'] += skipped
+            if report:
+                report(stats['games'])
+        
+        def run_path(index):
+            return os.path.join(run_dir, f"count-{index}.run")
+        
+        if processes <= 1:
+            for index, batch in enumerate(batches):
+                collect(*_count_batch(batch, max_ply, run_path(index)))
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                # A few batches per worker in flight, so reading stays ahead
+                # of counting without loading the whole collection
+                pending = set()
+                for index, batch in enumerate(batches):
+                    if len(pending) >= 2 * processes:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            collect(*future.result())
+                    pending.add(pool.submit(_count_batch, batch, max_ply, run_path(index)))
+                for future in pending:
+                    collect(*future.result())
+        stats['runs'] = len(runs)
+        
+        # Merge passes until the remaining runs can be merged at once
+        merge_index = 0
+        while len(runs) > merge_fan_in:
+            merged = []
+            for start in range(0, len(runs), merge_fan_in):
+                group = runs[start:start + merge_fan_in]
+                path = os.path.join(run_dir, f"merge-{merge_index}.run")
+                merge_index += 1
+                write_records(merge_records(group), path)
+                for old_path in group:
+                    os.remove(old_path)
+                merged.append(path)
+            runs = merged
+        
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            last_key = None
+            with os.fdopen(handle, 'wb') as book_file:
+                for key, raw_move, weight in book_entries(merge_records(runs), min_games):
+                    book_file.write(ENTRY.pack(key, raw_move, weight, 0))
+                    stats['entries'] += 1
+                    if key != last_key:
+                        stats['positions'] += 1
+                        last_key = key
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    return stats
@@ -0,0 +1,279 @@
+"""
+Polyglot Opening Books
+
+This module implements:
+- The Polyglot position hash (independent of the engine's internal Zobrist
+  keys, so books built by other tools can be read)
+- Encoding of moves in the Polyglot move format and decoding of book
+  moves into legal moves of a position
+- A reader that memory-maps a .bin book and binary-searches its entries
+  by key, with weighted random or best-weight move selection
+"""
+
+import mmap
+import os
+import random
+import struct
+from typing import List, Optional, Tuple, NamedTuple
+from ..board.board import ChessBoard, Move, Color, PieceType
+from ..board.move_generator import MoveGenerator
+from .polyglot_random import POLYGLOT_RANDOM_ARRAY
+
+# Book entries: key (u64), move (u16), weight (u16), learn (u32), big-endian
+ENTRY_FORMAT = ">QHHI"
+ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+
+# Offsets into POLYGLOT_RANDOM_ARRAY
+CASTLING_OFFSET = 768
+EN_PASSANT_OFFSET = 772
+TURN_OFFSET = 780
+
+# Castling right -> index after CASTLING_OFFSET
+CASTLING_INDEX = {'K': 0, 'Q': 1, 'k': 2, 'q': 3}
+
+# Promotion piece codes of the move encoding (0 = no promotion)
+PROMOTION_CODES = {PieceType.KNIGHT: 1, PieceType.BISHOP: 2, PieceType.ROOK: 3, PieceType.QUEEN: 4}
+PROMOTION_PIECES = {code: piece_type for piece_type, code in PROMOTION_CODES.items()}
+
+class BookEntry(NamedTuple):
+    """One entry of a Polyglot book"""
+    key: int
+    raw_move: int
+    weight: int
+    learn: int
+
+def _piece_offset(piece_type: PieceType, color: Color) -> int:
+    """First array index of a piece kind (black pawn 0, white pawn 1, black knight 2, ...)"""
+    return 64 * (2 * (piece_type.value - 1) + (1 if color == Color.WHITE else 0))
+
+# (piece type, color) -> offset, so hashing needs no arithmetic per piece
+PIECE_OFFSETS = {(piece_type, color): _piece_offset(piece_type, color)
+                 for piece_type in PieceType for color in Color}
+
+def polyglot_hash(board: ChessBoard) -> int:
+    """
+    Polyglot key of a position
+    
+    Squares are numbered from a1 (0) to h8 (63). The en passant file only
+    counts when a pawn of the side to move can capture en passant.
+    
+    Args:
+        board: Position to hash
+    
+    Returns:
+        64-bit Polyglot key
+    """
+    key = 0
+    for rank_index, row in enumerate(board.board):
+        square_base = (7 - rank_index) * 8
+        for file, square in enumerate(row):
+            if not square.empty:
+                key ^= POLYGLOT_RANDOM_ARRAY[PIECE_OFFSETS[(square.piece_type, square.color)]
+                                             + square_base + file]
+    
+    for right, available in board.castling_rights.items():
+        if available:
+            key ^= POLYGLOT_RANDOM_ARRAY[CASTLING_OFFSET + CASTLING_INDEX[right]]
+    
+    if board.en_passant_target is not None:
+        file, rank = board.en_passant_target
+        color = board.current_player
+        # The capturing pawn stands beside the double-pushed pawn
+        pawn_rank = rank + 1 if color == Color.WHITE else rank - 1
+        for pawn_file in (file - 1, file + 1):
+            if 0 <= pawn_file < 8:
+                square = board.board[pawn_rank][pawn_file]
+                if square.piece_type == PieceType.PAWN and square.color == color:
+                    key ^= POLYGLOT_RANDOM_ARRAY[EN_PASSANT_OFFSET + file]
+                    break
+    
+    if board.current_player == Color.WHITE:
+        key ^= POLYGLOT_RANDOM_ARRAY[TURN_OFFSET]
+    return key
+
+def decode_move(raw_move: int) -> Tuple[Tuple[int, int], Tuple[int, int], Optional[PieceType]]:
+    """
+    Squares and promotion of an encoded book move
+    
+    Args:
+        raw_move: Move field of a book entry
+    
+    Returns:
+        Tuple of (from_square, to_square, promotion) in board coordinates
+        (file, rank index with 0 for the eighth rank); castling is still
+        encoded as the king capturing its own rook
+    """
+    to_square = (raw_move & 7, 7 - ((raw_move >> 3) & 7))
+    from_square = ((raw_move >> 6) & 7, 7 - ((raw_move >> 9) & 7))
+    return from_square, to_square, PROMOTION_PIECES.get((raw_move >> 12) & 7)
+
+def encode_move(move: Move) -> int:
+    """
+    Polyglot encoding of a move
+    
+    Args:
+        move: Move in board coordinates
+    
+    Returns:
+        Move field of a book entry (castling as the king capturing its own
+        rook, as decode_move and book_move expect)
+    """
+    from_file, from_rank = move.from_square
+    to_file, to_rank = move.to_square
+    if move.is_castling:
+        to_file = 7 if to_file > from_file else 0
+    return ((PROMOTION_CODES.get(move.promotion, 0) << 12) | ((7 - from_rank) << 9) | (from_file << 6)
+            | ((7 - to_rank) << 3) | to_file)
+
+def book_move(board: ChessBoard, raw_move: int) -> Optional[Move]:
+    """
+    Legal move of the position matching an encoded book move
+    
+    Only the moves of the piece on the from square are generated, so
+    looking up a book move is much cheaper than full move generation.
+    
+    Args:
+        board: Position the move is played in
+        raw_move: Move field of a book entry
+    
+    Returns:
+        The legal move, or None if the book move is not legal here (e.g.
+        from a hash collision)
+    """
+    from_square, to_square, promotion = decode_move(raw_move)
+    piece = board.get_piece(from_square)
+    if piece is None or piece.empty or piece.color != board.current_player:
+        return None
+    
+    # Castling is encoded as e1h1/e1a1 (e8h8/e8a8)
+    if piece.piece_type == PieceType.KING and from_square[0] == 4 and to_square[1] == from_square[1]:
+        if to_square[0] == 7:
+            to_square = (6, to_square[1])
+        elif to_square[0] == 0:
+            to_square = (2, to_square[1])
+    
+    for move in MoveGenerator(board)._generate_piece_moves(from_square, piece):
+        if move.to_square == to_square and move.promotion == promotion:
+            if board.make_move(move):
+                board.undo_move()
+                return move
+            return None
+    return None
+
+class PolyglotBook:
+    """Read-only Polyglot opening book"""
+    
+    def __init__(self, path: str):
+        """
+        Open a book
+        
+        Args:
+            path: Polyglot .bin file (entries sorted by key)
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        file_size = os.fstat(self._file.fileno()).st_size
+        # mmap cannot map an empty file
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if file_size else b""
+        self._size = file_size // ENTRY_SIZE
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Release the mapping and the file"""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b""
+        self._size = 0
+        self._file.close()
+    
+    def _entry(self, index: int) -> BookEntry:
+        """Entry at an index"""
+        return BookEntry(*struct.unpack_from(ENTRY_FORMAT, self._data, index * ENTRY_SIZE))
+    
+    def _key(self, index: int) -> int:
+        """Key of the entry at an index"""
+        return struct.unpack_from(">Q", self._data, index * ENTRY_SIZE)[0]
+    
+    def entries(self, key: int) -> List[BookEntry]:
+        """
+        Entries stored for a Polyglot key
+        
+        Args:
+            key: Polyglot key (see polyglot_hash)
+        
+        Returns:
+            Entries with the key, in file order
+        """
+        # Lower bound binary search: first entry with a key >= key
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        
+        found = []
+        while low < self._size:
+            entry = self._entry(low)
+            if entry.key != key:
+                break
+            found.append(entry)
+            low += 1
+        return found
+    
+    def get_moves(self, board: ChessBoard) -> List[Tuple[Move, int]]:
+        """
+        Legal book moves of a position
+        
+        Args:
+            board: Position to look up
+        
+        Returns:
+            List of (move, weight), highest weight first; entries with
+            zero weight or illegal moves are left out
+        """
+        moves = []
+        for entry in self.entries(polyglot_hash(board)):
+            if entry.weight <= 0:
+                continue
+            move = book_move(board, entry.raw_move)
+            if move is not None:
+                moves.append((move, entry.weight))
+        moves.sort(key=lambda item: item[1], reverse=True)
+        return moves
+    
+    def choose_move(self, board: ChessBoard, rng: Optional[random.Random] = None,
+                    best: bool = False) -> Optional[Move]:
+        """
+        Pick a book move
+        
+        Args:
+            board: Position to look up
+            rng: Random generator for the weighted choice (module random if None)
+            best: Always pick the move with the highest weight
+        
+        Returns:
+            A book move chosen with probability proportional to its weight,
+            or None if the position is not in the book
+        """
+        moves = self.get_moves(board)
+        if not moves:
+            return None
+        if best:
+            return moves[0][0]
+        rng = rng or random
+        pick = rng.randrange(sum(weight for _, weight in moves))
+        for move, weight in moves:
+            pick -= weight
+            if pick < 0:
+                return move
+        return moves[-1][0]
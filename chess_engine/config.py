@@ -6,8 +6,8 @@ This module provides centralized configuration management.
 
 import json
 import os
-from typing import Dict, Any
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, List
+from dataclasses import dataclass, asdict, field
 
 @dataclass
 class SearchConfig:
@@ -21,6 +21,30 @@ class SearchConfig:
     use_quiescence_search: bool = True
     use_move_ordering: bool = True
     aspiration_window_size: int = 50
+    parallel_mode: str = "lazy_smp"  # "lazy_smp" or "root_split" when threads > 1
+    persistent_table_path: Optional[str] = None  # On-disk table of deep results
+    persistent_table_min_depth: int = 4
+    opening_book_path: Optional[str] = None  # Polyglot book consulted before searching
+    endgame_tables_path: Optional[str] = None  # Directory of endgame tables probed by the search
+    # Search extensions; every line may be extended by at most extension_budget plies
+    use_check_extensions: bool = True
+    use_recapture_extensions: bool = True
+    use_passed_pawn_extensions: bool = True
+    use_singular_extensions: bool = True
+    extension_budget: int = 2
+    singular_extension_depth: int = 4  # Minimum remaining depth for the singular test
+    singular_margin: int = 20  # Centipawns per ply of depth below the table score
+    # Frontier pruning; margins[i] (centipawns) applies at remaining depth i + 1
+    use_reverse_futility_pruning: bool = True
+    use_futility_pruning: bool = True
+    use_razoring: bool = True
+    reverse_futility_margins: List[int] = field(default_factory=lambda: [120, 240, 360])
+    futility_margins: List[int] = field(default_factory=lambda: [150, 300, 500])
+    razoring_margins: List[int] = field(default_factory=lambda: [300, 550])
+    # Nodes without a table move: "reduction" searches them one ply shallower
+    # (IIR), "deepening" first runs a search two plies shallower for a move (IID)
+    internal_iterative_mode: str = "reduction"  # "reduction", "deepening" or "off"
+    internal_iterative_depth: int = 3  # Minimum remaining depth
 
 @dataclass
 class EvaluationConfig:
@@ -92,7 +116,7 @@ class EngineConfig:
                 training=training_config,
                 **main_data
             )
-            
+        
         except (json.JSONDecodeError, KeyError, TypeError) as e:
             print(f"Error loading config from {config_path}: {e}")
             print("Using default configuration")
@@ -116,7 +140,7 @@ class EngineConfig:
             
             with open(config_path, 'w') as f:
                 json.dump(config_dict, f, indent=2)
-                
+        
         except Exception as e:
             print(f"Error saving config to {config_path}: {e}")
     
@@ -133,5 +157,19 @@ class EngineConfig:
                 else:
                     setattr(self, key, value)
 
-# Global configuration instance
-config = EngineConfig.from_file("config/engine_config.json")
\ No newline at end of file
+CONFIG_PATH = "config/engine_config.json"
+_config = None
+
+def get_config() -> EngineConfig:
+    """Get the global configuration (loaded from CONFIG_PATH on first use)"""
+    global _config
+    if _config is None:
+        _config = EngineConfig.from_file(CONFIG_PATH)
+    return _config
+
+def __getattr__(name: str):
+    # Global configuration instance, loaded lazily so importing the config
+    # classes does not create config files in the working directory
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
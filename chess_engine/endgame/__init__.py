@@ -0,0 +1,13 @@
+"""
+Endgame module - Endgame tables
+
+This module contains:
+- A memory-mapped probe returning exact scores of positions with a king
+  and pieces against a lone king
+- Retrograde generation of the distance-to-mate tables (endgame.generator,
+  imported separately so the search does not load numpy)
+"""
+
+from .tables import EndgameTables, EndgameTable
+
+__all__ = ['EndgameTables', 'EndgameTable']
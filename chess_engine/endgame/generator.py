@@ -0,0 +1,365 @@
+"""
+Endgame Table Generation
+
+This module implements:
+- Retrograde analysis of a king and pieces against a lone king, giving
+  the distance to mate in plies of every position with either side to
+  move (positions the lone king does not lose are draws)
+- Generation of the smaller tables a table depends on (after the lone
+  king captures a piece or a pawn promotes)
+- Writing of the table files read by tables.EndgameTables
+
+Every position is an element of an array with one 64-square axis per
+piece: the stronger (white) king, the lone king, then the stronger side's
+pieces in PIECE_ORDER. Moving a piece is a numpy take along its axis, so
+one ply of the analysis costs a fixed number of array operations however
+many positions the table has.
+"""
+
+import os
+import tempfile
+from typing import Dict, List, Optional, Tuple, Callable
+import numpy as np
+from .tables import (
+    HEADER, TABLE_MAGIC, TABLE_VERSION, PIECE_ORDER,
+    parse_material, material_name, king_squares, table_path
+)
+
+# Tables generated by default: the endgames won against a lone king with
+# up to four pieces, and the drawn ones they convert into
+DEFAULT_MATERIALS = ["KQK", "KRK", "KBK", "KNK", "KPK", "KBNK"]
+
+# Values of positions during the analysis (0 and above: plies to mate)
+ILLEGAL = -2
+UNKNOWN = -1
+
+# Largest distance a table byte can hold (0 is kept for draws)
+MAX_DISTANCE = 254
+
+KING_STEPS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+KNIGHT_STEPS = [(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)]
+DIAGONALS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+LINES = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+SLIDER_DIRECTIONS = {'Q': DIAGONALS + LINES, 'R': LINES, 'B': DIAGONALS}
+PROMOTIONS = "QRBN"
+
+FILES = np.arange(64) % 8
+RANKS = np.arange(64) // 8
+SAME_SQUARE = np.eye(64, dtype=bool)
+
+def _step_map(file_step: int, rank_step: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Target of a step from every square (the square itself when off the board) and its validity"""
+    files, ranks = FILES + file_step, RANKS + rank_step
+    valid = (files >= 0) & (files < 8) & (ranks >= 0) & (ranks < 8)
+    return np.where(valid, ranks * 8 + files, np.arange(64)), valid
+
+def _attack_tables() -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """Empty-board attacks [from, to] of every piece and the squares strictly between two squares"""
+    attacks = {piece: np.zeros((64, 64), dtype=bool) for piece in "KQRBNP"}
+    between = np.zeros((64, 64, 64), dtype=bool)
+    for piece, steps in (('K', KING_STEPS), ('N', KNIGHT_STEPS), ('P', [(-1, -1), (1, -1)])):
+        for file_step, rank_step in steps:
+            targets, valid = _step_map(file_step, rank_step)
+            attacks[piece][np.arange(64)[valid], targets[valid]] = True
+    for piece, directions in SLIDER_DIRECTIONS.items():
+        for square in range(64):
+            for file_step, rank_step in directions:
+                passed = []
+                file, rank = square % 8 + file_step, square // 8 + rank_step
+                while 0 <= file < 8 and 0 <= rank < 8:
+                    target = rank * 8 + file
+                    attacks[piece][square, target] = True
+                    between[square, target, passed] = True
+                    passed.append(target)
+                    file, rank = file + file_step, rank + rank_step
+    return attacks, between
+
+# White pawns move and capture towards rank index 0
+ATTACKS, BETWEEN = _attack_tables()
+
+def _spread(table: np.ndarray, axes: List[int], dimensions: int) -> np.ndarray:
+    """
+    A table over squares of some pieces, broadcastable over all position axes
+    
+    Args:
+        table: Array with one 64-square dimension per entry of axes
+        axes: Position axis of each table dimension
+        dimensions: Number of position axes
+    """
+    order = sorted(range(len(axes)), key=axes.__getitem__)
+    shape = [1] * dimensions
+    for axis in axes:
+        shape[axis] = 64
+    return np.transpose(table, order).reshape(shape)
+
+def _occupied(targets: np.ndarray, axis: int, dimensions: int) -> np.ndarray:
+    """Whether another piece stands on the target square of the piece on axis"""
+    on_target = SAME_SQUARE[targets]
+    occupied = np.zeros((1,) * dimensions, dtype=bool)
+    for other in range(dimensions):
+        if other != axis:
+            occupied = occupied | _spread(on_target, [axis, other], dimensions)
+    return occupied
+
+class TableGenerator:
+    """Retrograde analysis of endgames against a lone king"""
+    
+    def __init__(self, report: Optional[Callable[[str, int], None]] = None):
+        """
+        Initialize the generator
+        
+        Args:
+            report: Called with the material and the ply after every pair
+                    of plies of an analysis
+        """
+        self.report = report
+        # Material -> (values with white to move, values with black to move)
+        self.results: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    
+    def generate(self, material: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Analyse an endgame (and the endgames it converts into)
+        
+        Args:
+            material: Material name such as "KRK"
+        
+        Returns:
+            Tuple of int16 arrays of shape (64,) * pieces for white and for
+            black to move: the plies until white mates, UNKNOWN for draws
+            and ILLEGAL for illegal positions
+        """
+        pieces = parse_material(material)
+        material = material_name(pieces)
+        if material not in self.results:
+            self.results[material] = self._analyse(material, pieces)
+        return self.results[material]
+    
+    def _converted(self, pieces: str, replaced: List[Optional[str]], side: int) -> np.ndarray:
+        """
+        Values of the table a capture or promotion converts into, with its
+        axes in the order of the current table's pieces
+        
+        Args:
+            pieces: Pieces of the current table
+            replaced: The pieces after the conversion (None for the
+                      captured piece)
+            side: 0 for the white to move values, 1 for black to move
+        
+        Returns:
+            The converted table's values; a captured piece's axis is kept
+            with length 1
+        """
+        present = [index for index, piece in enumerate(replaced) if piece is not None]
+        values = self.generate(material_name("".join(replaced[index] for index in present)))[side]
+        # Pieces are sorted in the converted table, equal pieces in list order
+        order = sorted(present, key=lambda index: (PIECE_ORDER.index(replaced[index]), index))
+        values = np.transpose(values, [0, 1] + [order.index(index) + 2 for index in present])
+        for index, piece in enumerate(replaced):
+            if piece is None:
+                values = np.expand_dims(values, index + 2)
+        return values
+    
+    def _analyse(self, material: str, pieces: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Retrograde analysis of one table whose conversions are known"""
+        dimensions = len(pieces) + 2
+        shape = (64,) * dimensions
+        
+        # Distinct squares, kings apart, no pawn on the first or last rank
+        legal = ~_spread(ATTACKS['K'] | SAME_SQUARE, [0, 1], dimensions)
+        for first in range(dimensions):
+            for second in range(max(first + 1, 2), dimensions):
+                legal = legal & ~_spread(SAME_SQUARE, [first, second], dimensions)
+        for axis, piece in enumerate(pieces, 2):
+            if piece == 'P':
+                legal = legal & _spread((RANKS > 0) & (RANKS < 7), [axis], dimensions)
+        legal = np.broadcast_to(legal, shape)
+        
+        # The lone king may not be in check with white to move
+        check = self._lone_king_in_check(pieces, dimensions)
+        white = np.where(legal & ~check, UNKNOWN, ILLEGAL).astype(np.int16)
+        black = np.where(legal, UNKNOWN, ILLEGAL).astype(np.int16)
+        
+        captures = []
+        promotions = {}
+        for index, piece in enumerate(pieces):
+            replaced = list(pieces)
+            replaced[index] = None
+            captures.append((index + 2, self._converted(pieces, replaced, 0)))
+            if piece == 'P':
+                promotions[index + 2] = []
+                for promoted in PROMOTIONS:
+                    replaced[index] = promoted
+                    promotions[index + 2].append(self._converted(pieces, replaced, 1))
+        
+        # Mates: the lone king is in check without a legal move
+        can_move, _, _ = self._lone_king_moves(white, captures, dimensions)
+        black[(black == UNKNOWN) & ~can_move & check] = 0
+        
+        ply = 0
+        while True:
+            # White wins in ply if a move reaches a position lost in ply - 1
+            ply += 1
+            reaches = self._white_reaches(black == ply - 1, pieces, promotions, ply - 1, dimensions)
+            won = (white == UNKNOWN) & reaches
+            white[won] = ply
+            
+            # Black loses once every legal move leads to a won position
+            ply += 1
+            _, all_won, longest = self._lone_king_moves(white, captures, dimensions)
+            lost = (black == UNKNOWN) & can_move & all_won
+            black[lost] = longest[lost] + 1
+            
+            if self.report is not None:
+                self.report(material, ply)
+            if not won.any() and not lost.any():
+                break
+        return white, black
+    
+    def _lone_king_in_check(self, pieces: str, dimensions: int) -> np.ndarray:
+        """Whether the white pieces attack the lone king"""
+        check = np.zeros((1,) * dimensions, dtype=bool)
+        for axis, piece in enumerate(pieces, 2):
+            attack = _spread(ATTACKS[piece], [axis, 1], dimensions)
+            for other in range(dimensions):
+                if other not in (axis, 1):
+                    attack = attack & ~_spread(BETWEEN, [axis, 1, other], dimensions)
+            check = check | attack
+        return np.broadcast_to(check, (64,) * dimensions)
+    
+    def _lone_king_moves(self, white: np.ndarray, captures: List[Tuple[int, np.ndarray]],
+                         dimensions: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Successors of every position with black to move
+        
+        Args:
+            white: Current values with white to move
+            captures: (axis, white to move values after capturing that
+                      piece) per white piece
+            dimensions: Number of position axes
+        
+        Returns:
+            Tuple of (black has a legal move, every legal move reaches a
+            position won for white, longest distance among the successors)
+        """
+        can_move = np.zeros(white.shape, dtype=bool)
+        all_won = np.ones(white.shape, dtype=bool)
+        longest = np.full(white.shape, UNKNOWN, dtype=np.int16)
+        for file_step, rank_step in KING_STEPS:
+            targets, valid = _step_map(file_step, rank_step)
+            successor = np.take(white, targets, axis=1)
+            for axis, converted in captures:
+                captured = _spread(SAME_SQUARE[targets], [1, axis], dimensions)
+                successor = np.where(captured, np.take(converted, targets, axis=1), successor)
+            successor = np.where(_spread(valid, [1], dimensions), successor, ILLEGAL)
+            legal_move = successor != ILLEGAL
+            can_move |= legal_move
+            all_won &= ~legal_move | (successor >= 0)
+            np.maximum(longest, successor, out=longest)
+        return can_move, all_won, longest
+    
+    def _white_reaches(self, target: np.ndarray, pieces: str, promotions: Dict[int, List[np.ndarray]],
+                       distance: int, dimensions: int) -> np.ndarray:
+        """
+        Positions with white to move that have a move into target
+        
+        Args:
+            target: Positions with black to move to reach
+            pieces: White pieces besides the king
+            promotions: Black to move values after promoting the pawn on
+                        each pawn axis (see _converted)
+            distance: Value of the target positions in the promoted tables
+            dimensions: Number of position axes
+        """
+        reaches = np.zeros(target.shape, dtype=bool)
+        for axis, piece in [(0, 'K')] + list(enumerate(pieces, 2)):
+            if piece in ('K', 'N'):
+                for file_step, rank_step in KING_STEPS if piece == 'K' else KNIGHT_STEPS:
+                    targets, valid = _step_map(file_step, rank_step)
+                    reaches |= np.take(target, targets, axis=axis) & _spread(valid, [axis], dimensions)
+            elif piece == 'P':
+                targets, _ = _step_map(0, -1)
+                reaches |= np.take(target, targets, axis=axis) & _spread(RANKS > 1, [axis], dimensions)
+                double_targets, _ = _step_map(0, -2)
+                reaches |= (np.take(target, double_targets, axis=axis) & _spread(RANKS == 6, [axis], dimensions)
+                            & ~_occupied(targets, axis, dimensions))
+                for promoted in promotions[axis]:
+                    reaches |= (np.take(promoted == distance, targets, axis=axis)
+                                & _spread(RANKS == 1, [axis], dimensions))
+            else:
+                for file_step, rank_step in SLIDER_DIRECTIONS[piece]:
+                    # Squares before the target must be empty
+                    path_free = np.ones((1,) * dimensions, dtype=bool)
+                    for steps in range(1, 8):
+                        targets, valid = _step_map(file_step * steps, rank_step * steps)
+                        if not valid.any():
+                            break
+                        reaches |= (np.take(target, targets, axis=axis) & _spread(valid, [axis], dimensions)
+                                    & path_free)
+                        path_free = path_free & ~_occupied(targets, axis, dimensions)
+        return reaches
+
+def write_table(path: str, material: str, white: np.ndarray, black: np.ndarray):
+    """
+    Write a table file
+    
+    The file is written next to path and renamed over it, so processes
+    that have the old file mapped keep reading a consistent table.
+    
+    Args:
+        path: Table file
+        material: Material name of the table
+        white: Values with white to move (see TableGenerator.generate)
+        black: Values with black to move
+    """
+    stored_kings = king_squares(parse_material(material))
+    blocks = []
+    for values in (white, black):
+        stored = values[stored_kings]
+        if stored.max() > MAX_DISTANCE:
+            raise ValueError(f"{material}: distance {stored.max()} does not fit in a table byte")
+        blocks.append(np.where(stored >= 0, stored + 1, 0).astype(np.uint8))
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(handle, 'wb') as table_file:
+            table_file.write(HEADER.pack(TABLE_MAGIC, TABLE_VERSION, blocks[0].size))
+            for block in blocks:
+                table_file.write(block.tobytes())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def generate_tables(directory: str, materials: Optional[List[str]] = None,
+                    report: Optional[Callable[[str, int], None]] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Generate table files
+    
+    Args:
+        directory: Directory to write <material>.egtb files to (created if
+                   missing)
+        materials: Material names (DEFAULT_MATERIALS if None)
+        report: Progress callback (see TableGenerator)
+    
+    Returns:
+        Per material: legal positions with white to move, the number of
+        them white wins and the longest mate in plies
+    """
+    if materials is None:
+        materials = DEFAULT_MATERIALS
+    os.makedirs(directory, exist_ok=True)
+    
+    generator = TableGenerator(report)
+    summary = {}
+    for material in materials:
+        material = material_name(parse_material(material))
+        white, black = generator.generate(material)
+        write_table(table_path(directory, material), material, white, black)
+        summary[material] = {
+            'positions': int(np.count_nonzero(white != ILLEGAL)),
+            'wins': int(np.count_nonzero(white >= 0)),
+            'longest': int(white.max()) if white.max() >= 0 else 0
+        }
+    return summary
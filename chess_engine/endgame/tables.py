@@ -0,0 +1,278 @@
+"""
+Endgame Tables
+
+This module implements:
+- The table file format: a header followed by one byte per position for
+  the stronger side to move and one byte per position for the lone king
+  to move (0 for draws, else the distance to mate in plies plus one)
+- Board symmetries reducing the stored positions: the stronger king is
+  kept in the a1-d1-d4 triangle for pawnless tables and on the a-d files
+  for tables with pawns
+- A probe reading the memory-mapped tables of a directory and returning
+  the exact score of a covered position
+
+Tables cover a king and pieces against a lone king. Squares are numbered
+rank index * 8 + file like the board (0 is a8); the stronger side is
+stored as white moving its pawns towards rank index 0, so positions with
+black as the stronger side are mirrored before the lookup.
+"""
+
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+from ..board.board import ChessBoard, Color, PieceType
+from ..eval.evaluation import MATE_SCORE
+from ..eval.material import material_key
+
+TABLE_MAGIC = b"CEEG"
+TABLE_VERSION = 1
+# magic, version, stored positions per side to move
+HEADER = struct.Struct("<4sIQ")
+TABLE_SUFFIX = ".egtb"
+
+# Order of the stronger side's pieces in material names and table axes
+PIECE_ORDER = "QRBNP"
+PIECE_LETTERS = {
+    PieceType.QUEEN: 'Q', PieceType.ROOK: 'R', PieceType.BISHOP: 'B',
+    PieceType.KNIGHT: 'N', PieceType.PAWN: 'P'
+}
+
+def _square(file: int, rank: int) -> int:
+    """Square number of a file and rank index"""
+    return rank * 8 + file
+
+def _transforms() -> List[List[int]]:
+    """The eight board symmetries as square -> square maps"""
+    maps = []
+    for transpose in (False, True):
+        for flip_file in (False, True):
+            for flip_rank in (False, True):
+                square_map = []
+                for square in range(64):
+                    file, rank = square % 8, square // 8
+                    if transpose:
+                        file, rank = 7 - rank, 7 - file
+                    if flip_file:
+                        file = 7 - file
+                    if flip_rank:
+                        rank = 7 - rank
+                    square_map.append(_square(file, rank))
+                maps.append(square_map)
+    return maps
+
+TRANSFORMS = _transforms()
+
+# Stronger king squares stored by pawnless tables (a1-d1-d4) and by tables
+# with pawns (files a-d)
+TRIANGLE_SQUARES = [square for square in range(64) if square % 8 <= 3 and 7 - square // 8 <= square % 8]
+HALF_SQUARES = [square for square in range(64) if square % 8 <= 3]
+
+# Transform bringing each king square into the triangle
+TRIANGLE_TRANSFORM = [next(index for index, square_map in enumerate(TRANSFORMS)
+                           if square_map[square] in TRIANGLE_SQUARES) for square in range(64)]
+MIRROR_FILES = [square ^ 7 for square in range(64)]
+MIRROR_RANKS = [square ^ 56 for square in range(64)]
+
+def parse_material(material: str) -> str:
+    """
+    Pieces of the stronger side in a material name
+    
+    Args:
+        material: Name such as "KBNK" (stronger side first, lone king last)
+    
+    Returns:
+        The pieces besides the king in PIECE_ORDER (e.g. "BN")
+    
+    Raises:
+        ValueError: If the name is not a king and pieces against a king
+    """
+    pieces = material[1:-1]
+    if (len(material) < 2 or material[0] != 'K' or material[-1] != 'K'
+            or any(piece not in PIECE_ORDER for piece in pieces)):
+        raise ValueError(f"Unsupported material {material!r}: expected K<pieces>K")
+    return "".join(sorted(pieces, key=PIECE_ORDER.index))
+
+def material_name(pieces: str) -> str:
+    """Material name of the stronger side's pieces (in any order)"""
+    return "K" + "".join(sorted(pieces, key=PIECE_ORDER.index)) + "K"
+
+def king_squares(pieces: str) -> List[int]:
+    """Stronger king squares stored by a table with these pieces"""
+    return HALF_SQUARES if 'P' in pieces else TRIANGLE_SQUARES
+
+def table_path(directory: str, material: str) -> str:
+    """File of a material's table in a directory"""
+    return os.path.join(directory, material + TABLE_SUFFIX)
+
+class EndgameTable:
+    """One memory-mapped table file"""
+    
+    def __init__(self, path: str, material: str):
+        """
+        Open a table
+        
+        Args:
+            path: Table file written by generator.write_table
+            material: Material name of the table
+        
+        Raises:
+            ValueError: If the file is not a table of this material
+        """
+        self.material = material
+        self.pieces = parse_material(material)
+        stored_kings = king_squares(self.pieces)
+        self.king_index = {square: index for index, square in enumerate(stored_kings)}
+        self.size = len(stored_kings) * 64 ** (len(self.pieces) + 1)
+        
+        self._file = open(path, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, size = HEADER.unpack_from(self._data, 0)
+            if (magic, version, size) != (TABLE_MAGIC, TABLE_VERSION, self.size):
+                self._data.close()
+                raise ValueError(f"{path} is not a version {TABLE_VERSION} table of {material}")
+        except BaseException:
+            self._file.close()
+            raise
+    
+    def close(self):
+        """Release the mapping and the file"""
+        self._data.close()
+        self._file.close()
+    
+    def lookup(self, strong_king: int, weak_king: int, pieces: List[int], strong_to_move: bool) -> int:
+        """
+        Stored byte of a position with the stronger side as white
+        
+        Args:
+            strong_king: Square of the stronger king
+            weak_king: Square of the lone king
+            pieces: Squares of the stronger side's pieces in PIECE_ORDER
+            strong_to_move: The stronger side is to move
+        
+        Returns:
+            0 for a draw, else the distance to mate in plies plus one
+        """
+        if 'P' in self.pieces:
+            square_map = MIRROR_FILES if strong_king % 8 > 3 else None
+        else:
+            square_map = TRANSFORMS[TRIANGLE_TRANSFORM[strong_king]]
+        if square_map is not None:
+            strong_king = square_map[strong_king]
+            weak_king = square_map[weak_king]
+            pieces = [square_map[square] for square in pieces]
+        
+        index = self.king_index[strong_king] * 64 + weak_king
+        for square in pieces:
+            index = index * 64 + square
+        if not strong_to_move:
+            index += self.size
+        return self._data[HEADER.size + index]
+
+class EndgameTables:
+    """
+    The endgame tables of a directory
+    
+    Every file named <material>.egtb is opened; tables can be generated
+    with generator.generate_tables (or `main.py endgame-tables`).
+    """
+    
+    def __init__(self, directory: str):
+        """
+        Open the tables of a directory
+        
+        Args:
+            directory: Directory holding table files (a missing directory
+                       gives no tables)
+        """
+        self.directory = directory
+        self.tables: Dict[str, EndgameTable] = {}
+        # Material keys of the covered positions, so positions with other
+        # material are rejected without looking at the board
+        self.material_keys = set()
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(TABLE_SUFFIX):
+                    material = name[:-len(TABLE_SUFFIX)]
+                    self.tables[material] = EndgameTable(os.path.join(directory, name), material)
+                    pieces = self.tables[material].pieces
+                    self.material_keys.update((material_key(pieces, ""), material_key("", pieces)))
+    
+    def __len__(self) -> int:
+        return len(self.tables)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Close every table"""
+        for table in self.tables.values():
+            table.close()
+        self.tables = {}
+        self.material_keys = set()
+    
+    def _position(self, board: ChessBoard) -> Optional[Tuple[str, int, int, List[int], bool]]:
+        """
+        Material and squares of a position with the stronger side as white
+        
+        Returns:
+            Tuple of (material, stronger king, lone king, piece squares in
+            PIECE_ORDER, stronger side to move), or None if the position has
+            castling rights
+        """
+        if any(board.castling_rights.values()):
+            return None
+        kings = {}
+        pieces = {Color.WHITE: [], Color.BLACK: []}
+        for rank, row in enumerate(board.board):
+            for file, square in enumerate(row):
+                if square.empty:
+                    continue
+                if square.piece_type == PieceType.KING:
+                    kings[square.color] = rank * 8 + file
+                else:
+                    pieces[square.color].append((PIECE_LETTERS[square.piece_type], rank * 8 + file))
+        if len(kings) != 2:
+            return None
+        
+        strong = Color.BLACK if pieces[Color.BLACK] else Color.WHITE
+        weak = Color.WHITE if strong == Color.BLACK else Color.BLACK
+        strong_pieces = sorted(pieces[strong], key=lambda piece: PIECE_ORDER.index(piece[0]))
+        squares = [square for _, square in strong_pieces]
+        strong_king, weak_king = kings[strong], kings[weak]
+        if strong == Color.BLACK:
+            strong_king, weak_king = MIRROR_RANKS[strong_king], MIRROR_RANKS[weak_king]
+            squares = [MIRROR_RANKS[square] for square in squares]
+        material = "K" + "".join(letter for letter, _ in strong_pieces) + "K"
+        return material, strong_king, weak_king, squares, board.current_player == strong
+    
+    def probe(self, board: ChessBoard) -> Optional[int]:
+        """
+        Exact score of a position covered by the tables
+        
+        Args:
+            board: Position to look up
+        
+        Returns:
+            Score from the side to move's perspective: MATE_SCORE - n for a
+            mate in n plies, -MATE_SCORE + n when mated in n plies, 0 for a
+            draw; None if no table covers the position
+        """
+        if board.material_key not in self.material_keys:
+            return None
+        position = self._position(board)
+        if position is None:
+            return None
+        material, strong_king, weak_king, squares, strong_to_move = position
+        table = self.tables.get(material)
+        if table is None:
+            return None
+        
+        value = table.lookup(strong_king, weak_king, squares, strong_to_move)
+        if value == 0:
+            return 0
+        return MATE_SCORE - (value - 1) if strong_to_move else -MATE_SCORE + (value - 1)
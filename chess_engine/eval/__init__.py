@@ -7,6 +7,6 @@ This module handles:
 - Material, positional, and tactical evaluation
 """
 
-from .evaluation import EvaluationEngine
+from .evaluation import EvaluationEngine, MATE_SCORE
 
-__all__ = ['EvaluationEngine']
\ No newline at end of file
+__all__ = ['EvaluationEngine', 'MATE_SCORE']
\ No newline at end of file
@@ -0,0 +1,454 @@
+"""
+Batch Evaluation
+
+This module implements:
+- Encoding of boards and FEN strings into an (N, 12, 64) piece tensor and
+  into one 64-bit occupancy word per position and piece plane
+- The terms of EvaluationEngine.evaluate computed for all positions at
+  once with NumPy array operations: material, piece-square tables, king
+  safety, pawn structure, mobility, center control, development and tempo
+- Detection of the positions whose evaluation takes another path (a side
+  in check, possible stalemates, endgame tables, specialized endgames and
+  scaled endings); those are evaluated one by one by the scalar path
+
+Scores are identical to EvaluationEngine.evaluate. Squares are numbered
+rank index * 8 + file like the board (0 is a8) and bit n of an occupancy
+word stands for square n; planes 0-5 hold white's pawns, knights,
+bishops, rooks, queens and king, planes 6-11 black's.
+"""
+
+from typing import List, Optional, Sequence, Tuple, Union
+import numpy as np
+from ..board.board import ChessBoard, Color, PieceType, material_shift
+from .material import OPPOSITE_BISHOPS_SCALE, scale_opposite_bishops
+
+PLANES = 12
+EMPTY_CODE = 12
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+
+# FEN placement character -> plane and number of squares it stands for
+# (digits are runs of empty squares, '/' ends a rank)
+FEN_CODES = np.full(256, 255, dtype=np.uint8)
+FEN_WIDTHS = np.ones(256, dtype=np.int64)
+for _index, _letter in enumerate("PNBRQKpnbrqk"):
+    FEN_CODES[ord(_letter)] = _index
+for _count in range(1, 9):
+    FEN_CODES[ord(str(_count))] = EMPTY_CODE
+    FEN_WIDTHS[ord(str(_count))] = _count
+FEN_WIDTHS[ord('/')] = 0
+
+def _squares_mask(squares) -> np.uint64:
+    """Occupancy word of some squares"""
+    return np.uint64(sum(1 << square for square in squares))
+
+FILES = [_squares_mask(range(file, 64, 8)) for file in range(8)]
+RANKS = [_squares_mask(range(rank * 8, rank * 8 + 8)) for rank in range(8)]
+LIGHT_SQUARES = _squares_mask(square for square in range(64) if (square % 8 + square // 8) % 2 == 0)
+
+# Squares a piece can land on when moved by file_step files, so moves do
+# not wrap around from one edge of the board to the other
+LANDING = {file_step: _squares_mask(square for square in range(64) if 0 <= square % 8 - file_step < 8)
+           for file_step in range(-2, 3)}
+
+KNIGHT_STEPS = [(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)]
+KING_STEPS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+DIAGONALS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+STRAIGHTS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+# d5, d4, e5, e4 (see EvaluationEngine._evaluate_center_control)
+CENTER_SQUARES = [27, 35, 28, 36]
+
+# Mobility weight per piece type (see EvaluationEngine._evaluate_mobility)
+MOBILITY_WEIGHTS = [(KNIGHT, KNIGHT_STEPS, False, 2), (BISHOP, DIAGONALS, True, 1.5),
+                    (ROOK, STRAIGHTS, True, 1.0), (QUEEN, KING_STEPS, True, 0.5)]
+
+BYTE_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.int64)
+_bitwise_count = getattr(np, 'bitwise_count', None)
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Number of set bits of every word"""
+    if _bitwise_count is not None:
+        return _bitwise_count(words).astype(np.int64)
+    return BYTE_POPCOUNT[np.ascontiguousarray(words).view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+def _shift(words: np.ndarray, file_step: int, rank_step: int) -> np.ndarray:
+    """Occupancy moved by file_step files and rank_step rank indices"""
+    delta = rank_step * 8 + file_step
+    moved = words << np.uint64(delta) if delta >= 0 else words >> np.uint64(-delta)
+    return moved & LANDING[file_step]
+
+def _ray(sliders: np.ndarray, empty: np.ndarray, file_step: int, rank_step: int) -> np.ndarray:
+    """Squares slid to in one direction, up to and including the first piece"""
+    ray = _shift(sliders, file_step, rank_step)
+    attacks = ray
+    for _ in range(6):
+        ray = _shift(ray & empty, file_step, rank_step)
+        attacks = attacks | ray
+    return attacks
+
+def _bit(words: np.ndarray, squares) -> np.ndarray:
+    """Bit of a square (per position when squares is an array) as 0/1"""
+    return ((words >> np.asarray(squares).astype(np.uint64)) & np.uint64(1)).astype(np.int64)
+
+def _board_codes(board: ChessBoard) -> bytes:
+    """Plane of every square of a board"""
+    codes = bytearray(64)
+    index = 0
+    for row in board.board:
+        for square in row:
+            piece_type = square.piece_type
+            if piece_type is None:
+                codes[index] = EMPTY_CODE
+            else:
+                codes[index] = piece_type.value - 1 + (0 if square.color is Color.WHITE else 6)
+            index += 1
+    return bytes(codes)
+
+def _expand_placement(placement: str) -> np.ndarray:
+    """Plane of every square a FEN piece placement describes"""
+    characters = np.frombuffer(placement.encode(), dtype=np.uint8)
+    return np.repeat(FEN_CODES[characters], FEN_WIDTHS[characters])
+
+def _placement_codes(fens: List[str], placements: List[str]) -> np.ndarray:
+    """
+    Plane of every square of FEN piece placements, expanded in one pass
+    
+    Placements are joined with spaces, which map to the invalid code, so
+    every placement expanding to exactly 64 valid squares leaves the
+    spaces at every 65th square.
+    """
+    codes = _expand_placement(" ".join(placements) + " ")
+    if len(codes) == 65 * len(placements):
+        codes = codes.reshape(len(placements), 65)
+        if (codes[:, 64] == 255).all() and not (codes[:, :64] == 255).any():
+            return codes[:, :64]
+    for fen, placement in zip(fens, placements):
+        squares = _expand_placement(placement)
+        if len(squares) != 64 or (squares == 255).any():
+            raise ValueError(f"Invalid FEN string {fen!r}")
+    raise ValueError("Invalid FEN string")
+
+def encode_squares(positions: Sequence[Union[ChessBoard, str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Encode positions as the plane of every square
+    
+    Args:
+        positions: Boards or FEN strings
+    
+    Returns:
+        Tuple of (uint8 array of shape (N, 64) with 12 for empty squares,
+        white to move (N,), moves played (N,); 0 for FEN strings like a
+        board built from them)
+    
+    Raises:
+        ValueError: If a FEN string has no valid piece placement
+    """
+    count = len(positions)
+    codes = np.empty((count, 64), dtype=np.uint8)
+    white_to_move = []
+    history = []
+    board_indices, board_codes = [], []
+    fen_indices, fens, placements = [], [], []
+    for index, position in enumerate(positions):
+        if isinstance(position, ChessBoard):
+            board_indices.append(index)
+            board_codes.append(_board_codes(position))
+            white_to_move.append(position.current_player == Color.WHITE)
+            history.append(len(position.move_history))
+        else:
+            fields = position.split()
+            if len(fields) != 6:
+                raise ValueError(f"Invalid FEN string {position!r}")
+            fen_indices.append(index)
+            fens.append(position)
+            placements.append(fields[0])
+            white_to_move.append(fields[1] == 'w')
+            history.append(0)
+    if board_codes:
+        codes[board_indices] = np.frombuffer(b"".join(board_codes), dtype=np.uint8).reshape(-1, 64)
+    if placements:
+        codes[fen_indices] = _placement_codes(fens, placements)
+    return codes, np.array(white_to_move, dtype=bool), np.array(history, dtype=np.int64)
+
+def encode_positions(positions: Sequence[Union[ChessBoard, str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Encode positions as piece planes
+    
+    Args:
+        positions: Boards or FEN strings
+    
+    Returns:
+        Tuple of (bool tensor of shape (N, 12, 64), white to move (N,),
+        moves played (N,); 0 for FEN strings like a board built from them)
+    
+    Raises:
+        ValueError: If a FEN string has no valid piece placement
+    """
+    codes, white_to_move, history = encode_squares(positions)
+    return _planes(codes), white_to_move, history
+
+def _planes(codes: np.ndarray) -> np.ndarray:
+    """Piece tensor of square planes"""
+    return codes[:, None, :] == np.arange(PLANES, dtype=np.uint8)[None, :, None]
+
+def pack_planes(planes: np.ndarray) -> np.ndarray:
+    """Occupancy words of shape (N, 12) of a piece tensor"""
+    packed = np.packbits(planes, axis=2, bitorder='little')
+    return np.ascontiguousarray(packed).view('<u8').reshape(planes.shape[0], PLANES).astype(np.uint64)
+
+def _square_values(piece_square_tables) -> np.ndarray:
+    """Piece-square value per plane and square from white's view (empty row last)"""
+    values = np.zeros((PLANES + 1, 64), dtype=np.int64)
+    for piece_type, table in piece_square_tables.items():
+        for square in range(64):
+            rank, file = square // 8, square % 8
+            values[piece_type.value - 1, square] = table[rank][file]
+            values[6 + piece_type.value - 1, square] = -table[7 - rank][file]
+    return values
+
+def _attack_maps(pieces: List[np.ndarray], side: int, empty: np.ndarray) -> List[np.ndarray]:
+    """
+    Squares attacked by one side, as maps in which each square is attacked
+    by at most one piece (so summing a square's bits counts its attackers)
+    """
+    pawn_step = -1 if side == WHITE else 1
+    maps = [_shift(pieces[PAWN], -1, pawn_step), _shift(pieces[PAWN], 1, pawn_step)]
+    maps += [_shift(pieces[KNIGHT], *step) for step in KNIGHT_STEPS]
+    maps += [_shift(pieces[KING], *step) for step in KING_STEPS]
+    diagonal = pieces[BISHOP] | pieces[QUEEN]
+    straight = pieces[ROOK] | pieces[QUEEN]
+    maps += [_ray(diagonal, empty, *direction) for direction in DIAGONALS]
+    maps += [_ray(straight, empty, *direction) for direction in STRAIGHTS]
+    return maps
+
+def _union(maps: List[np.ndarray]) -> np.ndarray:
+    """Squares set in any of the maps"""
+    result = maps[0]
+    for attack_map in maps[1:]:
+        result = result | attack_map
+    return result
+
+def _fill(words: np.ndarray, towards_rank_zero: bool) -> np.ndarray:
+    """Occupancy spread along the files towards one edge"""
+    for shift in (8, 16, 32):
+        words = words | (words >> np.uint64(shift) if towards_rank_zero else words << np.uint64(shift))
+    return words
+
+def _pawn_structure(pieces: List[np.ndarray], enemy_pawns: np.ndarray, side: int) -> np.ndarray:
+    """EvaluationEngine._evaluate_pawn_structure of one side"""
+    pawns = pieces[PAWN]
+    counts = [_popcount(pawns & FILES[file]) for file in range(8)]
+    zero = np.zeros_like(counts[0])
+    score = np.zeros(len(pawns), dtype=np.int64)
+    for file in range(8):
+        left = counts[file - 1] if file > 0 else zero
+        right = counts[file + 1] if file < 7 else zero
+        score -= 10 * counts[file] * (counts[file] - 1)
+        score -= 15 * counts[file] * ((left == 0) & (right == 0))
+    
+    # Passed pawns: no enemy pawn ahead on the pawn's or an adjacent file
+    forward = -1 if side == WHITE else 1
+    spread = enemy_pawns | _shift(enemy_pawns, 1, 0) | _shift(enemy_pawns, -1, 0)
+    guarded = _fill(_shift(spread, 0, -forward), towards_rank_zero=side == BLACK)
+    passed = pawns & ~guarded
+    for rank in range(8):
+        bonus = 20 + ((6 - rank) if side == WHITE else (rank - 1)) * 10
+        score += bonus * _popcount(passed & RANKS[rank])
+    
+    # Chains: own pawns diagonally behind
+    for file_step in (-1, 1):
+        score += 5 * _popcount(pawns & _shift(pawns, file_step, forward))
+    return score
+
+def _mobility(pieces: List[np.ndarray], own: np.ndarray, empty: np.ndarray) -> np.ndarray:
+    """EvaluationEngine._evaluate_mobility of one side"""
+    score = np.zeros(len(own), dtype=np.float64)
+    reachable = ~own
+    for piece, steps, slides, weight in MOBILITY_WEIGHTS:
+        count = np.zeros(len(own), dtype=np.int64)
+        for step in steps:
+            targets = _ray(pieces[piece], empty, *step) if slides else _shift(pieces[piece], *step)
+            count += _popcount(targets & reachable)
+        score += count * weight
+    return score
+
+def _king_safety(pawns: np.ndarray, king_square: np.ndarray, side: int, history: np.ndarray) -> np.ndarray:
+    """EvaluationEngine._evaluate_king_safety of one side"""
+    king_file, king_rank = king_square % 8, king_square // 8
+    forward = -1 if side == WHITE else 1
+    score = np.zeros(len(pawns), dtype=np.int64)
+    for file_step in (-1, 0, 1):
+        shield_file = king_file + file_step
+        shielded = np.zeros(len(pawns), dtype=bool)
+        for distance in (1, 2):
+            shield_rank = king_rank + forward * distance
+            on_board = (shield_file >= 0) & (shield_file < 8) & (shield_rank >= 0) & (shield_rank < 8)
+            square = np.clip(shield_rank * 8 + shield_file, 0, 63)
+            shielded |= on_board & (_bit(pawns, square) == 1)
+        score += 10 * shielded
+    
+    opening = history < 20
+    score -= 20 * (opening & (king_file >= 2) & (king_file <= 5))
+    score -= 15 * (opening & ((king_rank > 1) if side == WHITE else (king_rank < 6)))
+    castled = (62, 58) if side == WHITE else (6, 2)
+    score += 30 * ((king_square == castled[0]) | (king_square == castled[1]))
+    return score
+
+def _development(pieces: List[np.ndarray], king_square: np.ndarray, side: int,
+                 history: np.ndarray) -> np.ndarray:
+    """EvaluationEngine._evaluate_development of one side"""
+    back_rank = 56 if side == WHITE else 0
+    undeveloped = (_bit(pieces[KNIGHT], back_rank + 1) + _bit(pieces[KNIGHT], back_rank + 6)
+                   + _bit(pieces[BISHOP], back_rank + 2) + _bit(pieces[BISHOP], back_rank + 5))
+    castled = (king_square == back_rank + 6) | (king_square == back_rank + 2)
+    return np.where(history > 30, 0, 20 * castled - 5 * undeveloped)
+
+def _tempo(pieces: List[np.ndarray], own: np.ndarray, side: int, to_move: np.ndarray) -> np.ndarray:
+    """EvaluationEngine._evaluate_tempo of one side"""
+    back_rank, pawn_rank = (7, 6) if side == WHITE else (0, 1)
+    total = _popcount(own)
+    active = total - _popcount(own & RANKS[back_rank]) - _popcount(pieces[PAWN] & RANKS[pawn_rank])
+    return np.where(to_move, 5.0, 0.0) + active / total * 10
+
+def _king_escapes(king: np.ndarray, own: np.ndarray, enemy_attacks: np.ndarray) -> np.ndarray:
+    """Positions in which the king can step to a square the enemy does not attack"""
+    safe = ~own & ~enemy_attacks
+    escapes = np.zeros(len(own), dtype=bool)
+    for step in KING_STEPS:
+        escapes |= (_shift(king, *step) & safe) != 0
+    return escapes
+
+def _has_legal_move(pieces: List[np.ndarray], own: np.ndarray, enemy: np.ndarray, enemy_pieces: List[np.ndarray],
+                    escapes: np.ndarray, side: int) -> np.ndarray:
+    """
+    Positions in which a side not in check surely has a legal move
+    
+    Either the king escapes, or more pieces have a move than the enemy has
+    sliders: a slider pins at most one piece, and unpinned pieces move
+    freely when not in check.
+    """
+    free = ~own
+    forward = -1 if side == WHITE else 1
+    empty = ~(own | enemy)
+    pawn_moves = _shift(empty, 0, -forward) | _shift(enemy, 1, -forward) | _shift(enemy, -1, -forward)
+    movable = _popcount(pieces[PAWN] & pawn_moves)
+    for piece, steps in ((KNIGHT, KNIGHT_STEPS), (BISHOP, DIAGONALS), (ROOK, STRAIGHTS), (QUEEN, KING_STEPS)):
+        can_move = np.zeros_like(own)
+        for file_step, rank_step in steps:
+            can_move |= _shift(free, -file_step, -rank_step)
+        movable += _popcount(pieces[piece] & can_move)
+    sliders = _popcount(enemy_pieces[BISHOP] | enemy_pieces[ROOK] | enemy_pieces[QUEEN])
+    return escapes | (movable > sliders)
+
+def evaluate_batch(engine, positions: Sequence[Union[ChessBoard, str]],
+                   color: Optional[Color] = None) -> np.ndarray:
+    """
+    Evaluate many positions
+    
+    Args:
+        engine: EvaluationEngine providing weights, tables and the scalar path
+        positions: Boards or FEN strings
+        color: Color to evaluate for (None for each position's side to move)
+    
+    Returns:
+        int64 array of the scores EvaluationEngine.evaluate returns
+    
+    Raises:
+        ValueError: If a FEN string has no valid piece placement
+    """
+    count = len(positions)
+    if count == 0:
+        return np.zeros(0, dtype=np.int64)
+    codes, white_to_move, history = encode_squares(positions)
+    words = pack_planes(_planes(codes))
+    pieces = [[words[:, side * 6 + piece] for piece in range(6)] for side in (WHITE, BLACK)]
+    occupied = [_union(side_pieces) for side_pieces in pieces]
+    empty = ~(occupied[WHITE] | occupied[BLACK])
+    white_view = white_to_move if color is None else np.full(count, color == Color.WHITE)
+    
+    # Material entries per distinct material key
+    keys = np.zeros(count, dtype=np.int64)
+    for side, piece_color in ((WHITE, Color.WHITE), (BLACK, Color.BLACK)):
+        for piece in range(KING):
+            keys += _popcount(pieces[side][piece]) << material_shift(PieceType(piece + 1), piece_color)
+    unique_keys, key_index = np.unique(keys, return_inverse=True)
+    entries = [engine.material_table.lookup(int(key)) for key in unique_keys]
+    material = np.array([entry.score for entry in entries], dtype=np.int64)[key_index]
+    tables = engine.endgame_tables
+    scalar = np.array([entry.evaluator is not None
+                       or entry.scale not in (None, scale_opposite_bishops)
+                       or (tables is not None and int(key) in tables.material_keys)
+                       for key, entry in zip(unique_keys, entries)], dtype=bool)[key_index]
+    bishop_scaled = np.array([entry.scale is scale_opposite_bishops for entry in entries], dtype=bool)[key_index]
+    
+    # Positions in which a side may be mated or stalemated go through mate
+    # and stalemate detection, positions without exactly one king per side
+    # too. A king in check that can step out of it is not mated.
+    king_counts = [_popcount(pieces[side][KING]) for side in (WHITE, BLACK)]
+    scalar |= (king_counts[WHITE] != 1) | (king_counts[BLACK] != 1)
+    empty_without_king = [empty | pieces[side][KING] for side in (WHITE, BLACK)]
+    attacks = [_union(_attack_maps(pieces[side], side, empty_without_king[1 - side])) for side in (WHITE, BLACK)]
+    for side in (WHITE, BLACK):
+        in_check = (pieces[side][KING] & attacks[1 - side]) != 0
+        escapes = _king_escapes(pieces[side][KING], occupied[side], attacks[1 - side])
+        has_move = _has_legal_move(pieces[side], occupied[side], occupied[1 - side], pieces[1 - side],
+                                   escapes, side)
+        scalar |= in_check & ~escapes
+        scalar |= (white_view == (side == WHITE)) & ~in_check & ~has_move
+    
+    # Piece-square tables (white's view)
+    position = _square_values(engine.piece_square_tables)[codes, np.arange(64)].sum(axis=1)
+    
+    # Attackers of the empty center squares
+    control = [np.zeros(count, dtype=np.int64) for _ in (WHITE, BLACK)]
+    for side in (WHITE, BLACK):
+        for attack_map in _attack_maps(pieces[side], side, empty):
+            for square in CENTER_SQUARES:
+                control[side] += _bit(attack_map & empty, square)
+    
+    # Terms of each side, then those of the evaluated side
+    side_terms = []
+    for side in (WHITE, BLACK):
+        king_square = np.argmax(codes == side * 6 + KING, axis=1)
+        side_terms.append({
+            'king_safety': _king_safety(pieces[side][PAWN], king_square, side, history),
+            'pawn_structure': _pawn_structure(pieces[side], pieces[1 - side][PAWN], side),
+            'mobility': _mobility(pieces[side], occupied[side], empty),
+            'development': _development(pieces[side], king_square, side, history),
+            'tempo': _tempo(pieces[side], occupied[side], side, white_to_move == (side == WHITE))
+        })
+    terms = {term: np.where(white_view, side_terms[WHITE][term], side_terms[BLACK][term])
+             for term in side_terms[WHITE]}
+    
+    sign = np.where(white_view, 1, -1)
+    occupation = np.zeros(count, dtype=np.int64)
+    for square in CENTER_SQUARES:
+        white_here, black_here = _bit(occupied[WHITE], square), _bit(occupied[BLACK], square)
+        own_here = np.where(white_view, white_here, black_here)
+        other_here = np.where(white_view, black_here, white_here)
+        occupation += 10 * own_here - 5 * other_here
+    center_control = occupation + 2 * sign * (control[WHITE] - control[BLACK])
+    
+    weights = engine.weights
+    total = (
+        sign * material * weights["material"] +
+        (sign * position).astype(np.float64) * weights["position"] +
+        terms['king_safety'] * weights["king_safety"] +
+        terms['pawn_structure'] * weights["pawn_structure"] +
+        terms['mobility'] * weights["mobility"] +
+        center_control * weights["center_control"] +
+        terms['development'] * weights["development"] +
+        terms['tempo'] * weights["tempo"]
+    )
+    light_bishops = [(pieces[side][BISHOP] & LIGHT_SQUARES) != 0 for side in (WHITE, BLACK)]
+    opposite_bishops = bishop_scaled & (light_bishops[WHITE] != light_bishops[BLACK])
+    total = total * np.where(opposite_bishops, OPPOSITE_BISHOPS_SCALE, 1.0)
+    scores = np.rint(total).astype(np.int64)
+    
+    for index in np.flatnonzero(scalar):
+        board = positions[index]
+        if not isinstance(board, ChessBoard):
+            board = ChessBoard(board)
+        scores[index] = engine.evaluate(board, color if color is not None else board.current_player)
+    return scores
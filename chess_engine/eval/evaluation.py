@@ -8,12 +8,30 @@ This module implements:
 - Pawn structure evaluation
 - Mobility evaluation
 - Tunable evaluation weights
+- Exact scores of positions covered by endgame tables
+- Material entries per material key (see material), short-circuiting the
+  evaluation of known endgames
+- Batch evaluation of many positions with NumPy (see batch)
+- Unweighted evaluation terms as feature vectors for linear tuning (see
+  features)
 """
 
 import json
 import os
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Sequence, Tuple, Any, Union
 from ..board.board import ChessBoard, Color, PieceType
+from .material import MaterialEntry, MaterialTable
+
+# Score of a checkmate in centipawns. The search encodes mate-in-N as
+# MATE_SCORE minus the distance in plies, so this must stay well above
+# any positional score.
+MATE_SCORE = 30000
+
+# Weighted evaluation terms in the order evaluate sums them
+EVALUATION_TERMS = [
+    "material", "position", "king_safety", "pawn_structure",
+    "mobility", "center_control", "development", "tempo"
+]
 
 class EvaluationEngine:
     """Modular chess position evaluation engine"""
@@ -40,6 +58,14 @@ class EvaluationEngine:
             PieceType.QUEEN: 900,
             PieceType.KING: 20000
         }
+        
+        # Material balance, imbalance and specialized endgame evaluators
+        # cached per material key
+        self.material_table = MaterialTable(self.material_values)
+        
+        # Endgame tables (endgame.EndgameTables) giving exact scores of the
+        # positions they cover; set by MinimaxEngine.open_endgame_tables
+        self.endgame_tables = None
     
     def _load_weights(self) -> Dict[str, float]:
         """Load evaluation weights from file"""
@@ -157,7 +183,7 @@ class EvaluationEngine:
         
         return tables
     
-    def evaluate(self, board: ChessBoard, color: Color) -> float:
+    def evaluate(self, board: ChessBoard, color: Color) -> int:
         """
         Evaluate chess position
         
@@ -166,57 +192,126 @@ class EvaluationEngine:
             color: Color to evaluate for
             
         Returns:
-            Evaluation score (positive = good for color)
+            Evaluation score in centipawns (positive = good for color),
+            -MATE_SCORE/MATE_SCORE if color is mated/mates; positions
+            covered by the endgame tables score MATE_SCORE minus the
+            distance to mate in plies (or 0 when drawn), known endgames
+            without tables the score of their specialized evaluator
+        """
+        entry = self.material_table.probe(board)
+        exact_score = self._exact_score(board, color, entry)
+        if exact_score is not None:
+            return exact_score
+        
+        # Combine the evaluation terms with their weights
+        total_score = 0.0
+        for term, score in zip(EVALUATION_TERMS, self._evaluate_terms(board, color, entry)):
+            total_score += score * self.weights[term]
+        if entry.scale is not None:
+            total_score *= entry.scale(board)
+        
+        # Return score from perspective of the color being evaluated
+        # Positive score = good for the color, negative = bad for the color
+        return int(round(total_score))
+    
+    def _exact_score(self, board: ChessBoard, color: Color, entry: MaterialEntry) -> Optional[int]:
+        """
+        Score of a position evaluate does not build from the weighted terms
+        
+        Returns:
+            The endgame table, mate, stalemate or specialized endgame score
+            from color's perspective, or None
         """
+        if self.endgame_tables is not None:
+            table_score = self.endgame_tables.probe(board)
+            if table_score is not None:
+                return table_score if color == board.current_player else -table_score
+        
         if board.is_checkmate(color):
-            return float('-inf')
+            return -MATE_SCORE
         if board.is_checkmate(Color.BLACK if color == Color.WHITE else Color.WHITE):
-            return float('inf')
+            return MATE_SCORE
         if board.is_stalemate(color):
-            return 0.0
+            return 0
+        
+        # Known endgames are scored by their specialized evaluator
+        if entry.evaluator is not None:
+            material = entry.score if entry.strong == Color.WHITE else -entry.score
+            score = entry.evaluator(board, entry.strong, material)
+            if score is not None:
+                return score if color == entry.strong else -score
+        return None
+        
+    def _evaluate_terms(self, board: ChessBoard, color: Color, entry: MaterialEntry) -> List[float]:
+        """Unweighted evaluation terms in EVALUATION_TERMS order"""
+        return [
+            float(entry.score if color == Color.WHITE else -entry.score),
+            self._evaluate_position(board, color),
+            self._evaluate_king_safety(board, color),
+            self._evaluate_pawn_structure(board, color),
+            self._evaluate_mobility(board, color),
+            self._evaluate_center_control(board, color),
+            self._evaluate_development(board, color),
+            self._evaluate_tempo(board, color)
+        ]
+    
+    def evaluate_batch(self, positions: Sequence[Union[ChessBoard, str]], color: Optional[Color] = None):
+        """
+        Evaluate many positions at once
         
-        # Calculate different evaluation components
-        material_score = self._evaluate_material(board, color)
-        position_score = self._evaluate_position(board, color)
-        king_safety_score = self._evaluate_king_safety(board, color)
-        pawn_structure_score = self._evaluate_pawn_structure(board, color)
-        mobility_score = self._evaluate_mobility(board, color)
-        center_control_score = self._evaluate_center_control(board, color)
-        development_score = self._evaluate_development(board, color)
-        tempo_score = self._evaluate_tempo(board, color)
-        
-        # Combine scores with weights
-        total_score = (
-            material_score * self.weights["material"] +
-            position_score * self.weights["position"] +
-            king_safety_score * self.weights["king_safety"] +
-            pawn_structure_score * self.weights["pawn_structure"] +
-            mobility_score * self.weights["mobility"] +
-            center_control_score * self.weights["center_control"] +
-            development_score * self.weights["development"] +
-            tempo_score * self.weights["tempo"]
-        )
+        The general evaluation terms are computed with NumPy array
+        operations; positions needing mate, stalemate or endgame detection
+        go through evaluate one by one.
         
-        # Return score from perspective of the color being evaluated
-        # Positive score = good for the color, negative = bad for the color
-        return total_score
+        Args:
+            positions: Boards or FEN strings
+            color: Color to evaluate for (None for each position's side to move)
+        
+        Returns:
+            numpy int64 array of the scores evaluate returns
+        
+        Raises:
+            ValueError: If a FEN string has no valid piece placement
+        """
+        from .batch import evaluate_batch
+        return evaluate_batch(self, positions, color)
     
-    def _evaluate_material(self, board: ChessBoard, color: Color) -> float:
-        """Evaluate material balance from perspective of given color"""
-        own_material = 0.0
-        opponent_material = 0.0
+    def extract_features(self, board: ChessBoard, color: Optional[Color] = None, pst: bool = False):
+        """
+        Unweighted evaluation terms of a position for linear tuning
         
-        for rank in range(8):
-            for file in range(8):
-                square = board.get_piece((file, rank))
-                if square and not square.empty:
-                    piece_value = self.material_values[square.piece_type]
-                    if square.color == color:
-                        own_material += piece_value
-                    else:
-                        opponent_material += piece_value
+        Args:
+            board: Chess board position
+            color: Color to evaluate for (None for the side to move)
+            pst: Split the position term into one feature per piece type
+                 and square (see features.feature_names)
         
-        return own_material - opponent_material
+        Returns:
+            numpy vector f with evaluate(board, color) ==
+            round(f @ feature_weights(pst)), or None for positions scored
+            without the weighted terms (mates, stalemates, endgame tables
+            and specialized endgames)
+        """
+        from .features import extract_features
+        return extract_features(self, board, color if color is not None else board.current_player, pst)
+    
+    def feature_weights(self, pst: bool = False):
+        """
+        Current weights as a numpy vector matching extract_features
+        
+        Args:
+            pst: Layout with the position term split per piece type and square
+        
+        Returns:
+            numpy float64 vector of the weights (and weighted table entries)
+        """
+        from .features import feature_weights
+        return feature_weights(self, pst)
+    
+    def _evaluate_material(self, board: ChessBoard, color: Color) -> float:
+        """Evaluate material balance (with imbalance corrections) from perspective of given color"""
+        score = self.material_table.probe(board).score
+        return float(score if color == Color.WHITE else -score)
     
     def _evaluate_position(self, board: ChessBoard, color: Color) -> float:
         """Evaluate piece-square table values from perspective of given color"""
@@ -0,0 +1,92 @@
+"""
+Evaluation Features
+
+This module implements:
+- The unweighted evaluation terms of a position as a NumPy vector whose
+  dot product with the weight vector is the score evaluate rounds
+- Optionally the piece-square term split into one feature per piece type
+  and square, so the table entries can be tuned like the weights
+- Feature names and the weight vector of both layouts
+
+Positions evaluate scores without the weighted terms (endgame tables,
+mates, stalemates and specialized endgames) have no features. Scaled
+endings have their features scaled, which keeps the score linear in the
+weights. Piece-square features count the pieces of the evaluated side
+(+1) and of the opponent (-1) on each table entry; squares are named from
+the piece owner's side as white (a black knight on c6 is "knight.c3").
+"""
+
+from typing import List, Optional
+import numpy as np
+from ..board.board import ChessBoard, Color, PieceType
+from .evaluation import EVALUATION_TERMS
+
+FEATURE_NAMES = list(EVALUATION_TERMS)
+
+SQUARE_NAMES = [f"{'abcdefgh'[square % 8]}{8 - square // 8}" for square in range(64)]
+PIECE_TYPES = sorted(PieceType, key=lambda piece_type: piece_type.value)
+
+# The position term replaced by one feature per piece type and table square
+PST_FEATURE_NAMES = (FEATURE_NAMES[:1]
+                     + [f"position.{piece_type.name.lower()}.{square}"
+                        for piece_type in PIECE_TYPES for square in SQUARE_NAMES]
+                     + FEATURE_NAMES[2:])
+
+def feature_names(pst: bool = False) -> List[str]:
+    """Names of the features of a layout"""
+    return list(PST_FEATURE_NAMES if pst else FEATURE_NAMES)
+
+def _square_counts(board: ChessBoard, color: Color) -> np.ndarray:
+    """Pieces per piece-square table entry, the opponent's counted negative"""
+    counts = np.zeros(len(PIECE_TYPES) * 64, dtype=np.float64)
+    for rank, row in enumerate(board.board):
+        for file, square in enumerate(row):
+            if square.empty:
+                continue
+            table_rank = rank if square.color == Color.WHITE else 7 - rank
+            index = (square.piece_type.value - 1) * 64 + table_rank * 8 + file
+            counts[index] += 1.0 if square.color == color else -1.0
+    return counts
+
+def extract_features(engine, board: ChessBoard, color: Color, pst: bool = False) -> Optional[np.ndarray]:
+    """
+    Unweighted evaluation terms of a position
+    
+    Args:
+        engine: EvaluationEngine whose terms are extracted
+        board: Position
+        color: Color to evaluate for
+        pst: Split the position term per piece type and square
+    
+    Returns:
+        float64 vector in feature_names(pst) order with
+        engine.evaluate(board, color) == round(features @ feature_weights(engine, pst)),
+        or None if evaluate does not use the weighted terms
+    """
+    entry = engine.material_table.probe(board)
+    if engine._exact_score(board, color, entry) is not None:
+        return None
+    features = np.array(engine._evaluate_terms(board, color, entry), dtype=np.float64)
+    if pst:
+        features = np.concatenate([features[:1], _square_counts(board, color), features[2:]])
+    if entry.scale is not None:
+        features *= entry.scale(board)
+    return features
+
+def feature_weights(engine, pst: bool = False) -> np.ndarray:
+    """
+    Weight vector of a feature layout
+    
+    Args:
+        engine: EvaluationEngine providing the weights and tables
+        pst: Layout with the position term split per piece type and square
+    
+    Returns:
+        float64 vector in feature_names(pst) order; piece-square entries
+        are the table values times the position weight
+    """
+    weights = np.array([engine.weights[term] for term in EVALUATION_TERMS], dtype=np.float64)
+    if not pst:
+        return weights
+    tables = np.array([engine.piece_square_tables[piece_type] for piece_type in PIECE_TYPES], dtype=np.float64)
+    return np.concatenate([weights[:1], tables.reshape(-1) * engine.weights["position"], weights[2:]])
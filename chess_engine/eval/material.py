@@ -0,0 +1,259 @@
+"""
+Material Evaluation
+
+This module implements:
+- Material keys of signatures such as "KBNK" (see ChessBoard.material_key)
+- A cache of one entry per material key: the material balance with an
+  imbalance correction, and the specialized evaluator or scale factor of
+  the material configuration
+- Specialized evaluators of known endgames, dispatched by material key:
+  driving the lone king to the edge (KQK, KRK) or to a corner of the
+  bishop's color (KBNK), and draws with insufficient mating material
+- Scaling of opposite-colored bishop endings towards a draw
+
+Signatures name the stronger side first: "KBNK" is a king, bishop and
+knight against a lone king, with either color as the stronger side.
+"""
+
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+from ..board.board import ChessBoard, Color, PieceType, MATERIAL_INCREMENTS, material_key_count
+
+PIECE_LETTERS = {
+    'P': PieceType.PAWN, 'N': PieceType.KNIGHT, 'B': PieceType.BISHOP,
+    'R': PieceType.ROOK, 'Q': PieceType.QUEEN
+}
+
+# Base score of a won specialized endgame: above any positional score, so
+# the search converts into these endgames, and far below the mate scores
+KNOWN_WIN = 10000
+
+# Imbalance corrections: the bishop pair, and knights gaining and rooks
+# losing value with the number of own pawns (counted from five pawns)
+BISHOP_PAIR_BONUS = 30
+KNIGHT_PAWN_ADJUSTMENT = 6
+ROOK_PAWN_ADJUSTMENT = -12
+IMBALANCE_PAWN_BASE = 5
+
+# Specialized endgame terms: per ring of the lone king's distance from the
+# centre, per step of the kings' distance, and per step of the lone king's
+# distance from a corner of the bishop's color (KBNK)
+EDGE_PUSH = 30
+KING_CLOSE = 20
+CORNER_PUSH = 20
+
+# Score scale of bishops of opposite colors without other pieces
+OPPOSITE_BISHOPS_SCALE = 0.5
+
+# Specialized evaluator: (board, stronger side, material balance of the
+# stronger side) -> score from the stronger side's perspective, or None to
+# fall back to the full evaluation
+EndgameEvaluator = Callable[[ChessBoard, Color, int], Optional[int]]
+
+class MaterialEntry(NamedTuple):
+    """Cached evaluation data of one material key"""
+    score: int
+    evaluator: Optional[EndgameEvaluator]
+    strong: Color
+    scale: Optional[Callable[[ChessBoard], float]]
+
+def material_key(white_pieces: str, black_pieces: str) -> int:
+    """
+    Material key of the pieces of both sides
+    
+    Args:
+        white_pieces: Letters of white's pieces besides the king (e.g. "BN")
+        black_pieces: Letters of black's pieces besides the king
+    
+    Returns:
+        The material key a board with these pieces has
+    
+    Raises:
+        ValueError: If a letter is not a piece
+    """
+    key = 0
+    for pieces, color in ((white_pieces, Color.WHITE), (black_pieces, Color.BLACK)):
+        for letter in pieces:
+            if letter not in PIECE_LETTERS:
+                raise ValueError(f"Unknown piece letter {letter!r}")
+            key += MATERIAL_INCREMENTS[(PIECE_LETTERS[letter], color)]
+    return key
+
+def signature_keys(signature: str) -> Tuple[int, int]:
+    """
+    Material keys of a signature
+    
+    Args:
+        signature: Signature such as "KBNK" or "KBKB" (stronger side first)
+    
+    Returns:
+        Tuple of (key with white as the stronger side, key with black as
+        the stronger side)
+    
+    Raises:
+        ValueError: If the signature is not two kings with their pieces
+    """
+    second_king = signature.find('K', 1)
+    if not signature.startswith('K') or second_king < 0:
+        raise ValueError(f"Invalid material signature {signature!r}")
+    strong, weak = signature[1:second_king], signature[second_king + 1:]
+    return material_key(strong, weak), material_key(weak, strong)
+
+def _find_piece(board: ChessBoard, piece_type: PieceType, color: Color) -> Tuple[int, int]:
+    """(file, rank) of the first piece of a kind"""
+    for rank, row in enumerate(board.board):
+        for file, square in enumerate(row):
+            if square.piece_type == piece_type and square.color == color:
+                return file, rank
+    raise ValueError(f"No {color.name.lower()} {piece_type.name.lower()} on the board")
+
+def _distance(first: Tuple[int, int], second: Tuple[int, int]) -> int:
+    """King-move distance between two squares"""
+    return max(abs(first[0] - second[0]), abs(first[1] - second[1]))
+
+def _edge_ring(square: Tuple[int, int]) -> int:
+    """Ring of a square counted from the centre (0 for d4-e5, 3 for the edge)"""
+    file, rank = square
+    return 3 - min(file, 7 - file, rank, 7 - rank)
+
+def _other(color: Color) -> Color:
+    return Color.BLACK if color == Color.WHITE else Color.WHITE
+
+def evaluate_lone_king(board: ChessBoard, strong: Color, material: int) -> int:
+    """
+    Mating material against a lone king (KQK, KRK and similar)
+    
+    The lone king is driven to the edge and the stronger king brought
+    close to it, which is how these mates are forced.
+    """
+    strong_king = _find_piece(board, PieceType.KING, strong)
+    weak_king = _find_piece(board, PieceType.KING, _other(strong))
+    return (KNOWN_WIN + material + EDGE_PUSH * _edge_ring(weak_king)
+            + KING_CLOSE * (7 - _distance(strong_king, weak_king)))
+
+def evaluate_kbnk(board: ChessBoard, strong: Color, material: int) -> int:
+    """
+    Bishop and knight against a lone king
+    
+    The mate can only be forced in a corner of the bishop's color, so the
+    lone king is driven towards the nearer of those two corners.
+    """
+    strong_king = _find_piece(board, PieceType.KING, strong)
+    weak_king = _find_piece(board, PieceType.KING, _other(strong))
+    bishop_file, bishop_rank = _find_piece(board, PieceType.BISHOP, strong)
+    if (bishop_file + bishop_rank) % 2 == 0:
+        corners = [(0, 0), (7, 7)]
+    else:
+        corners = [(7, 0), (0, 7)]
+    corner_distance = min(_distance(weak_king, corner) for corner in corners)
+    return (KNOWN_WIN + material + EDGE_PUSH * _edge_ring(weak_king)
+            + CORNER_PUSH * (7 - corner_distance) + KING_CLOSE * (7 - _distance(strong_king, weak_king)))
+
+def evaluate_draw(board: ChessBoard, strong: Color, material: int) -> int:
+    """Material that cannot force mate (KK, KNK, KBK, KNNK)"""
+    return 0
+
+def evaluate_bishops(board: ChessBoard, strong: Color, material: int) -> Optional[int]:
+    """A bishop each: a dead draw when they travel on squares of the same color"""
+    first_file, first_rank = _find_piece(board, PieceType.BISHOP, Color.WHITE)
+    second_file, second_rank = _find_piece(board, PieceType.BISHOP, Color.BLACK)
+    if (first_file + first_rank) % 2 == (second_file + second_rank) % 2:
+        return 0
+    return None
+
+def scale_opposite_bishops(board: ChessBoard) -> float:
+    """Score scale of endings with a bishop each and pawns"""
+    first_file, first_rank = _find_piece(board, PieceType.BISHOP, Color.WHITE)
+    second_file, second_rank = _find_piece(board, PieceType.BISHOP, Color.BLACK)
+    if (first_file + first_rank) % 2 != (second_file + second_rank) % 2:
+        return OPPOSITE_BISHOPS_SCALE
+    return 1.0
+
+# Specialized evaluators by signature
+ENDGAME_EVALUATORS: Dict[str, EndgameEvaluator] = {
+    "KQK": evaluate_lone_king,
+    "KRK": evaluate_lone_king,
+    "KBNK": evaluate_kbnk,
+    "KK": evaluate_draw,
+    "KNK": evaluate_draw,
+    "KBK": evaluate_draw,
+    "KNNK": evaluate_draw,
+    "KBKB": evaluate_bishops
+}
+
+def _dispatch_table() -> Dict[int, Tuple[EndgameEvaluator, Color]]:
+    """Material key -> (specialized evaluator, stronger side)"""
+    table = {}
+    for signature, evaluator in ENDGAME_EVALUATORS.items():
+        white_key, black_key = signature_keys(signature)
+        # Symmetric signatures map both colors to one key; white is kept
+        table.setdefault(black_key, (evaluator, Color.BLACK))
+        table[white_key] = (evaluator, Color.WHITE)
+    return table
+
+DISPATCH = _dispatch_table()
+
+class MaterialTable:
+    """
+    Evaluation data per material key
+    
+    Entries depend only on the piece counts, so they are computed once per
+    material configuration; a search meets only a few hundred of them.
+    """
+    
+    def __init__(self, piece_values: Dict[PieceType, int]):
+        """
+        Create an empty table
+        
+        Args:
+            piece_values: Centipawn value of every piece type
+        """
+        self.piece_values = piece_values
+        self.entries: Dict[int, MaterialEntry] = {}
+    
+    def clear(self):
+        """Drop the cached entries (after changing piece values)"""
+        self.entries.clear()
+    
+    def probe(self, board: ChessBoard) -> MaterialEntry:
+        """Entry of the board's material key"""
+        return self.lookup(board.material_key)
+    
+    def lookup(self, key: int) -> MaterialEntry:
+        """Entry of a material key"""
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self._build_entry(key)
+            self.entries[key] = entry
+        return entry
+    
+    def _side_score(self, key: int, color: Color) -> int:
+        """Material of one side with its imbalance corrections"""
+        counts = {piece_type: material_key_count(key, piece_type, color) for piece_type in PIECE_LETTERS.values()}
+        score = sum(self.piece_values[piece_type] * count for piece_type, count in counts.items())
+        if counts[PieceType.BISHOP] >= 2:
+            score += BISHOP_PAIR_BONUS
+        extra_pawns = counts[PieceType.PAWN] - IMBALANCE_PAWN_BASE
+        score += KNIGHT_PAWN_ADJUSTMENT * counts[PieceType.KNIGHT] * extra_pawns
+        score += ROOK_PAWN_ADJUSTMENT * counts[PieceType.ROOK] * extra_pawns
+        return score
+    
+    def _build_entry(self, key: int) -> MaterialEntry:
+        """Entry of a material configuration not seen before"""
+        score = self._side_score(key, Color.WHITE) - self._side_score(key, Color.BLACK)
+        evaluator, strong = DISPATCH.get(key, (None, Color.WHITE))
+        
+        if evaluator is None:
+            # Any queen or rook against a lone king is won like KQK/KRK
+            for color in (Color.WHITE, Color.BLACK):
+                other = _other(color)
+                lone = all(material_key_count(key, piece_type, other) == 0 for piece_type in PIECE_LETTERS.values())
+                heavy = material_key_count(key, PieceType.QUEEN, color) + material_key_count(key, PieceType.ROOK, color)
+                if lone and heavy:
+                    evaluator, strong = evaluate_lone_king, color
+        
+        scale = None
+        if all(material_key_count(key, piece_type, color) == (1 if piece_type == PieceType.BISHOP else 0)
+               for piece_type in (PieceType.KNIGHT, PieceType.BISHOP, PieceType.ROOK, PieceType.QUEEN)
+               for color in (Color.WHITE, Color.BLACK)):
+            scale = scale_opposite_bishops
+        return MaterialEntry(score, evaluator, strong, scale)
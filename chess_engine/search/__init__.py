@@ -6,10 +6,17 @@ This module contains:
 - Quiescence search for tactical positions
 - Transposition table for position caching
 - Iterative deepening
+- Lazy SMP parallel search over a shared-memory transposition table
+- A memory-mapped on-disk table of deep results
+- Search instrumentation hooks and per-iteration statistics
 """
 
 from .minimax import MinimaxEngine
 from .quiescence import QuiescenceSearch
 from .transposition import LRUTranspositionTable, TranspositionEntry
+from .shared_tt import SharedTranspositionTable
+from .persistent_tt import PersistentTranspositionTable
+from .instrumentation import SearchHooks, IterationStats, JSONLinesHooks
 
-__all__ = ['MinimaxEngine', 'QuiescenceSearch', 'TranspositionTable']
\ No newline at end of file
+__all__ = ['MinimaxEngine', 'QuiescenceSearch', 'TranspositionTable', 'SharedTranspositionTable',
+           'PersistentTranspositionTable', 'SearchHooks', 'IterationStats', 'JSONLinesHooks']
\ No newline at end of file
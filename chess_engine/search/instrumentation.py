@@ -0,0 +1,137 @@
+"""
+Search Instrumentation
+
+This module implements:
+- Structured statistics of every completed iterative deepening iteration
+  (depth, seldepth, nodes, effective branching factor, first-move cutoff
+  rate, table hit and store rates, time split between move generation,
+  evaluation and the rest of the search)
+- A hook interface called by the search on iterations, periodic node
+  samples, beta cutoffs, table probes and timeouts
+- A hook writing the statistics as JSON lines for monitoring
+
+Hooks are registered with MinimaxEngine.add_hook. The engine only calls
+the events a hook overrides, so unused events cost nothing; timing of move
+generation and evaluation is only installed for hooks with measure_time.
+"""
+
+import json
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any, TextIO
+from ..board.board import Move
+from .transposition import TranspositionEntry
+
+# Events of SearchHooks, in the order the engine dispatches them
+HOOK_EVENTS = ['on_iteration', 'on_node_sample', 'on_cutoff', 'on_tt_probe', 'on_timeout']
+
+@dataclass
+class IterationStats:
+    """
+    Statistics of one completed iteration
+    
+    Node counts, rates and times cover this iteration only. movegen_time and
+    eval_time are None unless a registered hook measures time.
+    """
+    depth: int
+    seldepth: int
+    nodes: int
+    qnodes: int
+    total_nodes: int
+    ebf: float
+    first_move_cutoff_rate: float
+    tt_hit_rate: float
+    tt_store_rate: float
+    time: float
+    movegen_time: Optional[float]
+    eval_time: Optional[float]
+    search_time: float
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Statistics as a JSON-serializable dictionary"""
+        return asdict(self)
+
+class SearchHooks:
+    """
+    Base class of search instrumentation hooks
+    
+    Subclasses override the events they need; events left as defined here
+    are never called. Hooks run in the searching process only (Lazy SMP
+    helpers and root-split workers are not instrumented).
+    """
+    
+    # Time move generation and evaluation while this hook is registered
+    measure_time = False
+    
+    def on_iteration(self, stats: IterationStats):
+        """Called after every completed iteration"""
+    
+    def on_node_sample(self, nodes: int, ply: int):
+        """
+        Called periodically during the search
+        
+        Args:
+            nodes: Nodes searched so far (main and quiescence search)
+            ply: Distance from the root of the node being searched
+        """
+    
+    def on_cutoff(self, ply: int, depth: int, move: Move, move_index: int):
+        """
+        Called on every beta cutoff of the main search
+        
+        Args:
+            ply: Distance from the root
+            depth: Remaining depth of the node
+            move: Move that caused the cutoff
+            move_index: Position of the move in the ordered move list
+        """
+    
+    def on_tt_probe(self, key: int, entry: Optional[TranspositionEntry], ply: int):
+        """
+        Called after every transposition table probe of the main search
+        
+        Args:
+            key: Position key
+            entry: Entry found (None on a miss)
+            ply: Distance from the root
+        """
+    
+    def on_timeout(self, depth: int, nodes: int):
+        """
+        Called when time or node limits abort an iteration
+        
+        Args:
+            depth: Depth of the aborted iteration
+            nodes: Nodes searched so far (main and quiescence search)
+        """
+
+def overridden_events(hooks: SearchHooks) -> Dict[str, Any]:
+    """Bound methods of the events a hook overrides, keyed by event name"""
+    return {event: getattr(hooks, event) for event in HOOK_EVENTS
+            if getattr(type(hooks), event) is not getattr(SearchHooks, event)}
+
+class JSONLinesHooks(SearchHooks):
+    """Write iteration statistics and timeouts as one JSON object per line"""
+    
+    def __init__(self, stream: TextIO, measure_time: bool = True):
+        """
+        Initialize the hook
+        
+        Args:
+            stream: Text stream to write to (flushed after every line)
+            measure_time: Record the move generation/evaluation time split
+        """
+        self.stream = stream
+        self.measure_time = measure_time
+    
+    def _write(self, record: Dict[str, Any]):
+        """Write one record"""
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+    
+    def on_iteration(self, stats: IterationStats):
+        """Write the statistics of the iteration"""
+        self._write(dict(event="iteration", **stats.to_dict()))
+    
+    def on_timeout(self, depth: int, nodes: int):
+        """Write the aborted depth and node count"""
+        self._write({'event': "timeout", 'depth': depth, 'nodes': nodes})
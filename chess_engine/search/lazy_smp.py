@@ -0,0 +1,139 @@
+"""
+Lazy SMP Parallel Search
+
+This module implements:
+- Helper processes running the same iterative deepening as the main search,
+  all sharing one transposition table in shared memory
+- Search diversification through depth offsets and move order perturbation
+- Selection of the deepest completed best move over all workers
+"""
+
+import multiprocessing
+import queue
+import random
+import time
+from typing import List, Optional, Tuple, Any
+from ..board.board import ChessBoard, Move
+from .shared_tt import SharedTranspositionTable
+from .time_manager import ClockState
+from .transposition import move_key
+
+# Seconds to wait for helpers to notice the stop event before killing them
+HELPER_STOP_TIMEOUT = 5.0
+
+def _helper_worker(worker_id: int, board: ChessBoard, depth: int, config: Any,
+                   table_name: str, table_size: int, table_age: int,
+                   stop_event, results):
+    """
+    Run one helper search until it completes or stop_event is set
+    
+    Every completed iteration is reported as
+    (worker_id, depth, score, best_move_key, nodes).
+    """
+    from .minimax import MinimaxEngine
+    
+    engine = MinimaxEngine(max_depth=depth, time_limit=None, config=config)
+    engine.transposition_table = SharedTranspositionTable.attach(table_name, table_size, table_age)
+    # Odd helpers search one ply deeper; all helpers shuffle quiet moves
+    # with equal history scores differently
+    engine.depth_offset = worker_id % 2
+    engine.order_jitter = random.Random(worker_id)
+    engine.time_manager.stop_event = stop_event
+    
+    def report(info):
+        if info['pv']:
+            results.put((worker_id, info['depth'], info['score'],
+                         move_key(info['pv'][0]), info['nodes']))
+    
+    engine.info_callback = report
+    try:
+        # Not engine.search: that would start another table generation, and
+        # entries of the other workers would then look stale to this one
+        engine._prepare_search(board, new_generation=False)
+        engine._iterative_deepening(board, depth, None, False)
+    finally:
+        engine.transposition_table.close()
+
+def _collect_reports(helpers: List[multiprocessing.Process], results) -> List[Tuple]:
+    """Wait for the helpers to exit, draining their reports meanwhile"""
+    reports = []
+    
+    def drain():
+        while True:
+            try:
+                reports.append(results.get_nowait())
+            except queue.Empty:
+                return
+    
+    deadline = time.time() + HELPER_STOP_TIMEOUT
+    while any(helper.is_alive() for helper in helpers) and time.time() < deadline:
+        drain()
+        for helper in helpers:
+            helper.join(0.01)
+    
+    for helper in helpers:
+        if helper.is_alive():
+            helper.terminate()
+            helper.join()
+    drain()
+    return reports
+
+def lazy_smp_search(engine, board: ChessBoard, depth: int,
+                    clock: Optional[ClockState] = None, ponder: bool = False,
+                    nodes: Optional[int] = None) -> Tuple[Optional[Move], int]:
+    """
+    Search with engine.threads workers: the calling process plus helper processes
+    
+    The calling process runs the normal search and owns the time control;
+    when it finishes, the helpers are stopped and the best move of the
+    deepest iteration completed by any worker is returned.
+    
+    Args:
+        engine: MinimaxEngine with a SharedTranspositionTable
+        board: Current chess position
+        depth: Maximum search depth
+        clock: Game clock of the side to move
+        ponder: Search without time limit until ponderhit
+        nodes: Node limit of the calling process (helpers stop with it)
+    
+    Returns:
+        Tuple of (best_move, evaluation_score)
+    """
+    table = engine.transposition_table
+    context = multiprocessing.get_context()
+    stop_event = context.Event()
+    results = context.Queue()
+    
+    helpers = [
+        context.Process(
+            target=_helper_worker,
+            args=(worker_id, board, depth, engine.config, table.name,
+                  table.max_size, table.current_age, stop_event, results),
+            daemon=True
+        )
+        for worker_id in range(1, engine.threads)
+    ]
+    for helper in helpers:
+        helper.start()
+    
+    try:
+        best_move, best_score = engine._iterative_deepening(board, depth, clock, ponder, nodes)
+    finally:
+        stop_event.set()
+        reports = _collect_reports(helpers, results)
+    
+    best_depth = engine.completed_depth
+    helper_nodes = {}
+    for worker_id, report_depth, score, key, nodes in reports:
+        helper_nodes[worker_id] = max(nodes, helper_nodes.get(worker_id, 0))
+        if report_depth > best_depth:
+            move = engine._find_move(board, key)
+            if move is not None:
+                best_move, best_score, best_depth = move, score, report_depth
+    
+    engine.helper_nodes = sum(helper_nodes.values())
+    if best_depth > engine.completed_depth:
+        engine.completed_depth = best_depth
+        engine.principal_variation = engine._extract_pv(board, [best_move], best_depth)
+    
+    return best_move, best_score
@@ -6,93 +6,573 @@ This module implements:
 - Iterative deepening
 - Move ordering for better performance
 - Time management
+- Per-iteration search info (depth, score, nodes, principal variation)
+- Lazy SMP over several processes (see lazy_smp)
+- Root-split parallel scoring of all root moves (see root_split)
+- MultiPV search returning the best K lines with principal variations
+- Principal variation of every search, searched first by the next iteration
+- Per-iteration statistics and instrumentation hooks (see instrumentation)
+- Polyglot opening book moves played without searching
+- Exact scores from endgame tables for the positions they cover
 """
 
+import random
 import time
-from typing import List, Tuple, Optional, Dict, Any
-from ..board.board import ChessBoard, Move, Color
+from dataclasses import dataclass
+from typing import List, Tuple, Optional, Dict, Any, Callable
+from ..board.board import ChessBoard, Move, Color, PieceType
+from ..exceptions import SearchTimeoutError
 from ..board.move_generator import MoveGenerator
-from ..eval.evaluation import EvaluationEngine
+from ..eval.evaluation import EvaluationEngine, MATE_SCORE
+from ..config import SearchConfig
+from .transposition import (
+    LRUTranspositionTable, TranspositionEntry, NodeType,
+    MAX_PLY, MATE_BOUND, INFINITE_SCORE, DRAW_SCORE, score_to_tt, score_from_tt,
+    entries_for_megabytes, move_key
+)
+from .time_manager import TimeManager, ClockState
+from .shared_tt import SharedTranspositionTable
+from .persistent_tt import PersistentTranspositionTable, append_deep_results
+from .lazy_smp import lazy_smp_search
+from .root_split import root_split_search, RootMoveScore
+from .instrumentation import SearchHooks, IterationStats, overridden_events
+from ..book.polyglot import PolyglotBook
+from ..endgame.tables import EndgameTables
+
+# Move ordering priorities (history scores are kept below HISTORY_MAX)
+PV_MOVE_PRIORITY = 20000000
+TT_MOVE_PRIORITY = 10000000
+CAPTURE_PRIORITY = 1000000
+PROMOTION_PRIORITY = 900000
+KILLER_PRIORITY = 800000
+COUNTERMOVE_PRIORITY = 700000
+HISTORY_MAX = 500000
+
+# Random spread added to history scores by Lazy SMP helpers
+ORDER_JITTER = 256
+
+class SearchResult(tuple):
+    """
+    Result of MinimaxEngine.search
+    
+    Unpacks as (best_move, score); the principal variation and the depth
+    of the last completed iteration are available as attributes.
+    """
+    
+    def __new__(cls, move: Optional[Move], score: int, pv: Optional[List[Move]] = None,
+                depth: int = 0):
+        result = super().__new__(cls, (move, score))
+        result.pv = list(pv) if pv else []
+        result.depth = depth
+        return result
+    
+    @property
+    def move(self) -> Optional[Move]:
+        """Best move"""
+        return self[0]
+    
+    @property
+    def score(self) -> int:
+        """Score in centipawns from the side to move's perspective"""
+        return self[1]
+
+@dataclass
+class PVLine:
+    """One line of a MultiPV search"""
+    score: int
+    depth: int
+    pv: List[Move]
+    
+    @property
+    def move(self) -> Move:
+        """First move of the line"""
+        return self.pv[0]
 
 class MinimaxEngine:
     """Minimax chess engine with alpha-beta pruning"""
     
-    def __init__(self, max_depth: int = 4, time_limit: float = 5.0):
+    def __init__(self, max_depth: int = 4, time_limit: float = 5.0,
+                 config: Optional[SearchConfig] = None):
         """
         Initialize minimax engine
         
         Args:
             max_depth: Maximum search depth
             time_limit: Time limit in seconds
+            config: Search configuration (defaults to SearchConfig())
         """
         self.max_depth = max_depth
         self.time_limit = time_limit
+        self.config = config if config is not None else SearchConfig()
+        self.threads = 1
+        self.hash_megabytes = None
         self.nodes_searched = 0
-        from .transposition import LRUTranspositionTable
-        self.transposition_table = LRUTranspositionTable(max_size=1000000)
-        self.killer_moves = {}  # Move ordering
-        self.history_table = {}  # History heuristic
+        self.transposition_table = LRUTranspositionTable(max_size=self.config.transposition_table_size)
+        # Read-only table of deep results of earlier runs, probed on a miss
+        self.persistent_table: Optional[PersistentTranspositionTable] = None
+        if self.config.persistent_table_path:
+            self.open_persistent_table(self.config.persistent_table_path)
+        # Opening book consulted before every search; book moves are picked
+        # at random in proportion to their weights using book_random
+        self.opening_book: Optional[PolyglotBook] = None
+        self.book_random = random.Random()
+        if self.config.opening_book_path:
+            self.open_opening_book(self.config.opening_book_path)
+        # Move ordering tables: two killer move keys per ply, butterfly
+        # history indexed by color * 4096 + from * 64 + to, and the move key
+        # that last refuted each from/to pair of the previous move
+        self.killer_moves = [[0, 0] for _ in range(MAX_PLY)]
+        self.history_table = [0] * 8192
+        self.countermoves = [0] * 4096
         self.evaluation_engine = EvaluationEngine()
+        # Endgame tables probed by the search and the evaluation
+        self.endgame_tables: Optional[EndgameTables] = None
+        if self.config.endgame_tables_path:
+            self.open_endgame_tables(self.config.endgame_tables_path)
         self.move_generator = None
+        self.time_manager = TimeManager()
+        
+        # Called with an info dict after every completed iteration
+        self.info_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+        
+        # Instrumentation hooks. The bound methods of each event are kept in
+        # a tuple, so without hooks the search only tests an empty tuple
+        self.hooks: List[SearchHooks] = []
+        self._iteration_hooks = ()
+        self._node_sample_hooks = ()
+        self._cutoff_hooks = ()
+        self._tt_probe_hooks = ()
+        self._timeout_hooks = ()
+        # Seconds spent in [move generation, evaluation], only kept while
+        # a hook measures time
+        self.timers: Optional[List[float]] = None
+        # Statistics of the completed iterations of the last search
+        self.iteration_stats: List[IterationStats] = []
+        self.principal_variation: List[Move] = []
+        self.seldepth = 0
+        # Triangular PV table: pv_table[ply] is the best line found from ply
+        self.pv_table: List[List[Move]] = [[] for _ in range(MAX_PLY + 1)]
+        # Root moves skipped by the search (keys of lines already found by MultiPV)
+        self.excluded_root_moves = set()
+        # PV of the previous iteration; followed first while follow_pv is set
+        self.previous_pv: List[Move] = []
+        self.follow_pv = False
+        self.completed_depth = 0
+        # Table hit counters at the start of the last search
+        self.table_counters = (0, 0)
+        
+        # Lazy SMP: helpers search deeper by depth_offset and perturb move
+        # ordering with order_jitter (a random.Random); nodes searched by
+        # the helpers of the last search are kept in helper_nodes
+        self.depth_offset = 0
+        self.order_jitter = None
+        self.helper_nodes = 0
+        
+        # Best root move of the running iteration (kept if it gets aborted)
+        self.root_best_move = None
+        self.root_best_score = -INFINITE_SCORE
         
         # Search statistics
         self.search_stats = {
             'nodes_searched': 0,
             'cutoffs': 0,
+            'first_move_cutoffs': 0,
             'transposition_hits': 0,
-            'quiescence_nodes': 0
+            'quiescence_nodes': 0,
+            'repetition_draws': 0,
+            'mate_distance_prunes': 0,
+            'persistent_hits': 0,
+            'check_extensions': 0,
+            'recapture_extensions': 0,
+            'passed_pawn_extensions': 0,
+            'singular_extensions': 0,
+            'reverse_futility_prunes': 0,
+            'futility_prunes': 0,
+            'razoring_prunes': 0,
+            'iid_searches': 0,
+            'iir_reductions': 0,
+            'tt_stores': 0,
+            'endgame_table_hits': 0
         }
     
-    def search(self, board: ChessBoard, depth: Optional[int] = None) -> Tuple[Move, float]:
+    def search(self, board: ChessBoard, depth: Optional[int] = None,
+               clock: Optional[ClockState] = None, ponder: bool = False,
+               nodes: Optional[int] = None) -> SearchResult:
         """
         Search for best move using minimax with alpha-beta pruning
         
+        If an opening book is open and has the position, a book move is
+        returned right away instead.
+        
         Args:
             board: Current chess position
             depth: Search depth (uses max_depth if None)
-            
+            clock: Game clock of the side to move; if given, the time manager
+                   derives the time budget from it instead of time_limit
+            ponder: Search without time limit until time_manager.ponderhit()
+            nodes: Stop after this many nodes (main and quiescence search
+                   nodes of the calling process; root split ignores it)
+        
         Returns:
-            Tuple of (best_move, evaluation_score)
+            SearchResult unpacking as (best_move, evaluation_score) with the
+            score in centipawns from the side to move's perspective, and the
+            principal variation in .pv
         """
         if depth is None:
             depth = self.max_depth
         
+        self._prepare_search(board)
+        
+        # A book move is played without searching (score 0, depth 0)
+        if self.opening_book is not None:
+            book_move = self.opening_book.choose_move(board, self.book_random)
+            if book_move is not None:
+                self.principal_variation = [book_move]
+                return SearchResult(book_move, DRAW_SCORE, self.principal_variation, 0)
+        
+        if self.threads > 1 and self.config.parallel_mode == "root_split":
+            time_limit = self.time_manager.allocate(clock)[1] if clock is not None else self.time_limit
+            results = root_split_search(self, board, depth, 1, self.threads, time_limit)
+            if results:
+                best_move, best_score = results[0].move, results[0].score
+                self.completed_depth = results[0].depth
+                self.principal_variation = [best_move]
+            else:
+                best_move = None
+                best_score = -MATE_SCORE if board.is_check(board.current_player) else DRAW_SCORE
+        elif self.threads > 1:
+            if not isinstance(self.transposition_table, SharedTranspositionTable):
+                self.set_threads(self.threads)
+            best_move, best_score = lazy_smp_search(self, board, depth, clock, ponder, nodes)
+        else:
+            best_move, best_score = self._iterative_deepening(board, depth, clock, ponder, nodes)
+        
+        return SearchResult(best_move, best_score, self.principal_variation, self.completed_depth)
+    
+    def _prepare_search(self, board: ChessBoard, new_generation: bool = True):
+        """
+        Reset per-search state before a new root search
+        
+        Args:
+            board: Root position
+            new_generation: Start a new table generation; Lazy SMP helpers
+                            pass False and store with the age of the main search
+        """
         self.move_generator = MoveGenerator(board)
+        if self.timers is not None:
+            self.move_generator.generate_legal_moves = self._timed(
+                self.move_generator.generate_legal_moves, 0)
         self.nodes_searched = 0
         self.search_stats = {key: 0 for key in self.search_stats}
+        self.principal_variation = []
+        self.seldepth = 0
+        self.completed_depth = 0
+        self.helper_nodes = 0
+        self.iteration_stats = []
+        self.excluded_root_moves = set()
+        self.previous_pv = []
+        self.follow_pv = False
+        self._age_move_ordering()
+        
+        # The table persists across searches; entries of earlier searches
+        # become an older generation and are replaced first
+        table = self.transposition_table
+        if new_generation:
+            table.new_search()
+        self.table_counters = (table.hits, table.reused_hits)
+    
+    def search_multipv(self, board: ChessBoard, multipv: int = 3, depth: Optional[int] = None,
+                       clock: Optional[ClockState] = None) -> List[PVLine]:
+        """
+        Search the best multipv root moves with their principal variations
+        
+        Every iteration searches the root multipv times, each time excluding
+        the root moves of the lines already found, so each line gets an exact
+        score and its own PV. With threads > 1 in root_split mode the root
+        moves are scored in parallel instead (lines then hold the move only).
+        
+        Args:
+            board: Current chess position
+            multipv: Number of lines
+            depth: Search depth (uses max_depth if None)
+            clock: Game clock of the side to move
+        
+        Returns:
+            PVLine list sorted from best to worst (fewer lines if there are
+            fewer legal moves)
+        """
+        if depth is None:
+            depth = self.max_depth
+        
+        self._prepare_search(board)
+        if self.threads > 1 and self.config.parallel_mode == "root_split":
+            time_limit = self.time_manager.allocate(clock)[1] if clock is not None else self.time_limit
+            results = root_split_search(self, board, depth, multipv, self.threads, time_limit)
+            return [PVLine(result.score, result.depth, [result.move]) for result in results[:multipv]]
+        
+        time_manager = self.time_manager
+        time_manager.start(self.time_limit, clock)
+        root_ply = len(board.move_history)
+        lines: List[PVLine] = []
+        
+        for current_depth in range(1, depth + 1):
+            if not time_manager.can_start_iteration():
+                break
+            
+            iteration_start = time.time()
+            iteration_lines = []
+            try:
+                while len(iteration_lines) < multipv:
+                    move, score = self._minimax(
+                        board, current_depth, -INFINITE_SCORE, INFINITE_SCORE, board.current_player
+                    )
+                    if move is None:
+                        break
+                    pv = self._extract_pv(board, self._root_pv(move), current_depth)
+                    iteration_lines.append(PVLine(score, current_depth, pv))
+                    self.excluded_root_moves.add(move_key(move))
+            
+            except SearchTimeoutError:
+                while len(board.move_history) > root_ply:
+                    board.undo_move()
+                
+                # Lines finished at this depth replace the shallower ones
+                found = {move_key(line.move) for line in iteration_lines}
+                lines = iteration_lines + [line for line in lines if move_key(line.move) not in found]
+                lines = lines[:multipv]
+                break
+            finally:
+                self.excluded_root_moves = set()
+            
+            lines = iteration_lines
+            self.completed_depth = current_depth
+            time_manager.iteration_completed(time.time() - iteration_start)
+        
+        if lines:
+            self.principal_variation = list(lines[0].pv)
+        return lines
+    
+    def score_root_moves(self, board: ChessBoard, depth: Optional[int] = None,
+                         multipv: Optional[int] = None,
+                         processes: Optional[int] = None) -> List[RootMoveScore]:
+        """
+        Score every root move with a root-split parallel search
+        
+        Args:
+            board: Current chess position
+            depth: Search depth (uses max_depth if None)
+            multipv: Number of best moves that need exact scores (None for all)
+            processes: Worker processes (uses threads if None)
         
+        Returns:
+            RootMoveScore list sorted from best to worst
+        """
+        if depth is None:
+            depth = self.max_depth
+        if processes is None:
+            processes = self.threads
+        self.helper_nodes = 0
+        return root_split_search(self, board, depth, multipv, processes, self.time_limit)
+    
+    def _iterative_deepening(self, board: ChessBoard, depth: int, clock: Optional[ClockState],
+                             ponder: bool, nodes: Optional[int] = None) -> Tuple[Move, int]:
+        """Run iterative deepening up to depth and return (best_move, score)"""
+        time_manager = self.time_manager
+        time_manager.start(self.time_limit, clock, ponder, nodes)
         start_time = time.time()
+        root_ply = len(board.move_history)
         best_move = None
-        best_score = float('-inf')
+        best_score = -INFINITE_SCORE
         
         # Iterative deepening
         for current_depth in range(1, depth + 1):
-            if time.time() - start_time > self.time_limit:
+            if not time_manager.can_start_iteration():
                 break
-                
+            
+            iteration_start = time.time()
+            self.root_best_move = None
+            self.root_best_score = -INFINITE_SCORE
+            self.follow_pv = bool(self.previous_pv)
+            
+            search_depth = current_depth + self.depth_offset
+            counters = self._iteration_counters()
+            
             try:
                 move, score = self._minimax(
-                    board, current_depth, float('-inf'), float('inf'), 
-                    board.current_player, start_time
+                    board, search_depth, -INFINITE_SCORE, INFINITE_SCORE, 
+                    board.current_player
                 )
                 
                 if move is not None:
                     best_move = move
-                    best_score = score
-                    
-            except TimeoutError:
+                best_score = score
+                self.completed_depth = search_depth
+                time_manager.iteration_completed(time.time() - iteration_start)
+                
+                if best_move is not None:
+                    self.principal_variation = self._extract_pv(board, self._root_pv(best_move), search_depth)
+                    self.previous_pv = self.principal_variation
+                if self.info_callback is not None:
+                    self.info_callback(self._iteration_info(search_depth, best_score, start_time))
+                stats = self._iteration_stats(search_depth, counters, time.time() - iteration_start)
+                self.iteration_stats.append(stats)
+                for hook in self._iteration_hooks:
+                    hook(stats)
+                
+                # A proven mate will not change with more depth
+                if abs(score) >= MATE_BOUND:
+                    break
+            
+            except SearchTimeoutError:
+                # Unwind the moves left on the board by the interrupted iteration
+                while len(board.move_history) > root_ply:
+                    board.undo_move()
+                for hook in self._timeout_hooks:
+                    hook(search_depth, time_manager.nodes)
+                
+                # Moves searched so far in the aborted iteration were searched
+                # deeper than the last completed one; keep the best of them
+                if self.root_best_move is not None:
+                    best_move = self.root_best_move
+                    best_score = self.root_best_score
+                    if not self.principal_variation or move_key(self.principal_variation[0]) != move_key(best_move):
+                        self.principal_variation = self._root_pv(best_move)
                 break
         
-        search_time = time.time() - start_time
-        print(f"Search completed: {self.nodes_searched} nodes in {search_time:.2f}s")
-        print(f"Nodes/sec: {self.nodes_searched / search_time:.0f}")
-        
         return best_move, best_score
     
-    def _minimax(self, board: ChessBoard, depth: int, alpha: float, beta: float, 
-                color: Color, start_time: float) -> Tuple[Optional[Move], float]:
+    def stop(self):
+        """Ask a running search (e.g. on another thread) to stop as soon as possible"""
+        self.time_manager.stop()
+    
+    def _iteration_info(self, depth: int, score: int, start_time: float) -> Dict[str, Any]:
+        """Build the info dict reported after an iteration"""
+        elapsed = time.time() - start_time
+        nodes = self.nodes_searched + self.search_stats['quiescence_nodes']
+        return {
+            'depth': depth,
+            'seldepth': max(depth, self.seldepth),
+            'score': score,
+            'nodes': nodes,
+            'nps': int(nodes / elapsed) if elapsed > 0 else 0,
+            'time': elapsed,
+            'pv': list(self.principal_variation),
+            'hashfull': self.transposition_table.hashfull()
+        }
+    
+    def _iteration_counters(self) -> Tuple:
+        """Counters that _iteration_stats turns into per-iteration statistics"""
+        stats = self.search_stats
+        table = self.transposition_table
+        timers = self.timers or (0.0, 0.0)
+        return (self.nodes_searched, stats['quiescence_nodes'], stats['cutoffs'],
+                stats['first_move_cutoffs'], table.hits, table.misses, stats['tt_stores'],
+                timers[0], timers[1])
+    
+    def _iteration_stats(self, depth: int, counters: Tuple, elapsed: float) -> IterationStats:
+        """
+        Statistics of a completed iteration
+        
+        Args:
+            depth: Depth of the iteration
+            counters: _iteration_counters() at the start of the iteration
+            elapsed: Duration of the iteration (seconds)
+        
+        Returns:
+            IterationStats of the iteration
+        """
+        (nodes, qnodes, cutoffs, first_move_cutoffs, hits, misses, stores,
+         movegen_time, eval_time) = [now - start for now, start in zip(self._iteration_counters(), counters)]
+        total_nodes = nodes + qnodes
+        
+        # Effective branching factor: growth of the tree over the previous iteration
+        previous_nodes = self.iteration_stats[-1].total_nodes if self.iteration_stats else 0
+        ebf = total_nodes / previous_nodes if previous_nodes else float(total_nodes)
+        
+        if self.timers is None:
+            movegen_time = eval_time = None
+            search_time = elapsed
+        else:
+            search_time = max(0.0, elapsed - movegen_time - eval_time)
+        
+        return IterationStats(
+            depth=depth,
+            seldepth=max(depth, self.seldepth),
+            nodes=nodes,
+            qnodes=qnodes,
+            total_nodes=total_nodes,
+            ebf=ebf,
+            first_move_cutoff_rate=first_move_cutoffs / cutoffs if cutoffs else 0.0,
+            tt_hit_rate=hits / (hits + misses) if hits + misses else 0.0,
+            tt_store_rate=stores / nodes if nodes else 0.0,
+            time=elapsed,
+            movegen_time=movegen_time,
+            eval_time=eval_time,
+            search_time=search_time
+        )
+    
+    def _root_pv(self, best_move: Move) -> List[Move]:
+        """PV of the triangular table if it belongs to best_move, else just best_move"""
+        pv = self.pv_table[0]
+        if pv and move_key(pv[0]) == move_key(best_move):
+            return list(pv)
+        return [best_move]
+    
+    def _extract_pv(self, board: ChessBoard, line: List[Move], max_length: int) -> List[Move]:
         """
-        Minimax algorithm with alpha-beta pruning
+        Complete a principal variation from the transposition table
+        
+        The triangular PV table loses the tail of a line below a table
+        cutoff; the best moves stored in the table continue it.
+        
+        Args:
+            board: Root position (restored before returning)
+            line: Known start of the PV (at least the best root move)
+            max_length: Maximum number of moves (extended lines are kept whole)
+        
+        Returns:
+            Principal variation starting with line
+        """
+        max_length = max(max_length, len(line))
+        pv = []
+        seen = set()
+        moves = iter(line)
+        move = next(moves, None)
+        while move is not None and len(pv) < max_length:
+            if not board.make_move(move):
+                break
+            pv.append(move)
+            if board.zobrist_key in seen:
+                break
+            seen.add(board.zobrist_key)
+            move = next(moves, None)
+            if move is None:
+                entry = self.transposition_table.peek(board.zobrist_key)
+                if entry is None and self.persistent_table is not None:
+                    entry = self.persistent_table.peek(board.zobrist_key)
+                move = self._find_move(board, move_key(entry.best_move)) if entry and entry.best_move else None
+        
+        for _ in pv:
+            board.undo_move()
+        return pv
+    
+    def _find_move(self, board: ChessBoard, key: int) -> Optional[Move]:
+        """
+        Legal move of the position with the given move key
+        
+        Table moves are only trusted after this check: they may come from a
+        hash collision, and the shared table stores squares only.
+        """
+        for legal_move in MoveGenerator(board).generate_legal_moves(board.current_player):
+            if move_key(legal_move) == key:
+                return legal_move
+        return None
+    
+    def _minimax(self, board: ChessBoard, depth: int, alpha: int, beta: int, 
+                color: Color, ply: int = 0, extensions: int = 0,
+                excluded_move: Optional[int] = None) -> Tuple[Optional[Move], int]:
+        """
+        Minimax algorithm with alpha-beta pruning (negamax form)
         
         Args:
             board: Current position
@@ -100,91 +580,309 @@ class MinimaxEngine:
             alpha: Alpha value for pruning
             beta: Beta value for pruning
             color: Color to move
-            start_time: Search start time
-            
+            ply: Distance from the root
+            extensions: Plies the line to this node has been extended by
+            excluded_move: Key of a move to skip (singular extension test)
+        
         Returns:
-            Tuple of (best_move, best_score)
+            Tuple of (best_move, best_score) from the perspective of color
         """
-        # Check time limit
-        if time.time() - start_time > self.time_limit:
-            raise TimeoutError("Time limit exceeded")
-        
         self.nodes_searched += 1
+        if ply > self.seldepth:
+            self.seldepth = ply
+        self.pv_table[ply] = []
+        
+        # Check time limit (the clock is only read every few nodes)
+        time_manager = self.time_manager
+        time_manager.nodes += 1
+        if time_manager.nodes >= time_manager.next_check:
+            for hook in self._node_sample_hooks:
+                hook(time_manager.nodes, ply)
+            if time_manager.check():
+                raise SearchTimeoutError("Time limit exceeded")
+        
+        if ply > 0:
+            # Repetitions and fifty-move positions are draws; cut the subtree
+            if board.halfmove_clock >= 100 or board.is_repetition(2):
+                self.search_stats['repetition_draws'] += 1
+                return None, DRAW_SCORE
+            
+            # Mate distance pruning: no line from here can beat a mate
+            # already found closer to the root
+            alpha = max(alpha, -MATE_SCORE + ply)
+            beta = min(beta, MATE_SCORE - ply - 1)
+            if alpha >= beta:
+                self.search_stats['mate_distance_prunes'] += 1
+                return None, alpha
+            
+            # Positions covered by the endgame tables have exact scores
+            if self.endgame_tables is not None:
+                table_score = self.endgame_tables.probe(board)
+                if table_score is not None:
+                    self.search_stats['endgame_table_hits'] += 1
+                    if table_score >= MATE_BOUND:
+                        table_score -= ply
+                    elif table_score <= -MATE_BOUND:
+                        table_score += ply
+                    return None, table_score
+        
+        if depth <= 0 or ply >= MAX_PLY:
+            return None, self._quiescence_search(board, alpha, beta, color, ply)
         
         # Get board hash for transposition table
         board_hash = self._get_board_hash(board)
-        
-        # Check for terminal positions
-        if depth == 0:
-            score = self._quiescence_search(board, alpha, beta, color, start_time)
-            # Store in transposition table even for depth 0
-            from .transposition import TranspositionEntry, NodeType
-            entry = TranspositionEntry(0, score, NodeType.EXACT, None)
-            self.transposition_table.put(board_hash, entry)
-            return None, score
+        original_alpha = alpha
         
         # Check transposition table
         tt_entry = self.transposition_table.get(board_hash)
-        if tt_entry and tt_entry.depth >= depth:
-            self.search_stats['transposition_hits'] += 1
-            return tt_entry.best_move, tt_entry.score
+        if tt_entry is None and self.persistent_table is not None:
+            tt_entry = self.persistent_table.get(board_hash)
+            if tt_entry is not None:
+                self.search_stats['persistent_hits'] += 1
+        if self._tt_probe_hooks:
+            for hook in self._tt_probe_hooks:
+                hook(board_hash, tt_entry, ply)
+        tt_move = tt_entry.best_move if tt_entry else None
+        if tt_entry and tt_entry.depth >= depth and ply > 0 and excluded_move is None:
+            tt_score = score_from_tt(tt_entry.score, ply)
+            if (tt_entry.node_type == NodeType.EXACT or
+                    (tt_entry.node_type == NodeType.LOWER_BOUND and tt_score >= beta) or
+                    (tt_entry.node_type == NodeType.UPPER_BOUND and tt_score <= alpha)):
+                self.search_stats['transposition_hits'] += 1
+                return tt_entry.best_move, tt_score
+        
+        # Frontier pruning: near the leaves, a static evaluation far outside
+        # the window decides the node without searching every move
+        config = self.config
+        futility_value = None
+        frontier_depth = max(len(config.reverse_futility_margins), len(config.futility_margins),
+                             len(config.razoring_margins))
+        if (ply > 0 and depth <= frontier_depth and excluded_move is None and not self.follow_pv
+                and not board.is_check(color)):
+            static_eval = self._static_eval(board, color, ply)
+            
+            # Mate bounds are never pruned against
+            margins = config.reverse_futility_margins
+            if (config.use_reverse_futility_pruning and depth <= len(margins) and beta < MATE_BOUND
+                    and static_eval - margins[depth - 1] >= beta):
+                self.search_stats['reverse_futility_prunes'] += 1
+                return None, static_eval
+            
+            if alpha > -MATE_BOUND:
+                margins = config.razoring_margins
+                if (config.use_razoring and depth <= len(margins)
+                        and static_eval + margins[depth - 1] <= alpha):
+                    score = self._quiescence_search(board, alpha, beta, color, ply)
+                    if score <= alpha:
+                        self.search_stats['razoring_prunes'] += 1
+                        return None, score
+                
+                margins = config.futility_margins
+                if (config.use_futility_pruning and depth <= len(margins)
+                        and static_eval + margins[depth - 1] <= alpha):
+                    futility_value = static_eval + margins[depth - 1]
+        
+        # Internal iterative deepening/reduction: without a table move the
+        # move ordering is poor, so either find one with a shallower search
+        # or spend less on the node (its next visit will have a move)
+        if (tt_move is None and ply > 0 and depth >= config.internal_iterative_depth
+                and excluded_move is None and not self.follow_pv):
+            if config.internal_iterative_mode == "deepening":
+                self.search_stats['iid_searches'] += 1
+                tt_move, _ = self._minimax(board, depth - 2, alpha, beta, color, ply, extensions)
+                self.pv_table[ply] = []
+            elif config.internal_iterative_mode == "reduction":
+                self.search_stats['iir_reductions'] += 1
+                depth -= 1
         
         # Generate legal moves
         moves = self.move_generator.generate_legal_moves(color)
         if not moves:
             # No legal moves - checkmate or stalemate
             if board.is_check(color):
-                return None, float('-inf') if color == board.current_player else float('inf')
+                return None, -MATE_SCORE + ply
+            return None, DRAW_SCORE
+        
+        # The previous iteration's PV move is searched first along the PV
+        pv_move = None
+        if self.follow_pv:
+            if ply < len(self.previous_pv):
+                pv_move = self.previous_pv[ply]
             else:
-                return None, 0.0  # Stalemate
+                self.follow_pv = False
         
         # Order moves for better pruning
-        moves = self._order_moves(moves, board)
+        moves = self._order_moves(moves, board, tt_move, ply, pv_move)
         
+        opponent = Color.BLACK if color == Color.WHITE else Color.WHITE
         best_move = None
-        best_score = float('-inf') if color == board.current_player else float('inf')
+        best_score = -INFINITE_SCORE
         
-        for move in moves:
+        excluded = self.excluded_root_moves if ply == 0 else None
+        if excluded_move is not None:
+            excluded = {excluded_move}
+        
+        # A table move much better than every alternative is singular and
+        # searched one ply deeper
+        singular_key = None
+        if (self.config.use_singular_extensions and tt_entry is not None
+                and tt_entry.best_move is not None and ply > 0
+                and excluded is None and not self.follow_pv
+                and extensions < self.config.extension_budget
+                and self._is_singular(board, tt_entry, depth, color, ply, extensions)):
+            singular_key = move_key(tt_entry.best_move)
+        
+        for move_index, move in enumerate(moves):
+            if excluded and move_key(move) in excluded:
+                continue
+            
+            # Only the first move of a PV node continues the previous PV
+            if self.follow_pv and (pv_move is None or move_index > 0 or
+                                   move_key(move) != move_key(pv_move)):
+                self.follow_pv = False
+            
+            # Recaptures are detected before the move changes the history
+            recapture = (move.is_capture and board.move_history
+                         and board.move_history[-1].is_capture
+                         and board.move_history[-1].to_square == move.to_square)
+            
             # Make move
             if not board.make_move(move):
                 continue
+            gives_check = board.is_check(opponent)
+            
+            # Futility pruning: a quiet move cannot lift a hopeless
+            # evaluation up to alpha
+            if (futility_value is not None and not move.is_capture
+                    and not move.promotion and not gives_check):
+                board.undo_move()
+                self.search_stats['futility_prunes'] += 1
+                best_score = max(best_score, futility_value)
+                continue
+            
+            extension = 0
+            if extensions < config.extension_budget:
+                extension = self._extension(move, gives_check, recapture,
+                                            singular_key is not None and move_key(move) == singular_key)
             
             # Recursive search
             _, score = self._minimax(
-                board, depth - 1, alpha, beta, 
-                Color.BLACK if color == Color.WHITE else Color.WHITE, start_time
+                board, depth - 1 + extension, -beta, -alpha, opponent, ply + 1,
+                extensions + extension
             )
+            score = -score
             
             # Undo move
             board.undo_move()
             
             # Update best move and score
-            if color == board.current_player:
-                if score > best_score:
-                    best_score = score
-                    best_move = move
-                    alpha = max(alpha, score)
-            else:
-                if score < best_score:
-                    best_score = score
-                    best_move = move
-                    beta = min(beta, score)
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self.pv_table[ply] = [move] + self.pv_table[ply + 1]
+                    if ply == 0:
+                        self.root_best_move = move
+                        self.root_best_score = score
             
             # Alpha-beta pruning
-            if beta <= alpha:
+            if alpha >= beta:
                 self.search_stats['cutoffs'] += 1
+                if move_index == 0:
+                    self.search_stats['first_move_cutoffs'] += 1
+                if self._cutoff_hooks:
+                    for hook in self._cutoff_hooks:
+                        hook(ply, depth, move, move_index)
+                if not move.is_capture and not move.promotion:
+                    self.update_killer_moves(move, ply)
+                    self.update_history(move, depth)
+                    if board.move_history:
+                        self.countermoves[move_key(board.move_history[-1]) & 4095] = move_key(move)
                 break
         
         # Store in transposition table
-        from .transposition import TranspositionEntry, NodeType
-        node_type = NodeType.EXACT  # Simplified - should determine based on alpha/beta bounds
-        entry = TranspositionEntry(depth, best_score, node_type, best_move)
-        self.transposition_table.put(board_hash, entry)
+        if best_score <= original_alpha:
+            node_type = NodeType.UPPER_BOUND
+        elif best_score >= beta:
+            node_type = NodeType.LOWER_BOUND
+        else:
+            node_type = NodeType.EXACT
+        # A root searched with excluded moves has no valid score for the position
+        if not excluded:
+            entry = TranspositionEntry(depth, score_to_tt(best_score, ply), node_type, best_move)
+            self.transposition_table.put(board_hash, entry)
+            self.search_stats['tt_stores'] += 1
         
         return best_move, best_score
     
-    def _quiescence_search(self, board: ChessBoard, alpha: float, beta: float, 
-                          color: Color, start_time: float) -> float:
+    def _is_singular(self, board: ChessBoard, tt_entry: TranspositionEntry, depth: int,
+                     color: Color, ply: int, extensions: int) -> bool:
+        """
+        Test whether the table move is the only good move of a node
+        
+        Every other move is searched at reduced depth against a bound
+        below the table score; if none reaches it, the table move is
+        singular.
+        
+        Args:
+            board: Current position
+            tt_entry: Table entry of the position (with a best move)
+            depth: Remaining search depth of the node
+            color: Color to move
+            ply: Distance from the root
+            extensions: Plies the line to this node has been extended by
+        
+        Returns:
+            True if the table move should be extended
+        """
+        if (depth < self.config.singular_extension_depth or tt_entry.depth < depth - 3
+                or tt_entry.node_type == NodeType.UPPER_BOUND):
+            return False
+        tt_score = score_from_tt(tt_entry.score, ply)
+        if abs(tt_score) >= MATE_BOUND:
+            return False
+        
+        singular_beta = tt_score - self.config.singular_margin * depth
+        _, score = self._minimax(board, (depth - 1) // 2, singular_beta - 1, singular_beta,
+                                 color, ply, extensions, move_key(tt_entry.best_move))
+        return score < singular_beta
+    
+    def _extension(self, move: Move, gives_check: bool, recapture: bool, singular: bool) -> int:
+        """
+        Plies to extend the search of a move by
+        
+        Args:
+            move: Move to search
+            gives_check: The move checks the opponent
+            recapture: The move recaptures on the square of the previous capture
+            singular: The move is the singular table move
+        
+        Returns:
+            1 if the move is extended, 0 otherwise
+        """
+        config = self.config
+        stats = self.search_stats
+        if config.use_check_extensions and gives_check:
+            stats['check_extensions'] += 1
+            return 1
+        if config.use_singular_extensions and singular:
+            stats['singular_extensions'] += 1
+            return 1
+        if config.use_recapture_extensions and recapture:
+            stats['recapture_extensions'] += 1
+            return 1
+        # A pawn reaching the seventh rank (rank index 1 for white, 6 for
+        # black) has no pawn left in front of it and threatens to promote
+        if (config.use_passed_pawn_extensions and move.piece_type == PieceType.PAWN
+                and not move.promotion
+                and move.to_square[1] == (1 if move.color == Color.WHITE else 6)):
+            stats['passed_pawn_extensions'] += 1
+            return 1
+        return 0
+    
+    def _quiescence_search(self, board: ChessBoard, alpha: int, beta: int, 
+                          color: Color, ply: int = 0) -> int:
         """
         Quiescence search to handle tactical positions
         
@@ -193,19 +891,27 @@ class MinimaxEngine:
             alpha: Alpha value
             beta: Beta value
             color: Color to move
-            start_time: Search start time
-            
+            ply: Distance from the root
+        
         Returns:
             Evaluation score
         """
         self.search_stats['quiescence_nodes'] += 1
+        if ply > self.seldepth:
+            self.seldepth = ply
+        if ply <= MAX_PLY:
+            self.pv_table[ply] = []
         
         # Check time limit
-        if time.time() - start_time > self.time_limit:
-            raise TimeoutError("Time limit exceeded")
+        time_manager = self.time_manager
+        time_manager.nodes += 1
+        if time_manager.nodes >= time_manager.next_check:
+            for hook in self._node_sample_hooks:
+                hook(time_manager.nodes, ply)
+            if time_manager.check():
+                raise SearchTimeoutError("Time limit exceeded")
         
-        # Get static evaluation
-        static_eval = self.evaluation_engine.evaluate(board, color)
+        static_eval = self._static_eval(board, color, ply)
         
         # Stand pat if static evaluation is good enough
         if static_eval >= beta:
@@ -213,15 +919,18 @@ class MinimaxEngine:
         if static_eval > alpha:
             alpha = static_eval
         
+        if ply >= MAX_PLY:
+            return alpha
+        
         # Generate only capture moves
         moves = self._generate_capture_moves(board, color)
+        opponent = Color.BLACK if color == Color.WHITE else Color.WHITE
         
         for move in moves:
             if not board.make_move(move):
                 continue
             
-            score = -self._quiescence_search(board, -beta, -alpha, 
-                                           Color.BLACK if color == Color.WHITE else Color.WHITE, start_time)
+            score = -self._quiescence_search(board, -beta, -alpha, opponent, ply + 1)
             
             board.undo_move()
             
@@ -232,44 +941,82 @@ class MinimaxEngine:
         
         return alpha
     
+    def _static_eval(self, board: ChessBoard, color: Color, ply: int) -> int:
+        """
+        Static evaluation of a node from the perspective of color
+        
+        Mates found by the evaluator are relative to the node; they are
+        made relative to the root like search scores.
+        """
+        static_eval = self.evaluation_engine.evaluate(board, color)
+        if static_eval <= -MATE_BOUND:
+            static_eval += ply
+        elif static_eval >= MATE_BOUND:
+            static_eval -= ply
+        return static_eval
+    
     def _generate_capture_moves(self, board: ChessBoard, color: Color) -> List[Move]:
         """Generate only capture moves for quiescence search"""
         moves = self.move_generator.generate_legal_moves(color)
         return [move for move in moves if move.is_capture]
     
-    def _order_moves(self, moves: List[Move], board: ChessBoard) -> List[Move]:
+    def _order_moves(self, moves: List[Move], board: ChessBoard,
+                     tt_move: Optional[Move] = None, ply: int = 0,
+                     pv_move: Optional[Move] = None) -> List[Move]:
         """
         Order moves for better alpha-beta pruning
         
+        Order: previous PV move, TT move, captures (MVV-LVA), promotions,
+        killers, countermove, then quiet moves by history score.
+        
         Args:
             moves: List of moves to order
             board: Current board position
-            
+            tt_move: Best move stored in the transposition table
+            ply: Distance from the root (selects the killer slots)
+            pv_move: Move of the previous iteration's PV at this ply
+        
         Returns:
             Ordered list of moves
         """
+        pv_key = move_key(pv_move) if pv_move else -1
+        tt_key = move_key(tt_move) if tt_move else -1
+        killer1, killer2 = self.killer_moves[ply] if ply < MAX_PLY else (0, 0)
+        countermove = self.countermoves[move_key(board.move_history[-1]) & 4095] if board.move_history else 0
+        history = self.history_table
+        history_offset = 0 if board.current_player == Color.WHITE else 4096
+        jitter = self.order_jitter
+        
         def move_priority(move):
-            priority = 0
+            key = move_key(move)
+            if key == pv_key:
+                return PV_MOVE_PRIORITY
+            if key == tt_key:
+                return TT_MOVE_PRIORITY
             
             # MVV-LVA (Most Valuable Victim - Least Valuable Attacker)
-            if move.is_capture:
-                victim_value = self._get_piece_value(move.piece_type)
-                attacker_value = self._get_piece_value(move.piece_type)
-                priority += 1000 + victim_value - attacker_value
-            
-            # Killer moves
-            if move in self.killer_moves.get(board.current_player, []):
-                priority += 100
-            
-            # History heuristic
-            history_key = (move.from_square, move.to_square)
-            priority += self.history_table.get(history_key, 0)
+            if move.is_capture or move.is_en_passant:
+                victim = board.get_piece(move.to_square)
+                victim_value = self._get_piece_value(victim.piece_type) if not victim.empty else 100
+                return CAPTURE_PRIORITY + victim_value * 10 - self._get_piece_value(move.piece_type) // 10
             
             # Promotion
             if move.promotion:
-                priority += 500
+                return PROMOTION_PRIORITY + self._get_piece_value(move.promotion)
             
-            return priority
+            # Killer moves
+            if key == killer1:
+                return KILLER_PRIORITY + 1
+            if key == killer2:
+                return KILLER_PRIORITY
+            
+            if key == countermove:
+                return COUNTERMOVE_PRIORITY
+            
+            # History heuristic
+            if jitter is not None:
+                return history[history_offset + (key & 4095)] + jitter.randrange(ORDER_JITTER)
+            return history[history_offset + (key & 4095)]
         
         return sorted(moves, key=move_priority, reverse=True)
     
@@ -286,37 +1033,218 @@ class MinimaxEngine:
         return values.get(piece_type.name, 0)
     
     def _get_board_hash(self, board: ChessBoard) -> int:
-        """Get board hash for transposition table"""
-        from .zobrist import zobrist
-        return zobrist.hash_position(board)
+        """Get board hash for transposition table (maintained incrementally by the board)"""
+        return board.zobrist_key
     
-    def update_killer_moves(self, move: Move, color: Color):
-        """Update killer moves for move ordering"""
-        if color not in self.killer_moves:
-            self.killer_moves[color] = []
+    def update_killer_moves(self, move: Move, ply: int):
+        """Update the two killer move slots of a ply"""
+        if ply >= MAX_PLY:
+            return
         
-        if move not in self.killer_moves[color]:
-            self.killer_moves[color].insert(0, move)
-            if len(self.killer_moves[color]) > 2:
-                self.killer_moves[color].pop()
+        key = move_key(move)
+        killers = self.killer_moves[ply]
+        if killers[0] != key:
+            killers[1] = killers[0]
+            killers[0] = key
     
     def update_history(self, move: Move, depth: int):
         """Update history table for move ordering"""
-        history_key = (move.from_square, move.to_square)
-        self.history_table[history_key] = self.history_table.get(history_key, 0) + depth * depth
+        index = (0 if move.color == Color.WHITE else 4096) + (move_key(move) & 4095)
+        self.history_table[index] += depth * depth
+        
+        # Keep history below the killer/countermove priorities
+        if self.history_table[index] > HISTORY_MAX:
+            self.history_table = [value >> 1 for value in self.history_table]
+    
+    def _age_move_ordering(self):
+        """Age history between searches and forget the previous killers"""
+        self.history_table = [value >> 1 for value in self.history_table]
+        for killers in self.killer_moves:
+            killers[0] = killers[1] = 0
+    
+    def _table_size(self, entry_bytes: int) -> int:
+        """Transposition table entries for the Hash budget (or the configured size)"""
+        if self.hash_megabytes is None:
+            return self.config.transposition_table_size
+        return entries_for_megabytes(self.hash_megabytes, entry_bytes)
+    
+    def set_hash_size(self, megabytes: int):
+        """Resize the transposition table to a memory budget, keeping recent entries"""
+        self.hash_megabytes = megabytes
+        table = self.transposition_table
+        table.resize(self._table_size(table.ENTRY_BYTES))
+    
+    def set_threads(self, threads: int):
+        """
+        Set the number of search workers
+        
+        More than one worker switches to Lazy SMP, which needs the
+        transposition table in shared memory.
+        """
+        self.threads = max(1, threads)
+        shared = isinstance(self.transposition_table, SharedTranspositionTable)
+        if self.threads > 1 and not shared:
+            self.transposition_table = SharedTranspositionTable(
+                self._table_size(SharedTranspositionTable.ENTRY_BYTES))
+        elif self.threads == 1 and shared:
+            self.transposition_table.close()
+            self.transposition_table = LRUTranspositionTable(
+                self._table_size(LRUTranspositionTable.ENTRY_BYTES))
+    
+    def open_persistent_table(self, path: str):
+        """
+        Memory-map a table file as second-level transposition table
+        
+        Args:
+            path: Table file (see persistent_tt.compact_table)
+        """
+        if self.persistent_table is not None:
+            self.persistent_table.close()
+        self.persistent_table = PersistentTranspositionTable(path)
+    
+    def open_opening_book(self, path: Optional[str]):
+        """
+        Memory-map a Polyglot opening book consulted before every search
+        
+        Args:
+            path: Polyglot .bin file, or None to stop using a book
+        """
+        if self.opening_book is not None:
+            self.opening_book.close()
+            self.opening_book = None
+        if path:
+            self.opening_book = PolyglotBook(path)
+    
+    def open_endgame_tables(self, path: Optional[str]):
+        """
+        Memory-map the endgame tables of a directory for the search and evaluation
+        
+        Args:
+            path: Directory of table files (see endgame.generator), or None
+                  to stop using tables
+        
+        Raises:
+            ValueError: If a table file of the directory is not valid
+        """
+        if self.endgame_tables is not None:
+            self.endgame_tables.close()
+            self.endgame_tables = None
+        if path:
+            self.endgame_tables = EndgameTables(path)
+        self.evaluation_engine.endgame_tables = self.endgame_tables
+        # Search workers build their engines from the config
+        self.config.endgame_tables_path = path or None
+    
+    def save_deep_results(self, path: Optional[str] = None, min_depth: Optional[int] = None) -> int:
+        """
+        Append the deep entries of the last search to a table file's journal
+        
+        The entries reach the table file at the next compaction.
+        
+        Args:
+            path: Table file (defaults to the open persistent table)
+            min_depth: Minimum depth (defaults to config.persistent_table_min_depth)
+        
+        Returns:
+            Number of entries appended
+        """
+        if path is None:
+            if self.persistent_table is None:
+                return 0
+            path = self.persistent_table.path
+        if min_depth is None:
+            min_depth = self.config.persistent_table_min_depth
+        
+        table = self.transposition_table
+        age = table.current_age & 0xFF
+        entries = ((key, entry) for key, entry in table.items() if entry.age & 0xFF == age)
+        return append_deep_results(path, entries, min_depth)
+    
+    def add_hook(self, hooks: SearchHooks):
+        """
+        Register instrumentation hooks
+        
+        Args:
+            hooks: SearchHooks subclass instance; only the events it
+                   overrides are called
+        """
+        self.hooks.append(hooks)
+        self._update_hooks()
+    
+    def remove_hook(self, hooks: SearchHooks):
+        """Unregister hooks added with add_hook"""
+        self.hooks.remove(hooks)
+        self._update_hooks()
+    
+    def _update_hooks(self):
+        """Rebuild the per-event hook tuples and install or remove timing"""
+        events = {}
+        for hooks in self.hooks:
+            for event, method in overridden_events(hooks).items():
+                events.setdefault(event, []).append(method)
+        self._iteration_hooks = tuple(events.get('on_iteration', ()))
+        self._node_sample_hooks = tuple(events.get('on_node_sample', ()))
+        self._cutoff_hooks = tuple(events.get('on_cutoff', ()))
+        self._tt_probe_hooks = tuple(events.get('on_tt_probe', ()))
+        self._timeout_hooks = tuple(events.get('on_timeout', ()))
+        
+        # Timing wraps the evaluator's (and each search's move generator's)
+        # methods on the instance, so the search itself is unchanged
+        measure_time = any(hooks.measure_time for hooks in self.hooks)
+        if measure_time and self.timers is None:
+            self.timers = [0.0, 0.0]
+            self.evaluation_engine.evaluate = self._timed(self.evaluation_engine.evaluate, 1)
+        elif not measure_time and self.timers is not None:
+            self.timers = None
+            vars(self.evaluation_engine).pop('evaluate', None)
+    
+    def _timed(self, function: Callable, index: int) -> Callable:
+        """Wrap function to add its running time to self.timers[index]"""
+        timers = self.timers
+        perf_counter = time.perf_counter
+        
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            result = function(*args, **kwargs)
+            timers[index] += perf_counter() - start
+            return result
+        return timed
     
     def clear_tables(self):
         """Clear transposition and history tables"""
         self.transposition_table.clear()
-        self.killer_moves.clear()
-        self.history_table.clear()
+        self.killer_moves = [[0, 0] for _ in range(MAX_PLY)]
+        self.history_table = [0] * 8192
+        self.countermoves = [0] * 4096
     
     def get_search_stats(self) -> Dict[str, Any]:
         """Get search statistics"""
+        table = self.transposition_table
+        table_hits = table.hits - self.table_counters[0]
+        reused_hits = table.reused_hits - self.table_counters[1]
         return {
             'nodes_searched': self.nodes_searched,
             'cutoffs': self.search_stats['cutoffs'],
+            'first_move_cutoff_rate': (self.search_stats['first_move_cutoffs'] / self.search_stats['cutoffs']
+                                       if self.search_stats['cutoffs'] else 0.0),
             'transposition_hits': self.search_stats['transposition_hits'],
             'quiescence_nodes': self.search_stats['quiescence_nodes'],
-            'transposition_size': self.transposition_table.get_stats()['size']
+            'repetition_draws': self.search_stats['repetition_draws'],
+            'mate_distance_prunes': self.search_stats['mate_distance_prunes'],
+            'persistent_hits': self.search_stats['persistent_hits'],
+            'check_extensions': self.search_stats['check_extensions'],
+            'recapture_extensions': self.search_stats['recapture_extensions'],
+            'passed_pawn_extensions': self.search_stats['passed_pawn_extensions'],
+            'singular_extensions': self.search_stats['singular_extensions'],
+            'reverse_futility_prunes': self.search_stats['reverse_futility_prunes'],
+            'futility_prunes': self.search_stats['futility_prunes'],
+            'razoring_prunes': self.search_stats['razoring_prunes'],
+            'iid_searches': self.search_stats['iid_searches'],
+            'iir_reductions': self.search_stats['iir_reductions'],
+            'tt_stores': self.search_stats['tt_stores'],
+            'endgame_table_hits': self.search_stats['endgame_table_hits'],
+            'iterations': [stats.to_dict() for stats in self.iteration_stats],
+            'helper_nodes': self.helper_nodes,
+            'transposition_size': table.get_stats()['size'],
+            'transposition_reuse_rate': reused_hits / table_hits if table_hits else 0.0
         }
\ No newline at end of file
@@ -0,0 +1,276 @@
+"""
+Persistent Transposition Table
+
+This module implements:
+- A read-only second-level transposition table memory-mapped from a file,
+  probed after the in-memory table misses
+- A journal of deep search results (entries at or above a minimum depth)
+  that searches append to while the table file is in use
+- Compaction: merging the journal into a new table file that replaces the
+  old one atomically
+
+Table file layout (native byte order): a 16-byte header (magic, version,
+entry count), the sorted 64-bit position keys, then the 64-bit data words
+in the same order (see shared_tt.encode_entry). Opening maps the file
+without reading it, and a probe is a binary search over the key block, so
+startup cost does not grow with the file. Journal files are plain
+(key, data) word pairs.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left
+from typing import Optional, Dict, Any, Iterable, Iterator, Tuple
+from .transposition import TranspositionEntry
+from .shared_tt import encode_entry, decode_entry, DEPTH_SHIFT, KEY_MASK
+
+TABLE_MAGIC = b"CETT"
+TABLE_VERSION = 1
+HEADER = struct.Struct("<4sIQ")
+JOURNAL_SUFFIX = ".journal"
+
+# Only results of at least this depth are worth keeping on disk
+DEFAULT_MIN_DEPTH = 4
+
+def journal_path(path: str) -> str:
+    """Journal file collecting new deep results for the table file at path"""
+    return path + JOURNAL_SUFFIX
+
+def _entry_depth(data: int) -> int:
+    """Depth stored in a data word"""
+    return (data >> DEPTH_SHIFT) & 0xFF
+
+class PersistentTranspositionTable:
+    """
+    Read-only transposition table backed by a memory-mapped file
+    
+    A missing or empty file gives an empty table, so a service can be
+    configured with a path before the first compaction created it.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Initialize persistent transposition table
+        
+        Args:
+            path: Table file written by write_table or compact_table
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._mmap = None
+        self._words = None
+        self.keys = ()
+        self.data = ()
+        self.mtime = None
+        self._open()
+    
+    def _open(self):
+        """Map the table file (if any)"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        self.mtime = stat.st_mtime_ns
+        if stat.st_size == 0:
+            return
+        
+        with open(self.path, 'rb') as table_file:
+            self._mmap = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != TABLE_MAGIC or version != TABLE_VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a transposition table file")
+        if stat.st_size != HEADER.size + count * 16:
+            self.close()
+            raise ValueError(f"{self.path} is truncated")
+        
+        self._words = memoryview(self._mmap).cast('Q')
+        start = HEADER.size // 8
+        self.keys = self._words[start:start + count]
+        self.data = self._words[start + count:start + 2 * count]
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def get(self, key: int) -> Optional[TranspositionEntry]:
+        """
+        Get entry from table
+        
+        Args:
+            key: Position hash
+        
+        Returns:
+            TranspositionEntry if found, None otherwise
+        """
+        entry = self.peek(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+    
+    def peek(self, key: int) -> Optional[TranspositionEntry]:
+        """Get entry without touching statistics"""
+        keys = self.keys
+        key &= KEY_MASK
+        index = bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            return decode_entry(self.data[index])
+        return None
+    
+    def items(self) -> Iterator[Tuple[int, TranspositionEntry]]:
+        """Iterate over the (key, entry) pairs of the file"""
+        for key, data in zip(self.keys, self.data):
+            yield key, decode_entry(data)
+    
+    def refresh(self) -> bool:
+        """
+        Remap the file if a compaction replaced it
+        
+        Returns:
+            True if the table was reloaded
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self.mtime:
+            return False
+        
+        self.close()
+        self._open()
+        return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get persistent table statistics"""
+        total_accesses = self.hits + self.misses
+        return {
+            'path': self.path,
+            'size': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total_accesses if total_accesses > 0 else 0
+        }
+    
+    def close(self):
+        """Unmap the file"""
+        if isinstance(self.keys, memoryview):
+            self.keys.release()
+            self.data.release()
+        if self._words is not None:
+            self._words.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._mmap = None
+        self._words = None
+        self.keys = ()
+        self.data = ()
+        self.mtime = None
+
+def write_table(path: str, records: Dict[int, int]):
+    """
+    Write a table file
+    
+    The file is written next to path and renamed over it, so processes
+    that have the old file mapped keep reading a consistent table.
+    
+    Args:
+        path: Table file
+        records: Data word of every position key
+    """
+    keys = array('Q', sorted(records))
+    data = array('Q', (records[key] for key in keys))
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(handle, 'wb') as table_file:
+            table_file.write(HEADER.pack(TABLE_MAGIC, TABLE_VERSION, len(keys)))
+            keys.tofile(table_file)
+            data.tofile(table_file)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def append_deep_results(path: str, entries: Iterable[Tuple[int, TranspositionEntry]],
+                        min_depth: int = DEFAULT_MIN_DEPTH) -> int:
+    """
+    Append the deep entries of a search to the journal of a table file
+    
+    Args:
+        path: Table file (the journal is journal_path(path))
+        entries: (key, entry) pairs, e.g. transposition_table.items()
+        min_depth: Minimum depth of the entries kept
+    
+    Returns:
+        Number of entries appended
+    """
+    words = array('Q')
+    for key, entry in entries:
+        if entry.depth >= min_depth:
+            words.append(key & KEY_MASK)
+            words.append(encode_entry(entry))
+    
+    if words:
+        with open(journal_path(path), 'ab') as journal_file:
+            words.tofile(journal_file)
+    return len(words) // 2
+
+def _read_journal(path: str) -> Iterator[Tuple[int, int]]:
+    """(key, data) pairs of a journal file, oldest first"""
+    words = array('Q')
+    with open(path, 'rb') as journal_file:
+        content = journal_file.read()
+    # A partial record at the end comes from an interrupted append
+    words.frombytes(content[:len(content) // 16 * 16])
+    return zip(words[0::2], words[1::2])
+
+def compact_table(path: str, min_depth: int = DEFAULT_MIN_DEPTH) -> Dict[str, int]:
+    """
+    Merge the journal of a table file into the table
+    
+    For every position the deepest result is kept; at equal depth the
+    newer one wins. Entries below min_depth are dropped from the table too,
+    so raising min_depth shrinks the file.
+    
+    Args:
+        path: Table file (created if it does not exist yet)
+        min_depth: Minimum depth of the entries kept
+    
+    Returns:
+        Dictionary with the number of table entries before and after and
+        the number of journal records merged
+    """
+    table = PersistentTranspositionTable(path)
+    try:
+        records = {key: data for key, data in zip(table.keys, table.data)
+                   if _entry_depth(data) >= min_depth}
+        previous_size = len(table)
+    finally:
+        table.close()
+    
+    # Searches keep appending to a fresh journal while this one is merged
+    journal = journal_path(path) + ".compacting"
+    if os.path.exists(journal_path(path)):
+        os.replace(journal_path(path), journal)
+    merged = 0
+    if os.path.exists(journal):
+        for key, data in _read_journal(journal):
+            merged += 1
+            if _entry_depth(data) < min_depth:
+                continue
+            existing = records.get(key)
+            if existing is None or _entry_depth(data) >= _entry_depth(existing):
+                records[key] = data
+    
+    write_table(path, records)
+    if os.path.exists(journal):
+        os.remove(journal)
+    
+    return {'previous_size': previous_size, 'size': len(records), 'merged': merged}
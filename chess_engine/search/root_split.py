@@ -0,0 +1,172 @@
+"""
+Root-Split Parallel Search
+
+This module implements:
+- A quick serial depth-1 pass that scores and orders the root moves
+- Distribution of the root moves over a ProcessPoolExecutor, one task per move
+- A shared alpha bound (the K-th best exact score found so far) so moves
+  searched later only need to prove they are not among the best K
+- Merging of the results into per-move scores (MultiPV)
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Any
+from ..board.board import ChessBoard, Move, Color
+from ..board.move_generator import MoveGenerator
+from ..exceptions import SearchTimeoutError
+from .transposition import NodeType, INFINITE_SCORE, move_key
+
+@dataclass
+class RootMoveScore:
+    """Search result of one root move"""
+    move: Move
+    score: int
+    depth: int
+    bound: NodeType = NodeType.EXACT
+
+class _RootWorker:
+    """Searches root moves of one position (one instance per pool process)"""
+    
+    def __init__(self, board: ChessBoard, config: Any, bounds):
+        """
+        Initialize root worker
+        
+        Args:
+            board: Root position
+            config: SearchConfig of the calling engine
+            bounds: Shared array holding the best K exact scores found so far
+        """
+        from .minimax import MinimaxEngine
+        
+        self.board = board
+        self.bounds = bounds
+        self.engine = MinimaxEngine(time_limit=None, config=config)
+        self.engine.move_generator = MoveGenerator(board)
+    
+    def alpha(self) -> int:
+        """Score a move must beat to enter the best K"""
+        return min(self.bounds)
+    
+    def report_exact(self, score: int):
+        """Insert an exact score into the shared best-K scores"""
+        with self.bounds.get_lock():
+            slot = min(range(len(self.bounds)), key=self.bounds.__getitem__)
+            if score > self.bounds[slot]:
+                self.bounds[slot] = score
+    
+    def search_move(self, key: int, depth: int,
+                    deadline: Optional[float]) -> Tuple[int, Optional[int], int, NodeType, int]:
+        """
+        Search one root move with iterative deepening
+        
+        Returns:
+            Tuple of (move_key, score, depth, bound, nodes); score is None if
+            the deadline passed before the first iteration finished, and is an
+            upper bound if it did not beat the shared alpha bound.
+        """
+        engine = self.engine
+        board = self.board
+        move = engine._find_move(board, key)
+        time_limit = max(0.001, deadline - time.time()) if deadline is not None else None
+        engine.time_manager.start(time_limit)
+        engine.nodes_searched = 0
+        opponent = Color.BLACK if board.current_player == Color.WHITE else Color.WHITE
+        root_ply = len(board.move_history)
+        
+        score = None
+        completed_depth = 0
+        bound = NodeType.EXACT
+        board.make_move(move)
+        try:
+            for current_depth in range(1, depth):
+                alpha = self.alpha()
+                _, child_score = engine._minimax(
+                    board, current_depth, -INFINITE_SCORE, -alpha, opponent, 1
+                )
+                score = -child_score
+                completed_depth = current_depth + 1
+                bound = NodeType.EXACT if score > alpha else NodeType.UPPER_BOUND
+        except SearchTimeoutError:
+            pass
+        finally:
+            while len(board.move_history) > root_ply:
+                board.undo_move()
+        
+        if score is not None and bound == NodeType.EXACT:
+            self.report_exact(score)
+        return key, score, completed_depth, bound, engine.nodes_searched
+
+_worker: Optional[_RootWorker] = None
+
+def _init_worker(board: ChessBoard, config: Any, bounds):
+    """Pool initializer: build the worker of this process"""
+    global _worker
+    _worker = _RootWorker(board, config, bounds)
+
+def _search_root_move(key: int, depth: int, deadline: Optional[float]):
+    """Pool task: search one root move"""
+    return _worker.search_move(key, depth, deadline)
+
+def root_split_search(engine, board: ChessBoard, depth: int, multipv: Optional[int] = None,
+                      processes: int = 1, time_limit: Optional[float] = None) -> List[RootMoveScore]:
+    """
+    Score the root moves of a position in parallel
+    
+    Args:
+        engine: Calling MinimaxEngine (runs the ordering pass)
+        board: Current chess position
+        depth: Search depth of every root move
+        multipv: Number of moves that need exact scores (None for all)
+        processes: Pool size (1 searches in the calling process)
+        time_limit: Time limit for the whole search in seconds
+    
+    Returns:
+        Root moves sorted from best to worst; moves outside the best
+        multipv carry UPPER_BOUND scores
+    """
+    deadline = time.time() + time_limit if time_limit is not None else None
+    
+    # Serial ordering pass: every move scored by quiescence search
+    engine.move_generator = MoveGenerator(board)
+    engine.time_manager.start(None)
+    opponent = Color.BLACK if board.current_player == Color.WHITE else Color.WHITE
+    results = {}
+    for move in engine.move_generator.generate_legal_moves(board.current_player):
+        if not board.make_move(move):
+            continue
+        score = -engine._quiescence_search(board, -INFINITE_SCORE, INFINITE_SCORE, opponent, 1)
+        board.undo_move()
+        results[move_key(move)] = RootMoveScore(move, score, 1)
+    
+    ordered = sorted(results.values(), key=lambda result: result.score, reverse=True)
+    if depth <= 1 or not ordered:
+        return ordered
+    
+    context = multiprocessing.get_context()
+    count = len(ordered) if multipv is None else max(1, min(multipv, len(ordered)))
+    bounds = context.Array('q', [-INFINITE_SCORE] * count)
+    
+    def merge(key, score, searched_depth, bound, nodes):
+        engine.helper_nodes += nodes
+        if score is not None:
+            results[key] = RootMoveScore(results[key].move, score, searched_depth, bound)
+    
+    if processes <= 1:
+        worker = _RootWorker(board.copy(), engine.config, bounds)
+        for result in ordered:
+            merge(*worker.search_move(move_key(result.move), depth, deadline))
+    else:
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                                 initializer=_init_worker,
+                                 initargs=(board, engine.config, bounds)) as pool:
+            futures = [pool.submit(_search_root_move, move_key(result.move), depth, deadline)
+                       for result in ordered]
+            for future in as_completed(futures):
+                merge(*future.result())
+    
+    # Exact scores rank before upper bounds of the same value
+    return sorted(results.values(), key=lambda result: (result.score, result.bound == NodeType.EXACT),
+                  reverse=True)
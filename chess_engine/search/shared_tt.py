@@ -0,0 +1,256 @@
+"""
+Shared-Memory Transposition Table
+
+This module implements:
+- A transposition table in multiprocessing.shared_memory usable by several
+  processes at once (Lazy SMP)
+- Lock-free access with XOR-validated entries: every slot stores
+  ``key ^ data`` and ``data``, so a slot torn by two concurrent writers
+  fails validation and reads as a miss
+- Depth-preferred replacement with aging
+"""
+
+import weakref
+from multiprocessing import shared_memory
+from typing import Optional, Dict, Any, Iterator, Tuple
+from ..board.board import Move, PieceType
+from .transposition import TranspositionEntry, NodeType, move_key
+
+# Data word layout (64 bits): move key in bits 0-15, then
+SCORE_SHIFT = 16    # score + SCORE_OFFSET, 16 bits
+DEPTH_SHIFT = 32    # depth, 8 bits
+TYPE_SHIFT = 40     # node type, 2 bits
+AGE_SHIFT = 42      # search generation, 8 bits
+HAS_MOVE_BIT = 1 << 50
+SCORE_OFFSET = 1 << 15
+KEY_MASK = (1 << 64) - 1
+
+# Number of slots sampled to estimate occupancy
+SAMPLE_SLOTS = 1000
+
+def decode_move(key: int) -> Move:
+    """
+    Unpack a move key (see move_key)
+    
+    Only the squares and the promotion piece are known; the move must be
+    matched against the legal moves of the position before it is played.
+    """
+    from_index = (key >> 6) & 63
+    to_index = key & 63
+    promotion = PieceType(key >> 12) if key >> 12 else None
+    return Move((from_index % 8, from_index // 8), (to_index % 8, to_index // 8),
+                None, None, promotion)
+
+def encode_entry(entry: TranspositionEntry) -> int:
+    """Pack an entry into a 64-bit data word (never 0, which marks an empty slot)"""
+    data = ((entry.score + SCORE_OFFSET) & 0xFFFF) << SCORE_SHIFT
+    data |= (min(255, max(0, entry.depth))) << DEPTH_SHIFT
+    data |= entry.node_type.value << TYPE_SHIFT
+    data |= (entry.age & 0xFF) << AGE_SHIFT
+    if entry.best_move is not None:
+        data |= move_key(entry.best_move) | HAS_MOVE_BIT
+    return data
+
+def decode_entry(data: int) -> TranspositionEntry:
+    """Unpack a 64-bit data word"""
+    best_move = decode_move(data & 0xFFFF) if data & HAS_MOVE_BIT else None
+    return TranspositionEntry(
+        (data >> DEPTH_SHIFT) & 0xFF,
+        ((data >> SCORE_SHIFT) & 0xFFFF) - SCORE_OFFSET,
+        NodeType((data >> TYPE_SHIFT) & 3),
+        best_move,
+        (data >> AGE_SHIFT) & 0xFF
+    )
+
+def _release(words: memoryview, shm: shared_memory.SharedMemory, owner: bool):
+    """Detach from (and, for the creating process, destroy) a segment"""
+    words.release()
+    shm.close()
+    if owner:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+class SharedTranspositionTable:
+    """
+    Fixed-size transposition table in shared memory
+    
+    The process that creates the table owns the segment and unlinks it
+    when the table is closed or garbage collected; other processes attach
+    to it by name with ``SharedTranspositionTable.attach``.
+    """
+    
+    ENTRY_BYTES = 16
+    
+    def __init__(self, max_size: int = 1000000, name: Optional[str] = None):
+        """
+        Initialize shared transposition table
+        
+        Args:
+            max_size: Number of slots
+            name: Name of an existing segment to attach to (None creates one)
+        """
+        self.max_size = max(1, max_size)
+        self.owner = name is None
+        # Processes started through multiprocessing share the creator's
+        # resource tracker, so only the owner unlinks the segment
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=self.owner, size=self.max_size * self.ENTRY_BYTES
+        )
+        self.words = self.shm.buf.cast('Q')
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.reused_hits = 0
+        self.current_age = 0
+        self._finalizer = weakref.finalize(self, _release, self.words, self.shm, self.owner)
+        if self.owner:
+            self.clear()
+    
+    @classmethod
+    def attach(cls, name: str, max_size: int, age: int = 0) -> 'SharedTranspositionTable':
+        """Attach to a table created by another process"""
+        table = cls(max_size, name=name)
+        table.current_age = age
+        return table
+    
+    @property
+    def name(self) -> str:
+        """Name of the shared memory segment"""
+        return self.shm.name
+    
+    def get(self, key: int) -> Optional[TranspositionEntry]:
+        """
+        Get entry from table
+        
+        Args:
+            key: Position hash
+        
+        Returns:
+            TranspositionEntry if found, None otherwise
+        """
+        entry = self.peek(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            if entry.age != self.current_age & 0xFF:
+                self.reused_hits += 1
+        return entry
+    
+    def peek(self, key: int) -> Optional[TranspositionEntry]:
+        """Get entry without touching statistics"""
+        index = (key % self.max_size) * 2
+        words = self.words
+        data = words[index + 1]
+        if data == 0 or words[index] ^ data != key & KEY_MASK:
+            return None
+        return decode_entry(data)
+    
+    def put(self, key: int, entry: TranspositionEntry):
+        """
+        Store entry in table
+        
+        An occupied slot is overwritten by an entry of the current search,
+        by a deeper entry, or by an entry for the same position.
+        
+        Args:
+            key: Position hash
+            entry: TranspositionEntry to store
+        """
+        entry.age = self.current_age
+        key &= KEY_MASK
+        index = (key % self.max_size) * 2
+        words = self.words
+        
+        old_data = words[index + 1]
+        if old_data:
+            same_position = words[index] ^ old_data == key
+            old_depth = (old_data >> DEPTH_SHIFT) & 0xFF
+            old_age = (old_data >> AGE_SHIFT) & 0xFF
+            if not same_position:
+                self.collisions += 1
+            if (not same_position and old_age == self.current_age & 0xFF
+                    and old_depth > entry.depth):
+                return
+        
+        data = encode_entry(entry)
+        # Data first, then the validated key: a reader racing with this
+        # write sees a mismatching pair and treats the slot as empty
+        words[index + 1] = data
+        words[index] = key ^ data
+    
+    def clear(self):
+        """Clear the transposition table"""
+        self.shm.buf[:self.max_size * self.ENTRY_BYTES] = bytes(self.max_size * self.ENTRY_BYTES)
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.reused_hits = 0
+        self.current_age = 0
+    
+    def new_search(self):
+        """Start a new generation: entries stored from now on are current"""
+        self.current_age += 1
+    
+    def items(self) -> Iterator[Tuple[int, TranspositionEntry]]:
+        """Iterate over the (key, entry) pairs stored in the table"""
+        words = self.words
+        for index in range(0, self.max_size * 2, 2):
+            data = words[index + 1]
+            if data:
+                yield words[index] ^ data, decode_entry(data)
+    
+    def hashfull(self) -> int:
+        """Occupancy by the current search in permille, estimated from a sample"""
+        sample = min(SAMPLE_SLOTS, self.max_size)
+        age = self.current_age & 0xFF
+        words = self.words
+        used = 0
+        for index in range(1, sample * 2, 2):
+            data = words[index]
+            if data and (data >> AGE_SHIFT) & 0xFF == age:
+                used += 1
+        return used * 1000 // sample
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get transposition table statistics (size is estimated from a sample)"""
+        total_accesses = self.hits + self.misses
+        hit_rate = self.hits / total_accesses if total_accesses > 0 else 0
+        
+        return {
+            'size': self.hashfull() * self.max_size // 1000,
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': hit_rate,
+            'reused_hits': self.reused_hits,
+            'reuse_rate': self.reused_hits / self.hits if self.hits else 0.0,
+            'collisions': self.collisions,
+            'current_age': self.current_age
+        }
+    
+    def resize(self, new_size: int):
+        """
+        Resize the transposition table
+        
+        The segment is recreated (entries are lost), so this must only be
+        called by the owner while no search is running.
+        
+        Args:
+            new_size: New number of slots
+        """
+        if not self.owner:
+            raise ValueError("Only the process that created the table can resize it")
+        if new_size == self.max_size:
+            return
+        
+        age = self.current_age
+        self.close()
+        self.__init__(new_size)
+        self.current_age = age
+    
+    def close(self):
+        """Detach from the segment (and destroy it if this process created it)"""
+        self._finalizer()
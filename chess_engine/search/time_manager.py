@@ -0,0 +1,187 @@
+"""
+Time Management for Search
+
+This module implements:
+- Soft/hard time limits from a fixed move time or a game clock
+- Node-count based clock checks (the clock is read every N nodes)
+- Node limits that stop the search after an exact number of nodes
+- Prediction of whether the next iterative deepening iteration can finish
+- Pondering: unlimited search until ponderhit, then the normal allocation
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class ClockState:
+    """Clock state of the side to move (seconds)"""
+    time_left: float
+    increment: float = 0.0
+    moves_to_go: Optional[int] = None
+
+class TimeManager:
+    """Allocates search time and decides when to stop"""
+    
+    DEFAULT_MOVES_TO_GO = 30
+    
+    def __init__(self, move_overhead: float = 0.05, check_period: float = 0.01,
+                 max_check_interval: int = 1024):
+        """
+        Initialize time manager
+        
+        Args:
+            move_overhead: Time reserved per move for communication lag (seconds)
+            check_period: Target time between two clock reads (seconds)
+            max_check_interval: Maximum number of nodes between two clock reads
+        """
+        self.move_overhead = move_overhead
+        self.check_period = check_period
+        self.max_check_interval = max_check_interval
+        
+        self.start_time = 0.0
+        self.soft_limit = float('inf')
+        self.hard_limit = float('inf')
+        self.nodes = 0
+        self.next_check = 1
+        self.node_limit = None
+        self.stopped = False
+        self.stop_requested = False
+        # Optional multiprocessing.Event shared with other search processes
+        self.stop_event = None
+        self.pondering = False
+        self.ponder_limits = (float('inf'), float('inf'))
+        self.iteration_times = []
+    
+    def start(self, time_limit: Optional[float] = None, clock: Optional[ClockState] = None,
+              ponder: bool = False, node_limit: Optional[int] = None):
+        """
+        Start timing a new search
+        
+        Args:
+            time_limit: Fixed time for this move (seconds), None for no limit
+            clock: Game clock of the side to move; takes precedence over time_limit
+            ponder: Search without limits until ponderhit() is called
+            node_limit: Stop after this many nodes (None for no limit)
+        """
+        self.start_time = time.time()
+        self.nodes = 0
+        self.next_check = 1
+        self.node_limit = node_limit
+        self.stopped = False
+        self.stop_requested = False
+        self.iteration_times = []
+        
+        if clock is not None:
+            soft_limit, hard_limit = self.allocate(clock)
+        elif time_limit is not None:
+            soft_limit = hard_limit = time_limit
+        else:
+            soft_limit = hard_limit = float('inf')
+        
+        self.pondering = ponder
+        if ponder:
+            self.ponder_limits = (soft_limit, hard_limit)
+            self.soft_limit = self.hard_limit = float('inf')
+        else:
+            self.soft_limit, self.hard_limit = soft_limit, hard_limit
+    
+    def allocate(self, clock: ClockState):
+        """
+        Compute soft and hard limits from the clock
+        
+        The soft limit is the time we aim to use (a share of the remaining
+        time plus most of the increment); the hard limit is where a running
+        iteration gets aborted.
+        
+        Returns:
+            Tuple of (soft_limit, hard_limit) in seconds
+        """
+        available = max(0.0, clock.time_left - self.move_overhead)
+        moves_to_go = clock.moves_to_go or self.DEFAULT_MOVES_TO_GO
+        base = available / max(1, moves_to_go) + clock.increment * 0.75
+        
+        soft_limit = min(base, available * 0.5)
+        hard_limit = max(soft_limit, min(base * 3, available * 0.8))
+        return max(soft_limit, 0.001), max(hard_limit, 0.001)
+    
+    def elapsed(self) -> float:
+        """Time since the search started (seconds)"""
+        return time.time() - self.start_time
+    
+    def check(self) -> bool:
+        """
+        Read the clock and schedule the next check
+        
+        Called by the search once ``nodes`` reaches ``next_check``. The interval
+        adapts to the measured speed so the clock is read about every
+        ``check_period`` seconds; it never skips past ``node_limit``, so a
+        node-limited search stops after exactly that many nodes.
+        
+        Returns:
+            True if the search must stop
+        """
+        elapsed = self.elapsed()
+        nodes_per_second = self.nodes / elapsed if elapsed > 0 else 0
+        interval = int(nodes_per_second * self.check_period)
+        self.next_check = self.nodes + max(1, min(self.max_check_interval, interval))
+        if self.node_limit is not None:
+            self.next_check = min(self.next_check, max(self.node_limit, self.nodes + 1))
+        
+        if self.stop_requested or elapsed >= self.hard_limit:
+            self.stopped = True
+        elif self.node_limit is not None and self.nodes >= self.node_limit:
+            self.stopped = True
+        elif self.stop_event is not None and self.stop_event.is_set():
+            self.stopped = True
+        return self.stopped
+    
+    def stop(self):
+        """Request the search to stop at the next clock check"""
+        self.stop_requested = True
+    
+    def ponderhit(self):
+        """
+        Switch a pondering search to normal time control
+        
+        The opponent played the expected move, so our clock is running from
+        now on; the limits allocated at start are applied from this moment.
+        """
+        if not self.pondering:
+            return
+        self.pondering = False
+        elapsed = self.elapsed()
+        soft_limit, hard_limit = self.ponder_limits
+        self.soft_limit = elapsed + soft_limit
+        self.hard_limit = elapsed + hard_limit
+    
+    def iteration_completed(self, iteration_time: float):
+        """Record the duration of a finished iterative deepening iteration"""
+        self.iteration_times.append(iteration_time)
+    
+    def can_start_iteration(self) -> bool:
+        """
+        Check if another iteration should be started
+        
+        The next iteration is predicted to take the last iteration's time
+        multiplied by the observed growth factor between iterations.
+        """
+        if self.stop_requested:
+            return False
+        if self.stop_event is not None and self.stop_event.is_set():
+            return False
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            return False
+        
+        elapsed = self.elapsed()
+        if elapsed >= self.soft_limit:
+            return False
+        if not self.iteration_times:
+            return True
+        
+        last = self.iteration_times[-1]
+        growth = 3.0
+        if len(self.iteration_times) >= 2 and self.iteration_times[-2] > 0:
+            growth = min(8.0, max(1.5, last / self.iteration_times[-2]))
+        
+        return elapsed + last * growth <= self.hard_limit
@@ -6,8 +6,77 @@ for caching search results.
 """
 
 from collections import OrderedDict
-from typing import Optional, Dict, Any, Tuple
+from itertools import islice
+from typing import Optional, Dict, Any, Tuple, Iterator
 from enum import Enum
+from ..eval.evaluation import MATE_SCORE
+
+# Search score bounds (integer centipawns). Mate-in-N is encoded as
+# MATE_SCORE - plies_to_mate, so every score beyond MATE_BOUND is a mate.
+MAX_PLY = 128
+MATE_BOUND = MATE_SCORE - MAX_PLY
+INFINITE_SCORE = MATE_SCORE + 1
+DRAW_SCORE = 0
+
+# Number of least recently used entries considered for eviction
+EVICTION_CANDIDATES = 4
+
+# Approximate memory per table entry (key, entry object, stored move and
+# OrderedDict bookkeeping), used to size the table from a megabyte budget
+TT_ENTRY_BYTES = 400
+
+def entries_for_megabytes(megabytes: int, entry_bytes: int = TT_ENTRY_BYTES) -> int:
+    """Number of table entries fitting in a memory budget of megabytes"""
+    return max(1, megabytes * 1024 * 1024 // entry_bytes)
+
+def score_to_tt(score: int, ply: int) -> int:
+    """
+    Convert a search score to a table score
+    
+    Mate scores are relative to the root; the table stores them relative to
+    the node so the entry stays valid when reached at a different ply.
+    """
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+def score_from_tt(score: int, ply: int) -> int:
+    """Convert a table score back to a score relative to the root"""
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+def mate_in(score: int) -> Optional[int]:
+    """
+    Get the number of moves to mate encoded in a score
+    
+    Returns:
+        Moves to mate (negative if the side to move is getting mated),
+        None if the score is not a mate score
+    """
+    if score >= MATE_BOUND:
+        return (MATE_SCORE - score + 1) // 2
+    if score <= -MATE_BOUND:
+        return -((MATE_SCORE + score) // 2)
+    return None
+
+def move_key(move) -> int:
+    """
+    Compact integer key of a move
+    
+    The low 12 bits are the from/to square pair (a butterfly index),
+    bits 12+ hold the promotion piece.
+    """
+    from_file, from_rank = move.from_square
+    to_file, to_rank = move.to_square
+    key = (from_rank * 8 + from_file) << 6 | (to_rank * 8 + to_file)
+    if move.promotion:
+        key |= move.promotion.value << 12
+    return key
 
 class NodeType(Enum):
     """Type of transposition table entry"""
@@ -18,7 +87,7 @@ class NodeType(Enum):
 class TranspositionEntry:
     """Entry in the transposition table"""
     
-    def __init__(self, depth: int, score: float, node_type: NodeType, 
+    def __init__(self, depth: int, score: int, node_type: NodeType, 
                  best_move=None, age: int = 0):
         self.depth = depth
         self.score = score
@@ -31,6 +100,8 @@ class LRUTranspositionTable:
     LRU-based transposition table with size limit
     """
     
+    ENTRY_BYTES = TT_ENTRY_BYTES
+    
     def __init__(self, max_size: int = 1000000):
         """
         Initialize transposition table
@@ -43,6 +114,7 @@ class LRUTranspositionTable:
         self.hits = 0
         self.misses = 0
         self.collisions = 0
+        self.reused_hits = 0
         self.current_age = 0
     
     def get(self, key: int) -> Optional[TranspositionEntry]:
@@ -60,11 +132,17 @@ class LRUTranspositionTable:
             entry = self.table[key]
             self.table.move_to_end(key)
             self.hits += 1
+            if entry.age != self.current_age:
+                self.reused_hits += 1
             return entry
         
         self.misses += 1
         return None
     
+    def peek(self, key: int) -> Optional[TranspositionEntry]:
+        """Get entry without touching statistics or LRU order"""
+        return self.table.get(key)
+    
     def put(self, key: int, entry: TranspositionEntry):
         """
         Store entry in table
@@ -84,11 +162,25 @@ class LRUTranspositionTable:
         else:
             # Add new entry
             if len(self.table) >= self.max_size:
-                # Remove least recently used entry
-                self.table.popitem(last=False)
+                self._evict()
             
             self.table[key] = entry
     
+    def _evict(self):
+        """
+        Remove one entry to make room
+        
+        Among the least recently used entries, previous generations go
+        first, then the shallowest.
+        """
+        table = self.table
+        current_age = self.current_age
+        victim = min(
+            islice(table, EVICTION_CANDIDATES),
+            key=lambda key: (table[key].age == current_age, table[key].depth)
+        )
+        del table[victim]
+    
     def _should_replace(self, existing: TranspositionEntry, new: TranspositionEntry) -> bool:
         """
         Determine if existing entry should be replaced
@@ -100,19 +192,12 @@ class LRUTranspositionTable:
         Returns:
             True if should replace, False otherwise
         """
-        # Replace if new entry has greater depth
-        if new.depth > existing.depth:
-            return True
-        
-        # Replace if same depth but newer age
-        if new.depth == existing.depth and new.age > existing.age:
+        # Entries of previous searches are always refreshed
+        if new.age != existing.age:
             return True
         
-        # Replace if much newer (even if lower depth)
-        if new.age - existing.age > 4:
-            return True
-        
-        return False
+        # Within a search keep the deeper result
+        return new.depth >= existing.depth
     
     def clear(self):
         """Clear the transposition table"""
@@ -120,12 +205,17 @@ class LRUTranspositionTable:
         self.hits = 0
         self.misses = 0
         self.collisions = 0
+        self.reused_hits = 0
         self.current_age = 0
     
     def new_search(self):
-        """Increment age for new search"""
+        """Start a new generation: entries stored from now on are current"""
         self.current_age += 1
     
+    def items(self) -> Iterator[Tuple[int, TranspositionEntry]]:
+        """Iterate over the (key, entry) pairs stored in the table"""
+        return iter(self.table.items())
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get transposition table statistics"""
         total_accesses = self.hits + self.misses
@@ -137,10 +227,16 @@ class LRUTranspositionTable:
             'hits': self.hits,
             'misses': self.misses,
             'hit_rate': hit_rate,
+            'reused_hits': self.reused_hits,
+            'reuse_rate': self.reused_hits / self.hits if self.hits else 0.0,
             'collisions': self.collisions,
             'current_age': self.current_age
         }
     
+    def hashfull(self) -> int:
+        """Table occupancy in permille (as reported by UCI ``info hashfull``)"""
+        return min(1000, len(self.table) * 1000 // max(1, self.max_size))
+    
     def resize(self, new_size: int):
         """
         Resize the transposition table
@@ -103,6 +103,65 @@ class TestChessBoard(unittest.TestCase):
                 else:
                     self.assertEqual(original.piece_type, copied.piece_type)
                     self.assertEqual(original.color, copied.color)
+    
+    def test_incremental_hash(self):
+        """Test incrementally updated hash matches a full rehash"""
+        from chess_engine.board.move_generator import MoveGenerator
+        from chess_engine.search.zobrist import zobrist
+        
+        board = ChessBoard("r3k2r/pPp1pppp/8/3pP3/8/8/PPPP1PPP/R3K2R w KQkq d6 0 1")
+        initial_key = board.zobrist_key
+        for move in MoveGenerator(board).generate_legal_moves(Color.WHITE):
+            self.assertTrue(board.make_move(move))
+            self.assertEqual(board.zobrist_key, zobrist.hash_position(board), str(move))
+            board.undo_move()
+            self.assertEqual(board.zobrist_key, initial_key)
+    
+    def test_incremental_material_key(self):
+        """Test material key updates on captures, en passant and promotions"""
+        from chess_engine.board.move_generator import MoveGenerator
+        
+        board = ChessBoard("r3k2r/pPp1pppp/8/3pP3/8/8/PPPP1PPP/R3K2R w KQkq d6 0 1")
+        initial_key = board.material_key
+        self.assertEqual(board.material_count(PieceType.PAWN, Color.WHITE), 9)
+        self.assertEqual(board.material_count(PieceType.ROOK, Color.BLACK), 2)
+        for move in MoveGenerator(board).generate_legal_moves(Color.WHITE):
+            self.assertTrue(board.make_move(move))
+            self.assertEqual(board.material_key, board._compute_material_key(), str(move))
+            board.undo_move()
+            self.assertEqual(board.material_key, initial_key)
+        
+        # b7xa8=Q: one white pawn and one black rook less, one white queen more
+        promotion = Move((1, 1), (0, 0), PieceType.PAWN, Color.WHITE, PieceType.QUEEN, is_capture=True)
+        self.assertTrue(board.make_move(promotion))
+        self.assertEqual(board.material_count(PieceType.PAWN, Color.WHITE), 8)
+        self.assertEqual(board.material_count(PieceType.QUEEN, Color.WHITE), 1)
+        self.assertEqual(board.material_count(PieceType.ROOK, Color.BLACK), 1)
+    
+    def test_repetition_detection(self):
+        """Test repetition detection within the halfmove clock window"""
+        shuffle = [
+            Move((6, 7), (5, 5), PieceType.KNIGHT, Color.WHITE),
+            Move((6, 0), (5, 2), PieceType.KNIGHT, Color.BLACK),
+            Move((5, 5), (6, 7), PieceType.KNIGHT, Color.WHITE),
+            Move((5, 2), (6, 0), PieceType.KNIGHT, Color.BLACK),
+        ]
+        
+        for move in shuffle[:3]:
+            self.assertTrue(self.board.make_move(move))
+            self.assertFalse(self.board.is_repetition(2))
+        
+        self.assertTrue(self.board.make_move(shuffle[3]))
+        self.assertTrue(self.board.is_repetition(2))
+        self.assertFalse(self.board.is_repetition(3))
+        
+        for move in shuffle:
+            self.assertTrue(self.board.make_move(move))
+        self.assertTrue(self.board.is_repetition(3))
+        
+        # An irreversible move closes the window
+        self.assertTrue(self.board.make_move(Move((4, 6), (4, 4), PieceType.PAWN, Color.WHITE)))
+        self.assertFalse(self.board.is_repetition(2))
 
 class TestSquare(unittest.TestCase):
     """Test cases for Square class"""
@@ -5,6 +5,7 @@ This module contains comprehensive tests for all engine components.
 """
 
 import unittest
+import importlib.util
 import sys
 import os
 
@@ -16,6 +17,8 @@ from chess_engine.board.move_generator import MoveGenerator
 from chess_engine.search.minimax import MinimaxEngine
 from chess_engine.eval.evaluation import EvaluationEngine
 from chess_engine.search.zobrist import ZobristHash
+from chess_engine.search.transposition import INFINITE_SCORE
+from chess_engine.config import SearchConfig
 
 class TestChessEngine(unittest.TestCase):
     """Comprehensive chess engine tests"""
@@ -88,6 +91,50 @@ class TestChessEngine(unittest.TestCase):
         restored_fen = self.board._get_fen()
         self.assertEqual(original_fen, restored_fen)
     
+    def test_board_copy_and_legality_filter(self):
+        """Test copies are independent and legal move generation leaves the board unchanged"""
+        board = ChessBoard("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 10")
+        fen, key = board._get_fen(), board.zobrist_key
+        
+        moves = MoveGenerator(board).generate_legal_moves(Color.WHITE)
+        self.assertEqual(len(moves), 48)
+        self.assertEqual((board._get_fen(), board.zobrist_key), (fen, key))
+        self.assertEqual(len(board.move_history), 0)
+        
+        copy = board.copy()
+        self.assertTrue(copy.make_move(moves[0]))
+        self.assertEqual(board._get_fen(), fen)
+        self.assertEqual(len(board.hash_history), 0)
+        self.assertTrue(copy.undo_move())
+        self.assertEqual(copy._get_fen(), fen)
+    
+    def test_pawn_captures_from_start_rank(self):
+        """Test pawns on their start rank capture diagonally forward one rank only"""
+        board = ChessBoard("rnbqkbnr/ppp1pppp/8/3pP3/8/8/PPPP1PPP/RNBQKBNR b KQkq - 0 2")
+        captures = [move for move in MoveGenerator(board).generate_legal_moves(Color.BLACK)
+                    if move.is_capture]
+        self.assertEqual(captures, [])
+    
+    def test_pawn_promotions(self):
+        """Test promotions are generated for free and capture squares only, never as plain pushes"""
+        board = ChessBoard("1rn1k3/P1P5/8/8/8/8/8/4K3 w - - 0 1")
+        pawn_moves = [move for move in MoveGenerator(board).generate_legal_moves(Color.WHITE)
+                      if move.piece_type == PieceType.PAWN]
+        self.assertEqual(len(pawn_moves), 12)
+        self.assertTrue(all(move.promotion for move in pawn_moves))
+        self.assertEqual(sorted({(str(move), move.is_capture) for move in pawn_moves}),
+                         [("a7a8", False), ("a7b8", True), ("c7b8", True)])
+        
+        # Promotion captures are played and taken back like other captures
+        move = next(move for move in pawn_moves if str(move) == "c7b8" and move.promotion == PieceType.KNIGHT)
+        self.assertTrue(board.make_move(move))
+        self.assertEqual(board._get_fen().split()[0], "1Nn1k3/P7/8/8/8/8/8/4K3")
+        self.assertTrue(board.undo_move())
+        
+        # Perft position 5: 44 legal moves including d7xc8 promotions
+        board = ChessBoard("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8")
+        self.assertEqual(len(MoveGenerator(board).generate_legal_moves(Color.WHITE)), 44)
+    
     def test_evaluation_consistency(self):
         """Test evaluation function consistency"""
         # Evaluate same position multiple times
@@ -142,6 +189,98 @@ class TestChessEngine(unittest.TestCase):
         move_strings = [str(m) for m in legal_moves]
         self.assertIn(str(move), move_strings, "Returned move should be legal")
     
+    def test_mate_scores(self):
+        """Test mate is found with an integer mate-in-N score"""
+        from chess_engine.search.transposition import mate_in, score_to_tt, score_from_tt
+        
+        board = ChessBoard("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        engine = MinimaxEngine(max_depth=3, time_limit=30.0)
+        move, score = engine.search(board)
+        
+        self.assertEqual(str(move), "a1a8")
+        self.assertIsInstance(score, int)
+        self.assertEqual(mate_in(score), 1)
+        self.assertIsNone(mate_in(150))
+        
+        # Table scores are node-relative and round-trip at any ply
+        self.assertEqual(score_from_tt(score_to_tt(score - 4, 4), 4), score - 4)
+        self.assertEqual(score_from_tt(score_to_tt(score - 4, 4), 2), score - 2)
+    
+    def test_principal_variation(self):
+        """Test search returns its PV and the PV move is ordered first"""
+        from chess_engine.search.minimax import move_key
+        
+        result = self.engine.search(self.board, depth=2)
+        move, score = result
+        
+        self.assertIs(result.move, move)
+        self.assertEqual(result.score, score)
+        self.assertEqual(result.depth, 2)
+        self.assertEqual(len(result.pv), 2)
+        self.assertEqual(move_key(result.pv[0]), move_key(move))
+        
+        # The PV is playable from the root
+        board = ChessBoard()
+        for pv_move in result.pv:
+            self.assertTrue(board.make_move(pv_move))
+        
+        moves = self.move_gen.generate_legal_moves(Color.WHITE)
+        ordered = self.engine._order_moves(moves, self.board, moves[0], 0, moves[-1])
+        self.assertIs(ordered[0], moves[-1])
+        self.assertIs(ordered[1], moves[0])
+    
+    def test_multipv(self):
+        """Test MultiPV returns distinct best lines with PVs, best first"""
+        board = ChessBoard("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        fen = board._get_fen()
+        engine = MinimaxEngine(max_depth=2, time_limit=60.0)
+        
+        lines = engine.search_multipv(board, multipv=3)
+        
+        self.assertEqual(len(lines), 3)
+        self.assertEqual((str(lines[0].move), lines[0].score), ("a1a8", 29999))
+        self.assertEqual(len({str(line.move) for line in lines}), 3)
+        self.assertEqual([line.score for line in lines], sorted((line.score for line in lines), reverse=True))
+        self.assertTrue(all(line.depth == 2 and len(line.pv) == 2 for line in lines[1:]))
+        self.assertEqual(board._get_fen(), fen)
+        
+        # Fewer legal moves than lines
+        board = ChessBoard("7k/8/8/8/8/8/8/K7 w - - 0 1")
+        self.assertEqual(len(engine.search_multipv(board, multipv=5, depth=1)), 3)
+    
+    def test_move_ordering_tables(self):
+        """Test killer and history tables are filled by beta cutoffs"""
+        from chess_engine.search.minimax import move_key
+        
+        board = ChessBoard("4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1")
+        engine = MinimaxEngine(max_depth=2, time_limit=30.0)
+        engine.search(board)
+        stats = engine.get_search_stats()
+        
+        self.assertGreater(stats['cutoffs'], 0)
+        self.assertGreaterEqual(stats['first_move_cutoff_rate'], 0.0)
+        self.assertLessEqual(stats['first_move_cutoff_rate'], 1.0)
+        self.assertTrue(any(engine.history_table))
+        self.assertTrue(any(killers[0] for killers in engine.killer_moves))
+        
+        # Killers are matched by move key, not object identity: a killer
+        # stored from one Move ranks the equal generated move above every
+        # quiet move with history
+        from chess_engine.search.minimax import KILLER_PRIORITY
+        
+        board = ChessBoard()
+        engine = MinimaxEngine(time_limit=None)
+        killer = Move((6, 7), (5, 5), PieceType.KNIGHT, Color.WHITE)
+        engine.update_killer_moves(killer, 2)
+        moves = MoveGenerator(board).generate_legal_moves(Color.WHITE)
+        other = next(move for move in moves if str(move) == "e2e4")
+        engine.history_table[move_key(other) & 4095] = KILLER_PRIORITY - 1
+        
+        ordered = engine._order_moves(moves, board, ply=2)
+        self.assertEqual([str(move) for move in ordered[:2]], ["g1f3", "e2e4"])
+        self.assertIsNot(ordered[0], killer)
+        self.assertEqual(str(engine._order_moves(moves, board, ply=3)[0]), "e2e4")
+    
     def test_transposition_table(self):
         """Test transposition table functionality"""
         # Clear table
@@ -154,6 +293,115 @@ class TestChessEngine(unittest.TestCase):
         stats = self.engine.transposition_table.get_stats()
         self.assertGreater(stats['size'], 0)
     
+    def test_transposition_aging(self):
+        """Test each search starts a generation and older entries are replaced first"""
+        from chess_engine.search.transposition import LRUTranspositionTable, TranspositionEntry, NodeType
+        
+        table = LRUTranspositionTable(max_size=2)
+        table.put(1, TranspositionEntry(6, 0, NodeType.EXACT))
+        table.put(2, TranspositionEntry(1, 0, NodeType.EXACT))
+        table.new_search()
+        
+        # Same generation keeps the deeper entry, an older one is refreshed
+        table.put(2, TranspositionEntry(3, 0, NodeType.EXACT))
+        table.put(2, TranspositionEntry(2, 0, NodeType.EXACT))
+        self.assertEqual(table.get(2).depth, 3)
+        table.put(1, TranspositionEntry(1, 0, NodeType.EXACT))
+        self.assertEqual(table.get(1).depth, 1)
+        
+        # Eviction drops the shallower entry of the older generation
+        table.new_search()
+        table.put(3, TranspositionEntry(1, 0, NodeType.EXACT))
+        self.assertIsNone(table.get(1))
+        self.assertIsNotNone(table.get(2))
+        self.assertEqual(table.get_stats()['reused_hits'], 1)
+        
+        # The engine keeps its table between searches and ages it
+        self.engine.search(self.board, depth=2)
+        age = self.engine.transposition_table.current_age
+        self.engine.search(self.board, depth=2)
+        self.assertEqual(self.engine.transposition_table.current_age, age + 1)
+        self.assertGreater(self.engine.get_search_stats()['transposition_reuse_rate'], 0.0)
+    
+    def test_persistent_transposition_table(self):
+        """Test deep results are journaled, compacted and probed from the table file"""
+        import tempfile
+        from chess_engine.search.persistent_tt import compact_table, journal_path
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "analysis.tt")
+            engine = MinimaxEngine(max_depth=2, time_limit=None)
+            engine.open_persistent_table(path)
+            self.assertEqual(len(engine.persistent_table), 0)
+            
+            best_move, score = engine.search(self.board)
+            saved = engine.save_deep_results(min_depth=1)
+            self.assertGreater(saved, 0)
+            self.assertTrue(os.path.exists(journal_path(path)))
+            
+            result = compact_table(path, min_depth=1)
+            self.assertEqual(result['merged'], saved)
+            self.assertFalse(os.path.exists(journal_path(path)))
+            
+            # A fresh engine warm-starts from the file
+            self.assertTrue(engine.persistent_table.refresh())
+            warm_engine = MinimaxEngine(max_depth=2, time_limit=None)
+            warm_engine.open_persistent_table(path)
+            self.assertEqual(len(warm_engine.persistent_table), result['size'])
+            warm_move, warm_score = warm_engine.search(self.board)
+            self.assertEqual(warm_score, score)
+            self.assertGreater(warm_engine.get_search_stats()['persistent_hits'], 0)
+            self.assertLess(warm_engine.nodes_searched, engine.nodes_searched)
+            
+            # Compaction keeps the deeper entry and drops shallow ones
+            self.assertEqual(compact_table(path, min_depth=2)['size'],
+                             sum(1 for _, entry in warm_engine.persistent_table.items() if entry.depth >= 2))
+            engine.persistent_table.close()
+            warm_engine.persistent_table.close()
+    
+    def test_search_extensions(self):
+        """Test check, passed pawn and singular extensions and their toggles"""
+        from chess_engine.config import SearchConfig
+        from chess_engine.search.transposition import mate_in, TranspositionEntry, NodeType
+        
+        # Qe8+ Rxe8 Rxe8# is found at nominal depth 2 through the check extension
+        fen = "3r2k1/5ppp/8/8/8/8/4QPPP/4R1K1 w - - 0 1"
+        engine = MinimaxEngine(max_depth=2, time_limit=None)
+        result = engine.search(ChessBoard(fen))
+        self.assertEqual(str(result.move), "e2e8")
+        self.assertEqual(mate_in(result.score), 2)
+        self.assertEqual([str(move) for move in result.pv[:2]], ["e2e8", "d8e8"])
+        self.assertGreater(engine.get_search_stats()['check_extensions'], 0)
+        
+        # A pawn reaching the seventh rank is extended
+        engine = MinimaxEngine(max_depth=1, time_limit=None)
+        engine.search(ChessBoard("8/8/4P1k1/8/8/8/6K1/8 w - - 0 1"))
+        self.assertGreater(engine.get_search_stats()['passed_pawn_extensions'], 0)
+        
+        # Winning the queen is the only good move, a quiet opening move is not
+        board = ChessBoard("4k3/8/8/3q4/8/8/8/3RK3 w - - 0 1")
+        capture = next(move for move in MoveGenerator(board).generate_legal_moves(Color.WHITE)
+                       if str(move) == "d1d5")
+        engine.move_generator = MoveGenerator(board)
+        entry = TranspositionEntry(4, 900, NodeType.LOWER_BOUND, capture)
+        self.assertTrue(engine._is_singular(board, entry, 4, Color.WHITE, 1, 0))
+        
+        engine.move_generator = MoveGenerator(self.board)
+        quiet = next(move for move in self.move_gen.generate_legal_moves(Color.WHITE)
+                     if str(move) == "e2e4")
+        entry = TranspositionEntry(4, 0, NodeType.EXACT, quiet)
+        self.assertFalse(engine._is_singular(self.board, entry, 4, Color.WHITE, 1, 0))
+        
+        # Every extension can be switched off
+        config = SearchConfig(use_check_extensions=False, use_recapture_extensions=False,
+                              use_passed_pawn_extensions=False, use_singular_extensions=False)
+        engine = MinimaxEngine(max_depth=2, time_limit=None, config=config)
+        engine.search(ChessBoard(fen))
+        stats = engine.get_search_stats()
+        for name in ('check_extensions', 'recapture_extensions',
+                     'passed_pawn_extensions', 'singular_extensions'):
+            self.assertEqual(stats[name], 0)
+    
     def test_invalid_moves(self):
         """Test invalid move handling"""
         # Try to make invalid move
@@ -172,6 +420,78 @@ class TestChessEngine(unittest.TestCase):
         moves = self.move_gen.generate_legal_moves(current_player)
         self.assertGreater(len(moves), 0)  # Should have legal moves in starting position
 
+class TestSearchTechniques(unittest.TestCase):
+    """Pruning, reduction and extension tests on single interior nodes"""
+    
+    def node_search(self, board, config, depth, alpha=-INFINITE_SCORE, beta=INFINITE_SCORE):
+        """
+        Search board as an interior node (ply 1) with a fresh engine
+        
+        Returns:
+            Tuple of (engine, best_move, score)
+        """
+        engine = MinimaxEngine(time_limit=None, config=config)
+        engine.move_generator = MoveGenerator(board)
+        engine.time_manager.start(None)
+        move, score = engine._minimax(board, depth, alpha, beta, board.current_player, 1)
+        return engine, move, score
+    
+    def test_frontier_pruning(self):
+        """Test reverse futility pruning, razoring and futility pruning near the leaves"""
+        # White is a queen up, with either side to move
+        white_board = ChessBoard("4k3/8/8/8/3Q4/8/8/4K3 w - - 0 1")
+        black_board = ChessBoard("4k3/8/8/8/3Q4/8/8/4K3 b - - 0 1")
+        
+        # Far above beta: the node returns its static evaluation
+        engine, _, score = self.node_search(white_board, SearchConfig(), 1, -100, 0)
+        stats = engine.get_search_stats()
+        self.assertEqual(stats['reverse_futility_prunes'], 1)
+        self.assertEqual(stats['nodes_searched'], 1)
+        self.assertGreaterEqual(score, 0)
+        
+        # Far below alpha at depth 1: razoring drops into quiescence
+        engine, _, score = self.node_search(black_board, SearchConfig(), 1, -100, 0)
+        self.assertEqual(engine.get_search_stats()['razoring_prunes'], 1)
+        self.assertLessEqual(score, -100)
+        
+        # Below alpha at depth 3 (no razoring margin there): quiet moves are skipped
+        engine, _, score = self.node_search(black_board, SearchConfig(), 3, -100, 0)
+        self.assertGreater(engine.get_search_stats()['futility_prunes'], 0)
+        self.assertLessEqual(score, -100)
+        
+        # Disabled techniques search the node normally
+        config = SearchConfig(use_reverse_futility_pruning=False, use_futility_pruning=False,
+                              use_razoring=False)
+        engine, _, score = self.node_search(white_board, config, 1, -100, 0)
+        stats = engine.get_search_stats()
+        self.assertEqual(stats['reverse_futility_prunes'], 0)
+        self.assertGreater(stats['nodes_searched'], 1)
+        engine, _, score = self.node_search(black_board, config, 1, -100, 0)
+        stats = engine.get_search_stats()
+        self.assertEqual(stats['razoring_prunes'] + stats['futility_prunes'], 0)
+    
+    def test_internal_iterative_deepening(self):
+        """Test nodes without a table move are reduced (IIR) or pre-searched (IID)"""
+        board = ChessBoard("8/8/4k3/8/2P5/4K3/8/8 w - - 0 1")
+        
+        def node_search(mode):
+            engine, move, _ = self.node_search(board, SearchConfig(internal_iterative_mode=mode), 3)
+            self.assertIsNotNone(move)
+            return engine, engine.transposition_table.peek(board.zobrist_key)
+        
+        engine, entry = node_search("reduction")
+        self.assertEqual(engine.get_search_stats()['iir_reductions'], 1)
+        self.assertEqual(entry.depth, 2)
+        
+        engine, entry = node_search("deepening")
+        self.assertEqual(engine.get_search_stats()['iid_searches'], 1)
+        self.assertEqual(entry.depth, 3)
+        
+        engine, entry = node_search("off")
+        stats = engine.get_search_stats()
+        self.assertEqual(stats['iid_searches'] + stats['iir_reductions'], 0)
+        self.assertEqual(entry.depth, 3)
+
 class TestPerformance(unittest.TestCase):
     """Performance tests"""
     
@@ -199,6 +519,938 @@ class TestPerformance(unittest.TestCase):
         stats = self.engine.get_search_stats()
         self.assertGreater(stats['nodes_searched'], 10)
 
+class TestTimeManager(unittest.TestCase):
+    """Time management tests"""
+    
+    def test_clock_allocation(self):
+        """Test soft/hard limits derived from the clock"""
+        from chess_engine.search.time_manager import TimeManager, ClockState
+        
+        manager = TimeManager(move_overhead=0.0)
+        soft, hard = manager.allocate(ClockState(time_left=60.0))
+        self.assertAlmostEqual(soft, 2.0)
+        self.assertGreater(hard, soft)
+        self.assertLess(hard, 60.0)
+        
+        # Increments and moves to go enlarge the budget, never past the clock
+        soft_inc, _ = manager.allocate(ClockState(time_left=60.0, increment=2.0))
+        self.assertGreater(soft_inc, soft)
+        soft_mtg, hard_mtg = manager.allocate(ClockState(time_left=1.0, moves_to_go=1))
+        self.assertLessEqual(hard_mtg, 1.0)
+        self.assertLessEqual(soft_mtg, hard_mtg)
+    
+    def test_iteration_prediction(self):
+        """Test an iteration predicted to overrun the hard limit is not started"""
+        from chess_engine.search.time_manager import TimeManager
+        
+        manager = TimeManager()
+        manager.start(time_limit=1.0)
+        self.assertTrue(manager.can_start_iteration())
+        manager.iteration_completed(0.05)
+        manager.iteration_completed(0.4)
+        self.assertFalse(manager.can_start_iteration())
+    
+    def test_hard_limit_keeps_root_move(self):
+        """Test an aborted iteration still returns a legal move and a clean board"""
+        board = ChessBoard()
+        engine = MinimaxEngine(max_depth=10, time_limit=0.3)
+        fen = board._get_fen()
+        
+        move, score = engine.search(board)
+        
+        self.assertIsNotNone(move)
+        self.assertEqual(board._get_fen(), fen)
+    
+    def test_node_limit(self):
+        """Test a node-limited search stops after exactly that many nodes"""
+        board = ChessBoard("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+        fen = board._get_fen()
+        engine = MinimaxEngine(max_depth=10, time_limit=None)
+        
+        first = engine.search(board, nodes=300)
+        self.assertEqual(engine.time_manager.nodes, 300)
+        self.assertIsNotNone(first.move)
+        self.assertEqual(board._get_fen(), fen)
+        
+        engine.clear_tables()
+        second = engine.search(board, nodes=300)
+        self.assertEqual((str(second.move), second.score), (str(first.move), first.score))
+
+class TestUCIInterface(unittest.TestCase):
+    """UCI protocol tests"""
+    
+    def setUp(self):
+        from chess_engine.uci.uci_interface import UCIInterface
+        self.uci = UCIInterface()
+        self.uci.process_command("isready")
+    
+    def run_commands(self, *commands):
+        """Send commands, wait for the search and return everything written to stdout"""
+        import io
+        from contextlib import redirect_stdout
+        
+        output = io.StringIO()
+        with redirect_stdout(output):
+            for command in commands:
+                response = self.uci.process_command(command)
+                if response:
+                    self.uci._send(response)
+            if self.uci.search_thread:
+                self.uci.search_thread.join()
+        return output.getvalue().splitlines()
+    
+    def test_move_round_trip(self):
+        """Test UCI move strings are parsed to legal moves and formatted back"""
+        self.assertEqual(self.uci._format_move(self.uci._parse_move("g1f3")), "g1f3")
+        self.assertIsNone(self.uci._parse_move("e2e5"))
+        
+        self.uci.process_command("position fen 8/P6k/8/8/8/8/8/K7 w - - 0 1")
+        move = self.uci._parse_move("a7a8q")
+        self.assertEqual(move.promotion, PieceType.QUEEN)
+        self.assertEqual(self.uci._format_move(move), "a7a8q")
+        
+        self.assertIsNone(self.uci.process_command("position startpos moves e2e4 e7e5"))
+        self.assertEqual(len(self.uci.board.move_history), 2)
+    
+    def test_go_streams_info(self):
+        """Test every iteration sends an info line before bestmove"""
+        lines = self.run_commands("position startpos", "go depth 2")
+        
+        info = [line for line in lines if line.startswith("info depth")]
+        self.assertEqual(len(info), 2)
+        for key in ("seldepth", "score cp", "nodes", "nps", "time", "hashfull", "pv"):
+            self.assertIn(f" {key} ", info[-1])
+        self.assertTrue(lines[-1].startswith("bestmove "))
+    
+    def test_go_nodes(self):
+        """Test go nodes stops the search after the node limit and reports bestmove"""
+        lines = self.run_commands("position startpos", "go nodes 200")
+        
+        self.assertTrue(lines[-1].startswith("bestmove "))
+        self.assertEqual(self.uci.engine.time_manager.nodes, 200)
+    
+    def test_stop_infinite_search(self):
+        """Test bestmove of an infinite search is only sent after stop"""
+        import io
+        import time
+        from contextlib import redirect_stdout
+        
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.uci.process_command("position fen 6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+            self.uci.process_command("go infinite")
+            time.sleep(0.5)
+            self.assertTrue(self.uci.search_thread.is_alive())
+            self.assertNotIn("bestmove", output.getvalue())
+            self.uci.process_command("stop")
+        
+        lines = output.getvalue().splitlines()
+        self.assertIn("score mate 1", output.getvalue())
+        self.assertEqual(lines[-1], "bestmove a1a8")
+    
+    def test_hash_and_threads_options(self):
+        """Test Hash resizes the table, Clear Hash empties it and Threads is applied"""
+        from chess_engine.config import SearchConfig
+        from chess_engine.search.transposition import TranspositionEntry, NodeType, entries_for_megabytes
+        
+        self.assertIn("option name Clear Hash type button", self.uci.process_command("uci"))
+        table = self.uci.engine.transposition_table
+        self.assertEqual(table.max_size, entries_for_megabytes(64))
+        
+        self.assertIsNone(self.uci.process_command("setoption name Hash value 16"))
+        self.assertIs(self.uci.engine.transposition_table, table)
+        self.assertEqual(table.max_size, entries_for_megabytes(16))
+        
+        table.put(1, TranspositionEntry(1, 0, NodeType.EXACT))
+        self.uci.process_command("setoption name Clear Hash")
+        self.assertEqual(table.get_stats()['size'], 0)
+        
+        self.uci.process_command("setoption name Threads value 4")
+        self.assertEqual(self.uci.engine.threads, 4)
+        self.assertIsNotNone(self.uci.process_command("setoption name Threads value 0"))
+        
+        engine = MinimaxEngine(config=SearchConfig(transposition_table_size=1234))
+        self.assertEqual(engine.transposition_table.max_size, 1234)
+    
+    def test_ponderhit(self):
+        """Test pondering has no limit until ponderhit applies the allocation"""
+        from chess_engine.search.time_manager import TimeManager
+        
+        manager = TimeManager()
+        manager.start(time_limit=1.0, ponder=True)
+        self.assertEqual(manager.hard_limit, float('inf'))
+        manager.ponderhit()
+        self.assertLessEqual(manager.hard_limit, manager.elapsed() + 1.0)
+        self.assertGreater(manager.hard_limit, 1.0 - 1e-9)
+
+class TestLazySMP(unittest.TestCase):
+    """Shared transposition table and Lazy SMP tests"""
+    
+    def test_shared_table_entries(self):
+        """Test entries round-trip, are visible to attached tables and are XOR-validated"""
+        from chess_engine.search.shared_tt import SharedTranspositionTable
+        from chess_engine.search.transposition import TranspositionEntry, NodeType, move_key
+        
+        table = SharedTranspositionTable(max_size=64)
+        move = Move((4, 6), (4, 4), PieceType.PAWN, Color.WHITE)
+        key = (1 << 63) | 12345
+        table.put(key, TranspositionEntry(5, -29990, NodeType.LOWER_BOUND, move))
+        
+        attached = SharedTranspositionTable.attach(table.name, table.max_size)
+        entry = attached.get(key)
+        self.assertEqual((entry.depth, entry.score, entry.node_type), (5, -29990, NodeType.LOWER_BOUND))
+        self.assertEqual(move_key(entry.best_move), move_key(move))
+        self.assertIsNone(attached.get(key + 64))
+        
+        # A shallower entry of another position does not evict a deeper one
+        table.put(key + 64, TranspositionEntry(2, 0, NodeType.EXACT))
+        self.assertEqual(table.get(key).depth, 5)
+        
+        # A torn slot fails validation and reads as a miss
+        index = (key % table.max_size) * 2
+        table.words[index + 1] ^= 1 << 20
+        self.assertIsNone(table.get(key))
+        
+        attached.close()
+        table.close()
+    
+    def test_parallel_search(self):
+        """Test a multi-process search finds the mate and leaves the board intact"""
+        board = ChessBoard("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        fen = board._get_fen()
+        engine = MinimaxEngine(max_depth=3, time_limit=30.0)
+        engine.set_threads(2)
+        
+        move, score = engine.search(board)
+        
+        self.assertEqual(str(move), "a1a8")
+        self.assertEqual(score, 29999)
+        self.assertEqual(board._get_fen(), fen)
+        engine.set_threads(1)
+        self.assertEqual(type(engine.transposition_table).__name__, "LRUTranspositionTable")
+    
+    def test_workers_share_table_generation(self):
+        """Test helpers store entries with the age of the main search"""
+        board = ChessBoard("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+        engine = MinimaxEngine(max_depth=3, time_limit=30.0)
+        engine.set_threads(3)
+        
+        engine.search(board)
+        table = engine.transposition_table
+        ages = {entry.age for _, entry in table.items()}
+        self.assertEqual(ages, {table.current_age & 0xFF})
+        self.assertGreater(engine.get_search_stats()['helper_nodes'], 0)
+        self.assertEqual(engine.get_search_stats()['transposition_reuse_rate'], 0.0)
+        engine.set_threads(1)
+
+class TestRootSplit(unittest.TestCase):
+    """Root-split parallel search tests"""
+    
+    def test_root_move_scores(self):
+        """Test parallel root scores match the serial ones and only the best K are exact"""
+        from chess_engine.config import SearchConfig
+        from chess_engine.search.transposition import NodeType
+        
+        board = ChessBoard("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        engine = MinimaxEngine(max_depth=2, time_limit=60.0, config=SearchConfig(parallel_mode="root_split"))
+        
+        serial = engine.score_root_moves(board, multipv=2, processes=1)
+        parallel = engine.score_root_moves(board, multipv=2, processes=2)
+        
+        legal_moves = MoveGenerator(board).generate_legal_moves(Color.WHITE)
+        self.assertEqual(len(parallel), len(legal_moves))
+        self.assertEqual((str(parallel[0].move), parallel[0].score), ("a1a8", 29999))
+        self.assertEqual([(str(r.move), r.score) for r in serial[:2]],
+                         [(str(r.move), r.score) for r in parallel[:2]])
+        self.assertTrue(all(r.bound == NodeType.EXACT for r in parallel[:2]))
+        self.assertTrue(all(r.score <= parallel[1].score for r in parallel[2:]))
+        
+        engine.set_threads(2)
+        move, score = engine.search(board)
+        self.assertEqual((str(move), score), ("a1a8", 29999))
+        engine.set_threads(1)
+
+class TestBench(unittest.TestCase):
+    """Bench command tests"""
+    
+    def test_bench_signature(self):
+        """Test the bench is reproducible and reports nodes, signature and speed"""
+        from chess_engine.bench import run_bench, format_bench, BENCH_FENS
+        
+        self.assertGreaterEqual(len(BENCH_FENS), 40)
+        fens = BENCH_FENS[:2] + BENCH_FENS[-2:]
+        first = run_bench(nodes=150, fens=fens)
+        second = run_bench(nodes=150, fens=fens)
+        
+        self.assertEqual(first['signature'], second['signature'])
+        self.assertEqual([p['nodes'] for p in first['positions']],
+                         [p['nodes'] for p in second['positions']])
+        self.assertTrue(all(p['nodes'] <= 150 for p in first['positions']))
+        self.assertEqual(first['nodes'], sum(p['nodes'] for p in first['positions']))
+        self.assertGreater(first['nps'], 0)
+        
+        # A different limit changes the signature
+        self.assertNotEqual(run_bench(nodes=100, fens=fens)['signature'], first['signature'])
+        
+        summary = "\n".join(format_bench(first))
+        for label in ("Nodes searched", "Nodes/second", "Signature"):
+            self.assertIn(label, summary)
+        self.assertIn(first['signature'], summary)
+    
+    def test_bench_iid_counters(self):
+        """Test the bench reports how often IID and IIR fire in each mode"""
+        from chess_engine.bench import run_bench
+        
+        fens = ["8/8/4k3/8/2P5/4K3/8/8 w - - 0 1"]
+        counters = {}
+        for mode in ("off", "reduction", "deepening"):
+            engine = MinimaxEngine(config=SearchConfig(internal_iterative_mode=mode))
+            counters[mode] = run_bench(depth=5, fens=fens, engine=engine)['counters']
+        
+        self.assertEqual(counters["off"]['iid_searches'] + counters["off"]['iir_reductions'], 0)
+        self.assertGreater(counters["reduction"]['iir_reductions'], 0)
+        self.assertEqual(counters["reduction"]['iid_searches'], 0)
+        self.assertGreater(counters["deepening"]['iid_searches'], 0)
+        self.assertEqual(counters["deepening"]['iir_reductions'], 0)
+    
+    def test_micro_benchmarks(self):
+        """Test micro-benchmark results round-trip as JSON and regressions are flagged"""
+        import tempfile
+        from chess_engine.bench.micro import (
+            run_micro_benchmarks, save_results, load_results, compare_results,
+            MICRO_BENCHMARKS, BASELINE_PATH
+        )
+        from chess_engine.bench import BENCH_FENS
+        
+        for name in ('board.make_undo', 'movegen.legal_moves', 'board.is_check', 'eval.evaluate',
+                     'eval.mobility', 'zobrist.hash_position', 'tt.get', 'tt.put',
+                     'fen.parse', 'fen.serialize', 'board.copy'):
+            self.assertIn(name, MICRO_BENCHMARKS)
+        
+        names = ['board.copy', 'tt.get', 'eval.material']
+        results = run_micro_benchmarks(names, fens=BENCH_FENS[:3], repeats=2, warmup=1,
+                                       min_sample_time=0.01)
+        self.assertEqual(list(results['benchmarks']), names)
+        for result in results['benchmarks'].values():
+            self.assertEqual(len(result['samples_ns']), 2)
+            self.assertGreater(result['operations'], 0)
+            self.assertLessEqual(result['min_ns'], result['median_ns'])
+        with self.assertRaises(ValueError):
+            run_micro_benchmarks(['no.such.benchmark'])
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            save_results(results, path)
+            self.assertEqual(load_results(path), results)
+        
+        # Twice as slow as the baseline fails the default threshold unless overridden
+        baseline = {'benchmarks': {name: dict(result, median_ns=result['median_ns'] / 2)
+                                   for name, result in results['benchmarks'].items()}}
+        comparison = compare_results(results, baseline)
+        self.assertTrue(all(row['regression'] for row in comparison))
+        self.assertAlmostEqual(comparison[0]['change'], 1.0, places=2)
+        comparison = compare_results(results, baseline, thresholds={'tt.get': 1.5})
+        self.assertEqual([row['name'] for row in comparison if not row['regression']], ['tt.get'])
+        self.assertFalse(any(row['regression'] for row in compare_results(results, results)))
+        
+        # The packaged baseline covers every benchmark
+        self.assertEqual(set(load_results(BASELINE_PATH)['benchmarks']), set(MICRO_BENCHMARKS))
+    
+    def test_stack_sampler(self):
+        """Test the profiler samples search stacks and writes collapsed stacks and a summary"""
+        import tempfile
+        import threading
+        from chess_engine.bench import run_bench, BENCH_FENS, StackSampler
+        
+        sampler = StackSampler(interval=0.001)
+        idle = threading.Event()
+        waiter = threading.Thread(target=idle.wait)
+        waiter.start()
+        with sampler:
+            run_bench(nodes=300, fens=BENCH_FENS[:2])
+        idle.set()
+        waiter.join()
+        
+        self.assertGreater(sum(sampler.samples.values()), 0)
+        # Only stacks through the search are kept (not the idle thread)
+        for stack in sampler.samples:
+            self.assertTrue(any(label.startswith("chess_engine.search.") for label in stack))
+        
+        modules = {row['name']: row for row in sampler.module_summary()}
+        self.assertAlmostEqual(modules['chess_engine.search.minimax']['inclusive_fraction'], 1.0)
+        self.assertAlmostEqual(sum(row['self_fraction'] for row in modules.values()), 1.0)
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "search.collapsed")
+            summary_path = sampler.save(path)
+            with open(path) as collapsed_file:
+                lines = collapsed_file.read().splitlines()
+            with open(summary_path) as summary_file:
+                summary = summary_file.read()
+        self.assertEqual(sum(int(line.rsplit(' ', 1)[1]) for line in lines),
+                         sum(sampler.samples.values()))
+        self.assertIn("chess_engine.search.minimax:MinimaxEngine._minimax", lines[0])
+        self.assertIn("chess_engine.search.minimax", summary)
+
+class TestSearchHooks(unittest.TestCase):
+    """Search instrumentation tests"""
+    
+    def test_iteration_stats_and_hooks(self):
+        """Test hooks receive every event and iteration stats add up to the search totals"""
+        import io
+        import json
+        from chess_engine.search import SearchHooks, JSONLinesHooks
+        
+        class Recorder(SearchHooks):
+            measure_time = True
+            
+            def __init__(self):
+                self.events = {'iteration': [], 'sample': [], 'cutoff': [], 'probe': [], 'timeout': []}
+            
+            def on_iteration(self, stats):
+                self.events['iteration'].append(stats)
+            
+            def on_node_sample(self, nodes, ply):
+                self.events['sample'].append(nodes)
+            
+            def on_cutoff(self, ply, depth, move, move_index):
+                self.events['cutoff'].append(move_index)
+            
+            def on_tt_probe(self, key, entry, ply):
+                self.events['probe'].append(entry is not None)
+            
+            def on_timeout(self, depth, nodes):
+                self.events['timeout'].append((depth, nodes))
+        
+        board = ChessBoard("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+        engine = MinimaxEngine(time_limit=None)
+        recorder = Recorder()
+        engine.add_hook(recorder)
+        engine.search(board, depth=3)
+        events = recorder.events
+        stats = engine.get_search_stats()
+        
+        iterations = events['iteration']
+        self.assertEqual([it.depth for it in iterations], [1, 2, 3])
+        self.assertEqual(iterations, engine.iteration_stats)
+        self.assertEqual(sum(it.nodes for it in iterations), stats['nodes_searched'])
+        self.assertEqual(sum(it.qnodes for it in iterations), stats['quiescence_nodes'])
+        self.assertEqual(len(events['cutoff']), stats['cutoffs'])
+        self.assertAlmostEqual(events['cutoff'].count(0) / len(events['cutoff']),
+                               stats['first_move_cutoff_rate'])
+        self.assertGreater(len(events['probe']), 0)
+        self.assertGreater(len(events['sample']), 0)
+        self.assertEqual(events['timeout'], [])
+        last = iterations[-1]
+        self.assertAlmostEqual(last.ebf, last.total_nodes / iterations[-2].total_nodes)
+        self.assertGreater(last.movegen_time, 0.0)
+        self.assertGreater(last.eval_time, 0.0)
+        self.assertAlmostEqual(last.movegen_time + last.eval_time + last.search_time, last.time, places=6)
+        self.assertTrue(0.0 < last.tt_store_rate <= 1.0)
+        self.assertEqual(stats['iterations'][-1], last.to_dict())
+        
+        # A node limit aborts the running iteration and reports it
+        engine.search(board, depth=10, nodes=300)
+        self.assertEqual(len(events['timeout']), 1)
+        self.assertEqual(events['timeout'][0][1], 300)
+        
+        # Without hooks nothing is dispatched or timed
+        engine.remove_hook(recorder)
+        self.assertEqual((engine._iteration_hooks, engine._node_sample_hooks, engine._cutoff_hooks,
+                          engine._tt_probe_hooks, engine._timeout_hooks), ((),) * 5)
+        self.assertNotIn('evaluate', vars(engine.evaluation_engine))
+        engine.search(board, depth=2)
+        self.assertIsNone(engine.iteration_stats[-1].movegen_time)
+        
+        # Only overridden events are registered
+        stream = io.StringIO()
+        engine.add_hook(JSONLinesHooks(stream, measure_time=False))
+        self.assertEqual(len(engine._iteration_hooks), 1)
+        self.assertEqual(engine._cutoff_hooks, ())
+        engine.search(board, depth=2)
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([(record['event'], record['depth']) for record in records],
+                         [("iteration", 1), ("iteration", 2)])
+
+class TestOpeningBook(unittest.TestCase):
+    """Polyglot opening book tests"""
+    
+    @staticmethod
+    def raw_move(uci):
+        """Polyglot move encoding of a from/to square move"""
+        from_file, from_row = ord(uci[0]) - ord('a'), int(uci[1]) - 1
+        to_file, to_row = ord(uci[2]) - ord('a'), int(uci[3]) - 1
+        return to_file | to_row << 3 | from_file << 6 | from_row << 9
+    
+    def write_book(self, path, entries):
+        """Write (key, uci move, weight) entries as a sorted Polyglot book"""
+        import struct
+        with open(path, 'wb') as book_file:
+            for key, uci, weight in sorted(entries):
+                book_file.write(struct.pack(">QHHI", key, self.raw_move(uci), weight, 0))
+    
+    def test_polyglot_hash(self):
+        """Test the Polyglot keys of the reference positions of the format"""
+        from chess_engine.book import polyglot_hash
+        
+        board = ChessBoard()
+        expected = [0x463b96181691fc9c, 0x823c9b50fd114196, 0x0756b94461c50fb0, 0x662fafb965db29d4,
+                    0x22a48b5a8e47ff78, 0x652a607ca3f242c1, 0x00fdd303c946bdd9]
+        self.assertEqual(polyglot_hash(board), expected[0])
+        for uci, key in zip(["e2e4", "d7d5", "e4e5", "f7f5", "e1e2", "e8f7"], expected[1:]):
+            move = next(move for move in MoveGenerator(board).generate_legal_moves(board.current_player)
+                        if str(move) == uci)
+            board.make_move(move)
+            self.assertEqual(polyglot_hash(board), key, uci)
+        
+        # The en passant file counts only when a pawn can capture (after f7f5 above it can)
+        board = ChessBoard("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3")
+        self.assertEqual(polyglot_hash(board), 0x22a48b5a8e47ff78)
+    
+    def test_book_moves(self):
+        """Test lookup, weighted choice, castling decoding and illegal entries"""
+        import random
+        import tempfile
+        from chess_engine.book import PolyglotBook, polyglot_hash
+        
+        start = ChessBoard()
+        castling = ChessBoard("r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R w KQkq - 0 1")
+        start_key, castling_key = polyglot_hash(start), polyglot_hash(castling)
+        entries = [(start_key, "e2e4", 30), (start_key, "d2d4", 10), (start_key, "e2e5", 50),
+                   (start_key, "g1f3", 0), (castling_key, "e1h1", 1), (castling_key, "e1a1", 1)]
+        entries += [(key, "a2a3", 1) for key in range(0, 2 ** 64, 2 ** 58)]
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "book.bin")
+            self.write_book(path, entries)
+            with PolyglotBook(path) as book:
+                self.assertEqual(len(book), len(entries))
+                self.assertEqual(len(book.entries(start_key)), 4)
+                self.assertEqual(book.entries(start_key + 1), [])
+                
+                # Illegal (e2e5) and zero-weight (g1f3) entries are skipped
+                moves = book.get_moves(start)
+                self.assertEqual([(str(move), weight) for move, weight in moves], [("e2e4", 30), ("d2d4", 10)])
+                self.assertEqual(str(book.choose_move(start, best=True)), "e2e4")
+                rng = random.Random(1)
+                picks = [str(book.choose_move(start, rng)) for _ in range(200)]
+                self.assertEqual(set(picks), {"e2e4", "d2d4"})
+                self.assertGreater(picks.count("e2e4"), picks.count("d2d4"))
+                
+                # Castling is stored as the king taking its own rook
+                moves = sorted(str(move) for move, _ in book.get_moves(castling))
+                self.assertEqual(moves, ["e1c1", "e1g1"])
+                self.assertTrue(all(move.is_castling for move, _ in book.get_moves(castling)))
+                self.assertIsNone(book.choose_move(ChessBoard("8/8/4k3/8/8/4K3/8/8 w - - 0 1")))
+            
+            # The engine plays book moves without searching
+            engine = MinimaxEngine(config=SearchConfig(opening_book_path=path))
+            result = engine.search(start, depth=4)
+            self.assertIn(str(result.move), ("e2e4", "d2d4"))
+            self.assertEqual((result.depth, engine.nodes_searched), (0, 0))
+            self.assertEqual(len(start.move_history), 0)
+            engine.open_opening_book(None)
+            self.assertIsNone(engine.opening_book)
+            
+            # UCI: OwnBook enables the book named by BookFile
+            from chess_engine.uci.uci_interface import UCIInterface
+            uci = UCIInterface()
+            self.assertIsNone(uci.process_command(f"setoption name BookFile value {path}"))
+            self.assertIsNone(uci.engine.opening_book)
+            uci.process_command("setoption name OwnBook value true")
+            self.assertIsNotNone(uci.engine.opening_book)
+            uci.process_command("setoption name OwnBook value false")
+            self.assertIsNone(uci.engine.opening_book)
+    
+    def test_encode_move(self):
+        """Test the Polyglot move encoding, including castling and promotions"""
+        from chess_engine.book import encode_move
+        from chess_engine.book.polyglot import book_move
+        
+        board = ChessBoard("r3k2r/1P6/8/8/8/8/8/R3K2R w KQkq - 0 1")
+        for move in MoveGenerator(board).generate_legal_moves(Color.WHITE):
+            raw = encode_move(move)
+            if move.is_castling:
+                self.assertEqual(raw, self.raw_move("e1h1" if str(move) == "e1g1" else "e1a1"))
+            elif not move.promotion:
+                self.assertEqual(raw, self.raw_move(str(move)))
+            decoded = book_move(board, raw)
+            self.assertEqual((str(decoded), decoded.promotion), (str(move), move.promotion))
+        
+        queen = Move((1, 1), (0, 0), PieceType.PAWN, Color.WHITE, PieceType.QUEEN, is_capture=True)
+        self.assertEqual(encode_move(queen), self.raw_move("b7a8") | 4 << 12)
+    
+    @unittest.skipUnless(importlib.util.find_spec("torch"), "the training package requires torch")
+    def test_build_book(self):
+        """Test building a book from PGN: counting, results, pruning and the parallel merge"""
+        import tempfile
+        from chess_engine.book import PolyglotBook, polyglot_hash
+        from chess_engine.book.builder import build_book
+        
+        italian = '1. e4 e5 2. Nf3 {main line} Nc6 (2... d6) 3. Bc4 Bc5 4. O-O Nf6'
+        games = [(italian, "1-0"), (italian, "1-0"), (italian, "1/2-1/2"), (italian, "*"),
+                 ("1. d4 d5 2. c4", "0-1"), ("1. e4 c5 2. Nf3", "0-1")]
+        pgn = "".join(f'[Event "Test {index}"]\n[Result "{result}"]\n\n{moves} {result}\n\n'
+                      for index, (moves, result) in enumerate(games))
+        
+        with tempfile.TemporaryDirectory() as directory:
+            pgn_path = os.path.join(directory, "games.pgn")
+            with open(pgn_path, 'w') as pgn_file:
+                pgn_file.write(pgn)
+            
+            books = []
+            for processes, batch_size, fan_in in ((1, 1000, 64), (2, 1, 2)):
+                path = os.path.join(directory, f"book-{processes}.bin")
+                stats = build_book([pgn_path], path, max_ply=7, min_games=2, processes=processes,
+                                   batch_size=batch_size, merge_fan_in=fan_in)
+                self.assertEqual((stats['games'], stats['skipped']), (5, 1))
+                with open(path, 'rb') as book_file:
+                    books.append(book_file.read())
+            self.assertEqual(books[0], books[1])
+            
+            with PolyglotBook(path) as book:
+                # 1. e4 in four games (2 wins, 1 draw, 1 loss); 1. d4 only once
+                start = ChessBoard()
+                self.assertEqual([(str(move), weight) for move, weight in book.get_moves(start)],
+                                 [("e2e4", 5)])
+                
+                # Black's reply scores from black's point of view
+                start.make_move(book.choose_move(start, best=True))
+                self.assertEqual([(str(move), weight) for move, weight in book.get_moves(start)],
+                                 [("e7e5", 1)])
+                
+                # Castling (ply 7) is stored as e1h1, the reply beyond max_ply is not counted
+                board = ChessBoard("r1bqk1nr/pppp1ppp/2n5/2b1p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4")
+                moves = book.get_moves(board)
+                self.assertEqual([(str(move), move.is_castling) for move, _ in moves], [("e1g1", True)])
+                board.make_move(moves[0][0])
+                self.assertEqual(book.entries(polyglot_hash(board)), [])
+                self.assertEqual(stats['positions'], 7)
+
+class TestEndgameTables(unittest.TestCase):
+    """Endgame table generation and probing tests"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Generate the three-piece tables once (a few seconds)"""
+        import tempfile
+        from chess_engine.endgame.generator import generate_tables
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.summary = generate_tables(cls.directory.name, ["KQK", "KRK", "KPK"])
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+    
+    def test_generation(self):
+        """Test the known longest mates and the won KPK positions"""
+        self.assertEqual(self.summary['KQK']['longest'], 19)
+        self.assertEqual(self.summary['KRK']['longest'], 31)
+        self.assertEqual(self.summary['KQK']['wins'], self.summary['KQK']['positions'])
+        self.assertEqual((self.summary['KPK']['positions'], self.summary['KPK']['wins']), (163328, 124960))
+    
+    def test_probe(self):
+        """Test mates, stalemates, draws, mirrored colors and uncovered positions"""
+        import tempfile
+        from chess_engine.endgame import EndgameTables
+        from chess_engine.eval.evaluation import MATE_SCORE
+        from chess_engine.search.transposition import MATE_BOUND
+        
+        with EndgameTables(self.directory.name) as tables:
+            self.assertEqual(len(tables), 3)
+            self.assertEqual(tables.probe(ChessBoard("k7/1Q6/1K6/8/8/8/8/8 b - - 0 1")), -MATE_SCORE)
+            self.assertEqual(tables.probe(ChessBoard("k7/8/1K6/8/8/8/8/6Q1 w - - 0 1")), MATE_SCORE - 1)
+            self.assertEqual(tables.probe(ChessBoard("k7/8/1QK5/8/8/8/8/8 b - - 0 1")), 0)
+            
+            # Black as the stronger side and the other board symmetries
+            self.assertEqual(tables.probe(ChessBoard("K7/1q6/1k6/8/8/8/8/8 w - - 0 1")), -MATE_SCORE)
+            self.assertEqual(tables.probe(ChessBoard("8/8/8/8/8/6K1/6Q1/7k b - - 0 1")), -MATE_SCORE)
+            
+            # Opposition: a draw with white to move, a win with black to move
+            self.assertEqual(tables.probe(ChessBoard("8/8/8/4k3/8/4K3/4P3/8 w - - 0 1")), 0)
+            self.assertLessEqual(tables.probe(ChessBoard("8/8/8/4k3/8/4K3/4P3/8 b - - 0 1")), -MATE_BOUND)
+            self.assertEqual(tables.probe(ChessBoard("3k4/8/3K4/8/8/8/2P5/8 b - - 0 1")),
+                             tables.probe(ChessBoard("8/2p5/8/8/8/3k4/8/3K4 w - - 0 1")))
+            
+            # Missing tables, pieces on both sides and castling rights
+            self.assertIsNone(tables.probe(ChessBoard("k7/8/1K6/8/8/8/8/1B6 w - - 0 1")))
+            self.assertIsNone(tables.probe(ChessBoard("k7/8/1K6/8/8/8/8/1Q5r w - - 0 1")))
+            self.assertIsNone(tables.probe(ChessBoard("4k3/8/8/8/8/8/8/R3K3 w Q - 0 1")))
+            self.assertIsNone(tables.probe(ChessBoard()))
+        
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "KQK.egtb"), 'wb') as table_file:
+                table_file.write(b"not a table" * 10)
+            with self.assertRaises(ValueError):
+                EndgameTables(directory)
+    
+    def test_search_and_evaluation(self):
+        """Test that the search and the evaluation return the table scores"""
+        from chess_engine.search.transposition import MATE_BOUND
+        
+        board = ChessBoard("8/8/8/3k4/8/8/8/R3K3 w - - 0 1")
+        engine = MinimaxEngine(config=SearchConfig(endgame_tables_path=self.directory.name))
+        expected = engine.endgame_tables.probe(board)
+        self.assertGreaterEqual(expected, MATE_BOUND)
+        
+        result = engine.search(board, depth=2)
+        self.assertEqual(result.score, expected)
+        self.assertGreater(engine.get_search_stats()['endgame_table_hits'], 0)
+        board.make_move(result.move)
+        self.assertEqual(engine.endgame_tables.probe(board), -(expected + 1))
+        self.assertEqual(engine.evaluation_engine.evaluate(board, Color.WHITE), expected + 1)
+        self.assertEqual(engine.evaluation_engine.evaluate(board, Color.BLACK), -(expected + 1))
+        
+        engine.open_endgame_tables(None)
+        self.assertIsNone(engine.evaluation_engine.endgame_tables)
+        self.assertIsNone(engine.config.endgame_tables_path)
+        
+        # UCI: the EndgameTables option names the directory
+        from chess_engine.uci.uci_interface import UCIInterface
+        uci = UCIInterface()
+        self.assertIsNone(uci.process_command(f"setoption name EndgameTables value {self.directory.name}"))
+        self.assertEqual(len(uci.engine.endgame_tables), 3)
+        uci.process_command("setoption name EndgameTables value <empty>")
+        self.assertIsNone(uci.engine.endgame_tables)
+
+class TestMaterialEvaluation(unittest.TestCase):
+    """Material key dispatch, imbalance and specialized endgame evaluation tests"""
+    
+    def setUp(self):
+        self.evaluator = EvaluationEngine()
+    
+    def test_signature_keys(self):
+        """Test that signature keys match the keys of boards with that material"""
+        from chess_engine.eval.material import signature_keys
+        
+        white_key, black_key = signature_keys("KBNK")
+        self.assertEqual(ChessBoard("7k/8/8/8/8/8/8/KBN5 w - - 0 1").material_key, white_key)
+        self.assertEqual(ChessBoard("kbn5/8/8/8/8/8/8/7K w - - 0 1").material_key, black_key)
+        self.assertEqual(signature_keys("KK"), (0, 0))
+        with self.assertRaises(ValueError):
+            signature_keys("KXK")
+    
+    def test_imbalance(self):
+        """Test the bishop pair bonus on top of the material balance"""
+        from chess_engine.eval.material import BISHOP_PAIR_BONUS
+        
+        board = ChessBoard("4k3/8/8/8/8/8/8/2B1KB2 w - - 0 1")
+        expected = 2 * self.evaluator.material_values[PieceType.BISHOP] + BISHOP_PAIR_BONUS
+        self.assertEqual(self.evaluator._evaluate_material(board, Color.WHITE), expected)
+        self.assertEqual(self.evaluator._evaluate_material(board, Color.BLACK), -expected)
+        self.assertEqual(self.evaluator._evaluate_material(ChessBoard(), Color.WHITE), 0)
+    
+    def test_lone_king_endgames(self):
+        """Test that KRK and KBNK drive the lone king to the edge and the right corner"""
+        from chess_engine.eval.material import KNOWN_WIN, evaluate_lone_king
+        
+        centre = ChessBoard("8/8/4k3/8/4K3/8/8/R7 w - - 0 1")
+        edge = ChessBoard("8/8/8/8/4K3/8/4k3/R7 w - - 0 1")
+        self.assertGreaterEqual(self.evaluator.evaluate(centre, Color.WHITE), KNOWN_WIN)
+        self.assertGreater(self.evaluator.evaluate(edge, Color.WHITE), self.evaluator.evaluate(centre, Color.WHITE))
+        self.assertEqual(self.evaluator.evaluate(edge, Color.BLACK), -self.evaluator.evaluate(edge, Color.WHITE))
+        
+        # The dark-squared bishop mates in a1 or h8, not in a8
+        right_corner = ChessBoard("7k/8/5K2/8/8/8/8/2B1N3 w - - 0 1")
+        wrong_corner = ChessBoard("k7/8/2K5/8/8/8/8/2B1N3 w - - 0 1")
+        self.assertGreater(self.evaluator.evaluate(right_corner, Color.WHITE),
+                           self.evaluator.evaluate(wrong_corner, Color.WHITE))
+        
+        # Any queen or rook against a lone king, with either color stronger
+        entry = self.evaluator.material_table.probe(ChessBoard("1qr1k3/8/8/8/8/8/8/4K3 w - - 0 1"))
+        self.assertEqual((entry.evaluator, entry.strong), (evaluate_lone_king, Color.BLACK))
+    
+    def test_draws_and_scaling(self):
+        """Test insufficient material draws and opposite-colored bishop scaling"""
+        from chess_engine.eval.material import OPPOSITE_BISHOPS_SCALE
+        
+        for fen in ("8/8/8/4k3/8/8/8/4K3 w - - 0 1", "8/8/8/4k3/8/8/8/2B1K3 w - - 0 1",
+                    "8/8/8/4k3/8/8/8/1N2K1N1 b - - 0 1", "8/8/8/4k3/3b4/8/8/2B1K3 w - - 0 1"):
+            self.assertEqual(self.evaluator.evaluate(ChessBoard(fen), Color.WHITE), 0, fen)
+        
+        opposite = ChessBoard("8/5p2/8/4k3/2b5/8/3P4/2B1K3 w - - 0 1")
+        same = ChessBoard("8/5p2/8/4k3/3b4/8/3P4/2B1K3 w - - 0 1")
+        for board, scale in ((opposite, OPPOSITE_BISHOPS_SCALE), (same, 1.0)):
+            entry = self.evaluator.material_table.probe(board)
+            self.assertEqual(entry.scale(board), scale)
+        self.assertIsNone(self.evaluator.material_table.probe(ChessBoard()).scale)
+
+class TestBatchEvaluation(unittest.TestCase):
+    """NumPy batch evaluation tests"""
+    
+    def setUp(self):
+        self.evaluator = EvaluationEngine()
+    
+    def _scalar(self, boards, color=None):
+        return [self.evaluator.evaluate(board, color if color is not None else board.current_player)
+                for board in boards]
+    
+    def test_batch_matches_scalar(self):
+        """Test that batch scores equal evaluate on bench and random-play positions"""
+        import random
+        from chess_engine.bench import BENCH_FENS
+        
+        rng = random.Random(7)
+        boards = [ChessBoard(fen) for fen in BENCH_FENS]
+        for _ in range(8):
+            board = ChessBoard()
+            for ply in range(rng.randrange(10, 120)):
+                moves = MoveGenerator(board).generate_legal_moves(board.current_player)
+                if not moves:
+                    break
+                board.make_move(rng.choice(moves))
+                if ply % 5 == 0:
+                    boards.append(board.copy())
+        
+        for color in (None, Color.WHITE, Color.BLACK):
+            scores = self.evaluator.evaluate_batch(boards, color)
+            self.assertEqual(scores.tolist(), self._scalar(boards, color))
+        
+        # FEN strings score like boards built from them
+        fens = [board._get_fen() for board in boards]
+        self.assertEqual(self.evaluator.evaluate_batch(fens).tolist(),
+                         self._scalar([ChessBoard(fen) for fen in fens]))
+    
+    def test_special_positions(self):
+        """Test mates, stalemates, checks, known endgames and scaled endings"""
+        fens = [
+            "rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3",  # mated
+            "7k/5Q2/6K1/8/8/8/8/8 b - - 0 1",  # stalemated
+            "4k3/8/8/8/8/8/4r3/4K3 w - - 0 1",  # check with escapes, KRK
+            "rnbqkbnr/ppp2ppp/8/1B1pp3/4P3/8/PPPP1PPP/RNBQK1NR b KQkq - 1 3",  # check
+            "7k/8/5K2/8/8/8/8/2B1N3 w - - 0 1",  # KBNK
+            "8/5p2/8/4k3/2b5/8/3P4/2B1K3 w - - 0 1",  # opposite bishops
+            "8/8/8/4k3/3b4/8/8/2B1K3 b - - 0 1",  # same-colored bishops
+            "4k3/8/8/8/8/8/8/4K2R w K - 0 1"
+        ]
+        boards = [ChessBoard(fen) for fen in fens]
+        self.assertEqual(self.evaluator.evaluate_batch(fens).tolist(), self._scalar(boards))
+        self.assertEqual(self.evaluator.evaluate_batch(boards, Color.WHITE).tolist(),
+                         self._scalar(boards, Color.WHITE))
+    
+    def test_encoding(self):
+        """Test the piece tensor and invalid input"""
+        from chess_engine.eval.batch import encode_positions
+        
+        start = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+        board = ChessBoard(start)
+        board.make_move(Move((4, 6), (4, 4), PieceType.PAWN, Color.WHITE))
+        planes, white_to_move, history = encode_positions([start, board])
+        self.assertEqual(planes.shape, (2, 12, 64))
+        self.assertEqual(planes.sum(axis=(1, 2)).tolist(), [32, 32])
+        self.assertTrue(planes[0, 0, 52] and planes[1, 0, 36] and planes[0, 11, 4])
+        self.assertEqual(white_to_move.tolist(), [True, False])
+        self.assertEqual(history.tolist(), [0, 1])
+        self.assertEqual(len(self.evaluator.evaluate_batch([])), 0)
+        
+        for fen in ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1",
+                    "rnbqkbnr/ppppxppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", "8/8/8 w"):
+            with self.assertRaises(ValueError):
+                self.evaluator.evaluate_batch([start, fen])
+
+
+class TestFeatureExtraction(unittest.TestCase):
+    """Linear evaluation feature tests"""
+    
+    def setUp(self):
+        self.evaluator = EvaluationEngine()
+    
+    def _positions(self):
+        import random
+        from chess_engine.bench import BENCH_FENS
+        
+        rng = random.Random(11)
+        boards = [ChessBoard(fen) for fen in BENCH_FENS]
+        for _ in range(4):
+            board = ChessBoard()
+            for ply in range(rng.randrange(10, 100)):
+                moves = MoveGenerator(board).generate_legal_moves(board.current_player)
+                if not moves:
+                    break
+                board.make_move(rng.choice(moves))
+                if ply % 6 == 0:
+                    boards.append(board.copy())
+        return boards
+    
+    def test_features_reproduce_evaluate(self):
+        """Test that features times weights give evaluate for both layouts and any weights"""
+        boards = self._positions()
+        for weights in (None, {"material": 1.3, "position": 0.7, "mobility": 1.9, "tempo": 0.4}):
+            if weights is not None:
+                self.evaluator.weights.update(weights)
+            for pst in (False, True):
+                feature_weights = self.evaluator.feature_weights(pst)
+                for board in boards:
+                    for color in (Color.WHITE, Color.BLACK):
+                        features = self.evaluator.extract_features(board, color, pst)
+                        if features is None:
+                            continue
+                        self.assertEqual(int(round(features @ feature_weights)),
+                                         self.evaluator.evaluate(board, color))
+    
+    def test_feature_layouts(self):
+        """Test feature names, positions without features and scaled endings"""
+        from chess_engine.eval.features import feature_names
+        
+        self.assertEqual(len(feature_names()), 8)
+        self.assertEqual(len(feature_names(pst=True)), 8 - 1 + 6 * 64)
+        self.assertEqual(len(self.evaluator.feature_weights(pst=True)), len(feature_names(pst=True)))
+        
+        # The piece-square features count table entries from the owner's side
+        board = ChessBoard("4k3/8/2n5/8/8/8/4P3/4K3 w - - 0 1")
+        features = self.evaluator.extract_features(board, Color.WHITE, pst=True)
+        names = feature_names(pst=True)
+        self.assertEqual(features[names.index("position.knight.c3")], -1)
+        self.assertEqual(features[names.index("position.king.e1")], 0)
+        
+        mated = ChessBoard("rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3")
+        self.assertIsNone(self.evaluator.extract_features(mated))
+        self.assertIsNone(self.evaluator.extract_features(ChessBoard("4k3/8/8/8/8/8/8/R3K3 w - - 0 1")))
+        
+        opposite = ChessBoard("8/5p2/8/4k3/2b5/8/3P4/2B1K3 w - - 0 1")
+        features = self.evaluator.extract_features(opposite, Color.WHITE)
+        self.assertEqual(int(round(features @ self.evaluator.feature_weights())),
+                         self.evaluator.evaluate(opposite, Color.WHITE))
+    
+    @unittest.skipUnless(importlib.util.find_spec("torch"), "the training package requires torch")
+    def test_dataset_feature_matrix(self):
+        """Test cached dataset features and the feature matrix"""
+        import tempfile
+        from chess_engine.train.dataset import ChessDataset, GamePosition
+        
+        fens = ["rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
+                "rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3",
+                "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"]
+        with tempfile.TemporaryDirectory() as directory:
+            dataset = ChessDataset(directory, evaluator=self.evaluator)
+            dataset.positions = [GamePosition(fen, "", 0.5, "1/2-1/2", 1, Color.WHITE) for fen in fens]
+            
+            X, y = dataset.get_feature_matrix()
+            self.assertEqual(X.shape, (2, 8))
+            self.assertEqual(len(y), 2)
+            self.assertIs(dataset.position_features(fens[0]), dataset.position_features(fens[0]))
+            scores = X @ self.evaluator.feature_weights()
+            self.assertEqual(int(round(scores[0])), self.evaluator.evaluate(ChessBoard(fens[0]), Color.WHITE))
+            
+            features, labels = dataset.get_training_data(["material", "mobility"])
+            self.assertEqual((len(features), len(features[0]), len(labels)), (2, 2, 2))
+    
+    @unittest.skipUnless(importlib.util.find_spec("torch"), "the training package requires torch")
+    def test_trainer_positions_without_features(self):
+        """Test the trainer's input size and positions scored exactly"""
+        from chess_engine.train.trainer import NeuralTrainer
+        
+        with self.assertRaises(ValueError):
+            NeuralTrainer(input_size=64, device="cpu")
+        
+        trainer = NeuralTrainer(hidden_sizes=[8], device="cpu")
+        for fen in ["rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3",
+                    "4k3/8/8/8/8/8/8/R3K3 w - - 0 1"]:
+            self.assertEqual(trainer.evaluate_position(fen),
+                             self.evaluator.evaluate(ChessBoard(fen), Color.WHITE))
+        self.assertIsInstance(trainer.evaluate_position("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"), float)
+
+
 def run_comprehensive_tests():
     """Run all comprehensive tests"""
     print("Running comprehensive chess engine tests...")
@@ -211,7 +1463,19 @@ def run_comprehensive_tests():
     
     # Add test cases
     suite.addTests(loader.loadTestsFromTestCase(TestChessEngine))
+    suite.addTests(loader.loadTestsFromTestCase(TestSearchTechniques))
     suite.addTests(loader.loadTestsFromTestCase(TestPerformance))
+    suite.addTests(loader.loadTestsFromTestCase(TestTimeManager))
+    suite.addTests(loader.loadTestsFromTestCase(TestUCIInterface))
+    suite.addTests(loader.loadTestsFromTestCase(TestLazySMP))
+    suite.addTests(loader.loadTestsFromTestCase(TestRootSplit))
+    suite.addTests(loader.loadTestsFromTestCase(TestBench))
+    suite.addTests(loader.loadTestsFromTestCase(TestSearchHooks))
+    suite.addTests(loader.loadTestsFromTestCase(TestOpeningBook))
+    suite.addTests(loader.loadTestsFromTestCase(TestEndgameTables))
+    suite.addTests(loader.loadTestsFromTestCase(TestMaterialEvaluation))
+    suite.addTests(loader.loadTestsFromTestCase(TestBatchEvaluation))
+    suite.addTests(loader.loadTestsFromTestCase(TestFeatureExtraction))
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
@@ -50,8 +50,8 @@ class TestEvaluationEngine(unittest.TestCase):
         """Test full position evaluation"""
         score = self.evaluator.evaluate(self.board, Color.WHITE)
         
-        # Score should be finite
-        self.assertIsInstance(score, float)
+        # Score should be finite integer centipawns
+        self.assertIsInstance(score, int)
         self.assertTrue(abs(score) < float('inf'))
     
     def test_evaluation_breakdown(self):
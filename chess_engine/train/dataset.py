@@ -2,18 +2,35 @@
 Chess Dataset - PGN loading and parsing for training
 
 This module implements:
-- PGN file loading and parsing
+- PGN file loading and parsing, including streaming of large files
+  game by game
+- SAN move parsing against the legal moves of a position
 - Position extraction from games
 - Label generation for supervised learning
 - Dataset preprocessing and augmentation
+- Evaluation features per position (EvaluationEngine.extract_features),
+  cached, and the feature matrix for linear (Texel-style) tuning
 """
 
 import re
 import os
 import json
-from typing import List, Dict, Tuple, Any, Optional
+from typing import List, Dict, Tuple, Any, Optional, Iterator
 from dataclasses import dataclass
-from ..board.board import ChessBoard, Color, Move
+import numpy as np
+from ..board.board import ChessBoard, Color, Move, PieceType
+from ..board.move_generator import MoveGenerator
+from ..eval.evaluation import EvaluationEngine
+from ..eval.features import feature_names
+
+# One SAN move: castling or [piece][from file][from rank][x]square[=promotion]
+SAN_PATTERN = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$')
+SAN_TOKEN = r'O-O-O|O-O|0-0-0|0-0|[NBRQK]?[a-h]?[1-8]?x?[a-h][1-8](?:=[NBRQ])?'
+
+SAN_PIECES = {
+    'N': PieceType.KNIGHT, 'B': PieceType.BISHOP, 'R': PieceType.ROOK,
+    'Q': PieceType.QUEEN, 'K': PieceType.KING
+}
 
 @dataclass
 class GamePosition:
@@ -40,17 +57,23 @@ class ChessGame:
 class ChessDataset:
     """Dataset for chess position training"""
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", evaluator: Optional[EvaluationEngine] = None):
         """
         Initialize chess dataset
         
         Args:
             data_dir: Directory containing PGN files
+            evaluator: Evaluation whose terms are the features (created on
+                       first use if None)
         """
         self.data_dir = data_dir
         self.games = []
         self.positions = []
         self.loaded_files = set()
+        self.evaluator = evaluator
+        # (FEN, piece-square layout) -> features; features do not depend on
+        # the weights, so they stay valid while the weights are tuned
+        self.feature_cache: Dict[Tuple[str, bool], Optional[np.ndarray]] = {}
         
         # Create data directory if it doesn't exist
         os.makedirs(data_dir, exist_ok=True)
@@ -111,6 +134,50 @@ class ChessDataset:
         
         return games
     
+    def iter_game_texts(self, filepath: str) -> Iterator[str]:
+        """
+        Stream the games of a PGN file as raw text, one game at a time
+        
+        A game ends where the header section of the next one starts, so the
+        file is never read into memory as a whole.
+        
+        Args:
+            filepath: Path to PGN file
+        
+        Returns:
+            Iterator over the text of every game
+        """
+        lines = []
+        in_moves = False
+        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                stripped = line.strip()
+                if stripped.startswith('[') and in_moves:
+                    yield '\n'.join(lines)
+                    lines = []
+                    in_moves = False
+                if stripped:
+                    lines.append(stripped)
+                    if not stripped.startswith('['):
+                        in_moves = True
+        if lines:
+            yield '\n'.join(lines)
+    
+    def iter_pgn_games(self, filepath: str) -> Iterator[ChessGame]:
+        """
+        Stream the parsed games of a PGN file (see iter_game_texts)
+        
+        Args:
+            filepath: Path to PGN file
+        
+        Returns:
+            Iterator over the games that have moves
+        """
+        for game_text in self.iter_game_texts(filepath):
+            game = self._parse_single_game(game_text)
+            if game:
+                yield game
+    
     def _parse_single_game(self, game_text: str) -> Optional[ChessGame]:
         """Parse a single PGN game"""
         lines = game_text.strip().split('\n')
@@ -149,24 +216,19 @@ class ChessDataset:
     
     def _extract_moves(self, move_text: str) -> List[str]:
         """Extract moves from move text"""
-        # Remove game result and other annotations
-        move_text = re.sub(r'\s+\d+-\d+|\s+\d+/\d+-\d+/\d+|\s+\*', '', move_text)
-        
-        # Split by move numbers and extract moves
-        moves = []
-        move_pattern = r'(\d+\.\s*)?([NBRQK]?[a-h]?[1-8]?x?[a-h][1-8](?:=[NBRQ])?[+#]?)\s*([NBRQK]?[a-h]?[1-8]?x?[a-h][1-8](?:=[NBRQ])?[+#]?)?'
+        # Remove comments, variations (innermost first) and annotation glyphs
+        move_text = re.sub(r'\{[^}]*\}|;[^\n]*|\$\d+', ' ', move_text)
+        while '(' in move_text:
+            stripped = re.sub(r'\([^()]*\)', ' ', move_text)
+            if stripped == move_text:
+                break
+            move_text = stripped
         
-        matches = re.findall(move_pattern, move_text)
-        for match in matches:
-            white_move = match[1]
-            black_move = match[2]
-            
-            if white_move:
-                moves.append(white_move)
-            if black_move:
-                moves.append(black_move)
+        # Remove game result and move numbers
+        move_text = re.sub(r'1-0|0-1|1/2-1/2|\*', ' ', move_text)
+        move_text = re.sub(r'\d+\.(\.\.)?', ' ', move_text)
         
-        return moves
+        return re.findall(SAN_TOKEN, move_text)
     
     def extract_positions(self, games: List[ChessGame], max_positions_per_game: int = 50) -> List[GamePosition]:
         """
@@ -227,12 +289,57 @@ class ChessDataset:
         return positions
     
     def _parse_move(self, move_str: str, board: ChessBoard) -> Optional[Move]:
-        """Parse move string and create Move object"""
-        # TODO: Implement proper move parsing
-        # This is a simplified version - real implementation would be more complex
+        """
+        Parse a SAN move in a position
         
-        # For now, return None to indicate parsing not implemented
-        return None
+        Only the moves of pieces that fit the SAN are generated, and only
+        the candidates reaching the target square are checked for legality.
+        
+        Args:
+            move_str: Move in SAN (check marks and annotations allowed)
+            board: Position the move is played in
+        
+        Returns:
+            The matching legal move, or None if there is none or the SAN is
+            ambiguous
+        """
+        san = move_str.rstrip('+#!?')
+        color = board.current_player
+        back_rank = 7 if color == Color.WHITE else 0
+        
+        if san in ('O-O', '0-0', 'O-O-O', '0-0-0'):
+            piece_type = PieceType.KING
+            from_file, from_rank = 4, back_rank
+            to_square = (6 if len(san) == 3 else 2, back_rank)
+            promotion = None
+        else:
+            match = SAN_PATTERN.match(san)
+            if not match:
+                return None
+            piece, file_hint, rank_hint, target, promotion_letter = match.groups()
+            piece_type = SAN_PIECES[piece] if piece else PieceType.PAWN
+            from_file = ord(file_hint) - ord('a') if file_hint else None
+            from_rank = 8 - int(rank_hint) if rank_hint else None
+            to_square = (ord(target[0]) - ord('a'), 8 - int(target[1]))
+            promotion = SAN_PIECES[promotion_letter] if promotion_letter else None
+        
+        generator = MoveGenerator(board)
+        found = None
+        for rank in range(8) if from_rank is None else (from_rank,):
+            for file in range(8) if from_file is None else (from_file,):
+                square = board.board[rank][file]
+                if square.piece_type != piece_type or square.color != color:
+                    continue
+                for move in generator._generate_piece_moves((file, rank), square):
+                    if move.to_square != to_square or move.promotion != promotion:
+                        continue
+                    if not board.make_move(move):
+                        continue
+                    board.undo_move()
+                    if found is not None:
+                        return None
+                    found = move
+        return found
     
     def _estimate_evaluation(self, board: ChessBoard, game_result: str, move_number: int) -> float:
         """Estimate position evaluation based on game result and position"""
@@ -303,43 +410,83 @@ class ChessDataset:
         Get training data in format suitable for machine learning
         
         Args:
-            features: List of features to extract (None for all)
+            features: Names of the features to extract (None for all; see
+                      eval.features.feature_names)
             
         Returns:
-            Tuple of (features, labels)
+            Tuple of (features, labels) of the positions that have features
         """
         if not self.positions:
             return [], []
         
-        # TODO: Implement feature extraction
-        # - Convert FEN to feature vector
-        # - Extract piece positions, material, etc.
-        # - Normalize features
-        
         X = []  # Features
         y = []  # Labels (evaluations)
         
         for position in self.positions:
-            # Placeholder feature extraction
             features_vector = self._extract_features(position.fen, features)
-            X.append(features_vector)
-            y.append(position.evaluation)
+            # Positions scored without the weighted terms have no features
+            if features_vector is not None:
+                X.append(features_vector)
+                y.append(position.evaluation)
         
         return X, y
     
-    def _extract_features(self, fen: str, feature_list: List[str] = None) -> List[float]:
-        """Extract features from FEN string"""
-        # TODO: Implement comprehensive feature extraction
-        # - Material balance
-        # - Piece positions
-        # - King safety
-        # - Pawn structure
-        # - Mobility
-        # - Center control
-        
-        # Placeholder: return random features
-        import random
-        return [random.random() for _ in range(64)]  # 64 features as placeholder
+    def _extract_features(self, fen: str, feature_list: List[str] = None) -> Optional[List[float]]:
+        """Extract the named evaluation features (all if None) from FEN string"""
+        features = self.position_features(fen)
+        if features is None:
+            return None
+        if feature_list is None:
+            return features.tolist()
+        names = feature_names()
+        return [float(features[names.index(name)]) for name in feature_list]
+        
+    def position_features(self, fen: str, pst: bool = False) -> Optional[np.ndarray]:
+        """
+        Evaluation features of a position from white's perspective, cached
+        
+        Args:
+            fen: Position (evaluated as a board built from it, so without
+                 move history)
+            pst: Split the position term per piece type and square
+        
+        Returns:
+            Features in eval.features.feature_names(pst) order, or None for
+            positions scored without the weighted terms (mates, known
+            endgames)
+        """
+        key = (fen, pst)
+        if key not in self.feature_cache:
+            if self.evaluator is None:
+                self.evaluator = EvaluationEngine()
+            self.feature_cache[key] = self.evaluator.extract_features(ChessBoard(fen), Color.WHITE, pst)
+        return self.feature_cache[key]
+    
+    def get_feature_matrix(self, pst: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Feature matrix and labels for linear tuning
+        
+        The evaluation of every position for some weights is one product,
+        X @ evaluator.feature_weights(pst) (white's perspective, before
+        rounding), so weight updates need no board evaluation.
+        
+        Args:
+            pst: Split the position term per piece type and square
+        
+        Returns:
+            Tuple of (features of shape (N, F), labels of shape (N,)) over
+            the positions that have features
+        """
+        rows = []
+        labels = []
+        for position in self.positions:
+            features = self.position_features(position.fen, pst)
+            if features is not None:
+                rows.append(features)
+                labels.append(position.evaluation)
+        width = len(feature_names(pst))
+        X = np.array(rows, dtype=np.float64).reshape(len(rows), width)
+        return X, np.array(labels, dtype=np.float64)
     
     def get_dataset_stats(self) -> Dict[str, Any]:
         """Get dataset statistics"""
@@ -14,6 +14,9 @@ import torch.optim as optim
 from torch.utils.data import Dataset, DataLoader
 import numpy as np
 from typing import List, Tuple, Dict, Any, Optional
+from ..board.board import ChessBoard, Color
+from ..eval.evaluation import EvaluationEngine
+from ..eval.features import FEATURE_NAMES
 from ..train.dataset import ChessDataset, GamePosition
 
 class ChessPositionDataset(Dataset):
@@ -73,20 +76,28 @@ class EvaluationNetwork(nn.Module):
 class NeuralTrainer:
     """Neural network trainer for chess evaluation"""
     
-    def __init__(self, input_size: int = 64, hidden_sizes: List[int] = [256, 128, 64],
+    def __init__(self, input_size: int = len(FEATURE_NAMES), hidden_sizes: List[int] = [256, 128, 64],
                  learning_rate: float = 0.001, device: str = "auto"):
         """
         Initialize neural trainer
         
         Args:
-            input_size: Size of input feature vector
+            input_size: Size of input feature vector (the evaluation terms,
+                        see ChessDataset.get_training_data)
             hidden_sizes: List of hidden layer sizes
             learning_rate: Learning rate for optimizer
             device: Device to use for training ("auto", "cpu", "cuda")
+        
+        Raises:
+            ValueError: If input_size is not the number of evaluation terms
         """
+        if input_size != len(FEATURE_NAMES):
+            raise ValueError(f"input_size must be {len(FEATURE_NAMES)} (the evaluation terms), got {input_size}")
         self.input_size = input_size
         self.hidden_sizes = hidden_sizes
         self.learning_rate = learning_rate
+        # Feature extraction for evaluate_position (created on first use)
+        self.evaluator = None
         
         # Set device
         if device == "auto":
@@ -230,12 +241,17 @@ class NeuralTrainer:
             fen: FEN string of position
             
         Returns:
-            Evaluation score
+            Evaluation score from white's perspective; positions without
+            features (mates, stalemates, tables and known endgames) get
+            the exact score of the evaluation engine
         """
         self.model.eval()
         
         # Extract features
-        features = self._extract_features(fen)
+        board = ChessBoard(fen)
+        features = self._extract_features(board)
+        if features is None:
+            return float(self.evaluator.evaluate(board, Color.WHITE))
         features_tensor = torch.tensor(features, dtype=torch.float32).unsqueeze(0).to(self.device)
         
         with torch.no_grad():
@@ -243,13 +259,14 @@ class NeuralTrainer:
         
         return evaluation.item()
     
-    def _extract_features(self, fen: str) -> List[float]:
-        """Extract features from FEN string"""
-        # TODO: Implement comprehensive feature extraction
-        # This should match the feature extraction used in training
-        
-        # Placeholder: return random features
-        return [np.random.random() for _ in range(self.input_size)]
+    def _extract_features(self, board: ChessBoard) -> Optional[List[float]]:
+        """Evaluation features used in training, or None (mates and known endgames)"""
+        if self.evaluator is None:
+            self.evaluator = EvaluationEngine()
+        features = self.evaluator.extract_features(board, Color.WHITE)
+        if features is None:
+            return None
+        return features.tolist()
     
     def save_model(self, path: str):
         """Save trained model"""
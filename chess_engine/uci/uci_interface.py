@@ -6,15 +6,26 @@ This module implements:
 - Engine identification and capabilities
 - Position setting and move calculation
 - Engine options and configuration
+- Background search thread with stop, ponder and streaming info lines
 """
 
 import sys
-import time
+import threading
 from typing import Dict, List, Optional, Any
-from ..board.board import ChessBoard, Color
+from ..board.board import ChessBoard, Color, Move, PieceType
+from ..board.move_generator import MoveGenerator
 from ..search.minimax import MinimaxEngine
+from ..search.time_manager import ClockState
+from ..search.transposition import MAX_PLY, mate_in
 from ..eval.evaluation import EvaluationEngine
 
+PROMOTION_LETTERS = {
+    PieceType.KNIGHT: "n",
+    PieceType.BISHOP: "b",
+    PieceType.ROOK: "r",
+    PieceType.QUEEN: "q"
+}
+
 class UCIInterface:
     """UCI protocol interface for chess engine"""
     
@@ -27,15 +38,29 @@ class UCIInterface:
         self.search_time = 5.0
         self.search_depth = 4
         
+        # The search runs on a worker thread so stop/ponderhit/isready are
+        # handled while it thinks. In infinite and ponder mode bestmove is
+        # held back until the GUI sends stop or ponderhit.
+        self.search_thread: Optional[threading.Thread] = None
+        self.output_lock = threading.Lock()
+        self.release_bestmove = threading.Event()
+        self.hold_bestmove = False
+        self.ponderhit_received = False
+        self.engine.info_callback = self._send_info
+        
         # UCI options
         self.options = {
             "Hash": {"type": "spin", "default": 64, "min": 1, "max": 1024, "value": 64},
+            "Clear Hash": {"type": "button"},
             "Depth": {"type": "spin", "default": 4, "min": 1, "max": 20, "value": 4},
             "Time": {"type": "spin", "default": 5, "min": 1, "max": 300, "value": 5},
-            "Threads": {"type": "spin", "default": 1, "min": 1, "max": 8, "value": 1},
+            "Threads": {"type": "spin", "default": 1, "min": 1, "max": 64, "value": 1},
             "OwnBook": {"type": "check", "default": "false", "value": "false"},
+            "BookFile": {"type": "string", "default": "<empty>", "value": ""},
+            "EndgameTables": {"type": "string", "default": "<empty>", "value": ""},
             "Ponder": {"type": "check", "default": "false", "value": "false"}
         }
+        self.engine.set_hash_size(self.options["Hash"]["value"])
     
     def run(self):
         """Main UCI loop"""
@@ -47,16 +72,22 @@ class UCIInterface:
                 
                 response = self.process_command(line)
                 if response:
-                    print(response)
-                    sys.stdout.flush()
+                    self._send(response)
                     
             except EOFError:
                 break
             except KeyboardInterrupt:
                 break
             except Exception as e:
-                print(f"Error: {e}")
-                sys.stdout.flush()
+                self._send(f"Error: {e}")
+        
+        self.stop_search()
+    
+    def _send(self, text: str):
+        """Write a response to the GUI (shared by the main and search threads)"""
+        with self.output_lock:
+            print(text)
+            sys.stdout.flush()
     
     def process_command(self, command: str) -> Optional[str]:
         """
@@ -86,6 +117,8 @@ class UCIInterface:
             return self.handle_go(parts[1:])
         elif cmd == "stop":
             return self.handle_stop()
+        elif cmd == "ponderhit":
+            return self.handle_ponderhit()
         elif cmd == "quit":
             return self.handle_quit()
         elif cmd == "setoption":
@@ -94,6 +127,8 @@ class UCIInterface:
             return self.handle_debug(parts[1:])
         elif cmd == "register":
             return self.handle_register(parts[1:])
+        elif cmd == "bench":
+            return self.handle_bench(parts[1:])
         else:
             return f"Unknown command: {command}"
     
@@ -130,6 +165,7 @@ class UCIInterface:
     
     def handle_ucinewgame(self) -> str:
         """Handle ucinewgame command"""
+        self.stop_search()
         self.board = ChessBoard()
         self.engine.clear_tables()
         return None
@@ -142,7 +178,7 @@ class UCIInterface:
         # Parse position command
         if args[0] == "startpos":
             self.board = ChessBoard()
-            moves_start = 1
+            moves_start = 2 if len(args) > 1 and args[1] == "moves" else len(args)
         elif args[0] == "fen":
             # Parse FEN string
             fen_parts = []
@@ -160,7 +196,7 @@ class UCIInterface:
         if moves_start < len(args):
             for move_str in args[moves_start:]:
                 move = self._parse_move(move_str)
-                if move and not self.board.make_move(move):
+                if move is None or not self.board.make_move(move):
                     return f"Error: Invalid move {move_str}"
         
         return None
@@ -173,23 +209,16 @@ class UCIInterface:
         # Parse go parameters
         search_time = self.search_time
         search_depth = self.search_depth
+        search_nodes = None
         infinite = False
+        ponder = False
+        clock_ms = {}
         
         i = 0
         while i < len(args):
-            if args[i] == "wtime" and i + 1 < len(args):
-                # White time in milliseconds
-                search_time = int(args[i + 1]) / 1000.0
-                i += 2
-            elif args[i] == "btime" and i + 1 < len(args):
-                # Black time in milliseconds
-                search_time = int(args[i + 1]) / 1000.0
-                i += 2
-            elif args[i] == "winc" and i + 1 < len(args):
-                # White increment
-                i += 2
-            elif args[i] == "binc" and i + 1 < len(args):
-                # Black increment
+            if args[i] in ("wtime", "btime", "winc", "binc", "movestogo") and i + 1 < len(args):
+                # Clock state in milliseconds (movestogo is a move count)
+                clock_ms[args[i]] = int(args[i + 1])
                 i += 2
             elif args[i] == "movetime" and i + 1 < len(args):
                 # Fixed time per move
@@ -198,35 +227,94 @@ class UCIInterface:
             elif args[i] == "depth" and i + 1 < len(args):
                 search_depth = int(args[i + 1])
                 i += 2
+            elif args[i] == "nodes" and i + 1 < len(args):
+                search_nodes = int(args[i + 1])
+                i += 2
             elif args[i] == "infinite":
                 infinite = True
                 i += 1
+            elif args[i] == "ponder":
+                ponder = True
+                i += 1
             else:
                 i += 1
         
+        # Clock of the side to move; the time manager turns it into limits
+        clock = None
+        side = "w" if self.board.current_player == Color.WHITE else "b"
+        if f"{side}time" in clock_ms and "movetime" not in args:
+            clock = ClockState(
+                time_left=clock_ms[f"{side}time"] / 1000.0,
+                increment=clock_ms.get(f"{side}inc", 0) / 1000.0,
+                moves_to_go=clock_ms.get("movestogo")
+            )
+        
+        if infinite:
+            search_depth = MAX_PLY - 1
+        elif search_nodes is not None:
+            # A node limit alone is not cut short by the depth or time settings
+            if "depth" not in args:
+                search_depth = MAX_PLY - 1
+            if "movetime" not in args and clock is None:
+                search_time = None
+        
         # Start search
-        self._start_search(search_time, search_depth, infinite)
+        self._start_search(search_time, search_depth, infinite, clock, ponder, search_nodes)
         return None
     
     def handle_stop(self) -> str:
         """Handle stop command"""
-        # TODO: Implement search stopping
+        self.stop_search()
+        return None
+    
+    def handle_ponderhit(self) -> str:
+        """Handle ponderhit command: the expected move was played, switch to our clock"""
+        self.ponderhit_received = True
+        self.engine.time_manager.ponderhit()
+        self.hold_bestmove = False
+        self.release_bestmove.set()
         return None
     
     def handle_quit(self) -> str:
         """Handle quit command"""
+        self.stop_search()
         sys.exit(0)
     
+    def stop_search(self):
+        """Stop a running search and wait until its bestmove has been sent"""
+        thread = self.search_thread
+        if thread is None:
+            return
+        
+        self.release_bestmove.set()
+        # Repeat the request: the worker may not have started the clock yet
+        while thread.is_alive():
+            self.engine.stop()
+            thread.join(0.05)
+        self.search_thread = None
+    
     def handle_setoption(self, args: List[str]) -> str:
-        """Handle setoption command"""
-        if len(args) < 4 or args[0] != "name" or args[2] != "value":
+        """Handle setoption command (setoption name <id> [value <x>])"""
+        if len(args) < 2 or args[0] != "name":
             return "Error: Invalid setoption command"
         
-        option_name = args[1]
-        option_value = args[3]
+        # Option names may contain spaces ("Clear Hash")
+        if "value" in args:
+            value_index = args.index("value")
+            option_name = " ".join(args[1:value_index])
+            option_value = " ".join(args[value_index + 1:])
+        else:
+            option_name = " ".join(args[1:])
+            option_value = None
         
         if option_name in self.options:
-            if self.options[option_name]["type"] == "spin":
+            if self.options[option_name]["type"] == "button":
+                if option_name == "Clear Hash":
+                    self.stop_search()
+                    self.engine.transposition_table.clear()
+            elif option_value is None:
+                return f"Error: Missing value for {option_name}"
+            elif self.options[option_name]["type"] == "spin":
                 try:
                     value = int(option_value)
                     if self.options[option_name]["min"] <= value <= self.options[option_name]["max"]:
@@ -237,6 +325,14 @@ class UCIInterface:
                             self.search_depth = value
                         elif option_name == "Time":
                             self.search_time = value
+                        elif option_name == "Hash":
+                            self.stop_search()
+                            self.engine.set_hash_size(value)
+                        elif option_name == "Threads":
+                            self.stop_search()
+                            self.engine.set_threads(value)
+                    else:
+                        return f"Error: Invalid value for {option_name}"
                             
                 except ValueError:
                     return f"Error: Invalid value for {option_name}"
@@ -246,12 +342,40 @@ class UCIInterface:
                 else:
                     return f"Error: Invalid value for {option_name}"
             else:
-                self.options[option_name]["value"] = option_value
+                self.options[option_name]["value"] = option_value if option_value != "<empty>" else ""
+            
+            if option_name in ("OwnBook", "BookFile"):
+                return self._update_book()
+            if option_name == "EndgameTables":
+                return self._update_endgame_tables()
         else:
             return f"Error: Unknown option {option_name}"
         
         return None
     
+    def _update_book(self) -> Optional[str]:
+        """Open BookFile as the engine's Polyglot book while OwnBook is enabled"""
+        self.stop_search()
+        path = self.options["BookFile"]["value"]
+        try:
+            if self.options["OwnBook"]["value"] == "true" and path:
+                self.engine.open_opening_book(path)
+            else:
+                self.engine.open_opening_book(None)
+        except OSError as e:
+            return f"Error: Cannot open book {path}: {e}"
+        return None
+    
+    def _update_endgame_tables(self) -> Optional[str]:
+        """Open the EndgameTables directory as the engine's endgame tables"""
+        self.stop_search()
+        path = self.options["EndgameTables"]["value"]
+        try:
+            self.engine.open_endgame_tables(path or None)
+        except (OSError, ValueError) as e:
+            return f"Error: Cannot open endgame tables {path}: {e}"
+        return None
+    
     def handle_debug(self, args: List[str]) -> str:
         """Handle debug command"""
         # TODO: Implement debug mode
@@ -262,34 +386,100 @@ class UCIInterface:
         # TODO: Implement registration
         return None
     
-    def _parse_move(self, move_str: str):
-        """Parse UCI move string"""
-        # TODO: Implement UCI move parsing
-        # Convert from UCI format (e.g., "e2e4") to internal Move object
+    def handle_bench(self, args: List[str]) -> str:
+        """
+        Handle bench command: "bench [depth N] [nodes N]"
+        
+        Searches the bench positions with a separate engine (the game's
+        tables are kept) and answers with the node count, signature and
+        speed; see bench.run_bench.
+        """
+        from ..bench import run_bench, format_bench
+        
+        self.stop_search()
+        limits = {"depth": None, "nodes": None}
+        for name, value in zip(args[::2], args[1::2]):
+            if name in limits:
+                limits[name] = int(value)
+        
+        result = run_bench(depth=limits["depth"], nodes=limits["nodes"])
+        return "\n".join(format_bench(result))
+    
+    def _parse_move(self, move_str: str) -> Optional[Move]:
+        """
+        Parse UCI move string
+        
+        Args:
+            move_str: Move in UCI format (e.g. "e2e4", "e7e8q")
+            
+        Returns:
+            Matching legal move in the current position, None if illegal
+        """
+        move_str = move_str.lower()
+        generator = MoveGenerator(self.board)
+        for move in generator.generate_legal_moves(self.board.current_player):
+            if self._format_move(move) == move_str:
+                return move
         return None
     
-    def _start_search(self, search_time: float, search_depth: int, infinite: bool):
-        """Start search and return best move"""
+    def _start_search(self, search_time: Optional[float], search_depth: int, infinite: bool,
+                      clock: Optional[ClockState] = None, ponder: bool = False,
+                      nodes: Optional[int] = None):
+        """Start a search on the worker thread (bestmove is sent when it finishes)"""
+        self.stop_search()
+        
         # Set engine parameters
         self.engine.max_depth = search_depth
-        self.engine.time_limit = search_time
+        self.engine.time_limit = None if infinite else search_time
         
-        # Start search
-        start_time = time.time()
-        best_move, score = self.engine.search(self.board)
-        search_time_used = time.time() - start_time
+        self.hold_bestmove = infinite or ponder
+        self.ponderhit_received = False
+        self.release_bestmove.clear()
+        
+        # The worker searches its own copy; the GUI may send a new position
+        # before the search has been stopped
+        board = self.board.copy()
+        self.search_thread = threading.Thread(
+            target=self._search_worker, args=(board, clock, ponder, nodes), daemon=True
+        )
+        self.search_thread.start()
+    
+    def _search_worker(self, board: ChessBoard, clock: Optional[ClockState], ponder: bool,
+                       nodes: Optional[int] = None):
+        """Run the search and report the best move"""
+        result = self.engine.search(board, clock=clock, ponder=ponder, nodes=nodes)
+        best_move = result.move
+        
+        # UCI forbids bestmove before stop/ponderhit in infinite and ponder mode
+        if self.hold_bestmove:
+            self.release_bestmove.wait()
         
-        # Send best move
         if best_move:
-            move_str = self._format_move(best_move)
-            print(f"bestmove {move_str}")
+            response = f"bestmove {self._format_move(best_move)}"
+            if len(result.pv) > 1:
+                response += f" ponder {self._format_move(result.pv[1])}"
+            self._send(response)
         else:
-            print("bestmove 0000")  # No legal moves
+            self._send("bestmove 0000")  # No legal moves
+    
+    def _send_info(self, info: Dict[str, Any]):
+        """Send the info line of a completed iteration"""
+        # A ponderhit may arrive before the worker started the clock
+        if self.ponderhit_received:
+            self.engine.time_manager.ponderhit()
         
-        sys.stdout.flush()
+        mate = mate_in(info['score'])
+        score = f"mate {mate}" if mate is not None else f"cp {info['score']}"
+        pv = " ".join(self._format_move(move) for move in info['pv'])
+        self._send(
+            f"info depth {info['depth']} seldepth {info['seldepth']} score {score} "
+            f"nodes {info['nodes']} nps {info['nps']} time {int(info['time'] * 1000)} "
+            f"hashfull {info['hashfull']} pv {pv}".rstrip()
+        )
     
-    def _format_move(self, move) -> str:
-        """Format move as UCI string"""
-        # TODO: Implement move formatting
-        # Convert internal Move object to UCI format (e.g., "e2e4")
-        return "e2e4"  # Placeholder
\ No newline at end of file
+    def _format_move(self, move: Move) -> str:
+        """Format move as UCI string (e.g. "e2e4", "e7e8q")"""
+        move_str = str(move)
+        if move.promotion:
+            move_str += PROMOTION_LETTERS[move.promotion]
+        return move_str
\ No newline at end of file
@@ -16,28 +16,55 @@ from datetime import datetime
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'chess_engine'))
 
 from chess_engine.board.board import ChessBoard, Color, PieceType
-from chess_engine.board.move_generator import MoveGenerator
-from chess_engine.search.minimax import MinimaxEngine
+from chess_engine.search.minimax import MinimaxEngine, PVLine
+from chess_engine.search.transposition import mate_in
 from chess_engine.eval.evaluation import EvaluationEngine
+from chess_engine.book.polyglot import PolyglotBook
 
 from ..models.chess_models import (
     AnalysisResult, BestMoveResponse, PositionEvaluation,
     EvaluationBreakdown, MoveVariation, Difficulty
 )
+from .chess_service import BOOK_FILE_ENV
+
+# Environment variable naming the on-disk transposition table file
+TT_FILE_ENV = "CHESS_ENGINE_TT_FILE"
+# Environment variable setting the worker processes of best move searches
+WORKERS_ENV = "CHESS_ENGINE_ANALYSIS_WORKERS"
 
 class AnalysisService:
     """Advanced chess analysis service"""
     
-    def __init__(self):
-        """Initialize analysis service"""
+    def __init__(self, tt_file: Optional[str] = None, workers: Optional[int] = None,
+                 book_file: Optional[str] = None):
+        """
+        Initialize analysis service
+        
+        Args:
+            tt_file: On-disk transposition table of deep results shared by all
+                     analyses (defaults to $CHESS_ENGINE_TT_FILE); new results
+                     are journaled and merged by ``main.py compact-tt``
+            workers: Processes that score the root moves of best move requests
+                     in parallel (defaults to $CHESS_ENGINE_ANALYSIS_WORKERS,
+                     else 1: a serial MultiPV search)
+            book_file: Polyglot opening book answering best move requests in
+                       book positions (defaults to $CHESS_ENGINE_BOOK_FILE)
+        """
         self.engine = MinimaxEngine(max_depth=6, time_limit=10.0)
+        self.workers = max(1, workers or int(os.environ.get(WORKERS_ENV, "1")))
+        tt_file = tt_file or os.environ.get(TT_FILE_ENV)
+        if tt_file:
+            self.engine.open_persistent_table(tt_file)
+        book_file = book_file or os.environ.get(BOOK_FILE_ENV)
+        self.opening_book = PolyglotBook(book_file) if book_file else None
         self.evaluator = EvaluationEngine()
         self.analysis_cache = {}
         self.stats = {
             "analyses_performed": 0,
             "total_analysis_time": 0.0,
             "average_depth": 0.0,
-            "cache_hits": 0
+            "cache_hits": 0,
+            "persistent_table_hits": 0
         }
     
     async def analyze_position(
@@ -65,19 +92,19 @@ class AnalysisService:
             self.engine.max_depth = depth
             self.engine.time_limit = time_limit
             
-            # Get best move and evaluation
-            best_move, score = self.engine.search(board)
+            # One MultiPV search gives the best move, the top 3 moves and their lines
+            lines = self._search_lines(board, multipv=3, depth=depth)
             
             # Get detailed evaluation
             evaluation = await self._get_detailed_evaluation(board, fen)
             
             # Get best moves (top 3)
-            best_moves = await self._get_best_moves(board, depth=depth, count=3)
+            best_moves = self._lines_to_moves(lines)
             
             # Get variations if requested
             variations = []
             if include_variations:
-                variations = await self._get_variations(board, depth=depth)
+                variations = self._lines_to_variations(lines)
             
             # Find tactical motifs
             tactical_motifs = await self._find_tactical_motifs(board)
@@ -96,7 +123,7 @@ class AnalysisService:
                 tactical_motifs=tactical_motifs,
                 opening_info=opening_info,
                 analysis_time=analysis_time,
-                nodes_searched=1000  # Simplified
+                nodes_searched=self.engine.get_search_stats()['nodes_searched']
             )
             
             # Cache result
@@ -111,7 +138,7 @@ class AnalysisService:
             )
             
             return result
-            
+        
         except Exception as e:
             # Return error result
             return AnalysisResult(
@@ -141,10 +168,15 @@ class AnalysisService:
             self.engine.max_depth = min(depth, engine_settings["max_depth"])
             self.engine.time_limit = engine_settings["time_limit"]
             
-            # Get best move
-            best_move, score = self.engine.search(board)
+            # Book positions are answered without searching
+            book_moves = self.opening_book.get_moves(board) if self.opening_book else []
+            if book_moves:
+                return self._book_move_response(book_moves)
+            
+            # Best move and alternatives from one MultiPV search
+            lines = self._best_move_lines(board, multipv=4)
             
-            if not best_move:
+            if not lines:
                 return BestMoveResponse(
                     move="",
                     san="",
@@ -154,8 +186,8 @@ class AnalysisService:
                     alternatives=[]
                 )
             
-            # Get alternative moves
-            alternatives = await self._get_alternative_moves(board, best_move, count=3)
+            best_move, score = lines[0].move, lines[0].score
+            alternatives = self._lines_to_moves(lines[1:])
             
             # Generate explanation
             explanation = await self._explain_move(board, best_move, score)
@@ -175,7 +207,7 @@ class AnalysisService:
                 alternatives=alternatives,
                 tactical_theme=tactical_theme
             )
-            
+        
         except Exception as e:
             return BestMoveResponse(
                 move="",
@@ -208,20 +240,13 @@ class AnalysisService:
             if detailed:
                 breakdown = await self._get_evaluation_breakdown(board)
             
-            # Check for mate
-            mate_in = None
-            if abs(score) > 9000:
-                mate_in = int((10000 - abs(score)) / 2)
-                if score < 0:
-                    mate_in = -mate_in
-            
             return PositionEvaluation(
                 score=score,
-                mate_in=mate_in,
+                mate_in=mate_in(score),
                 evaluation=evaluation_desc,
                 breakdown=breakdown
             )
-            
+        
         except Exception as e:
             return PositionEvaluation(
                 score=0.0,
@@ -229,6 +254,63 @@ class AnalysisService:
             )
     
     # Helper methods will be added in the next part
+    def _search_lines(self, board: ChessBoard, multipv: int,
+                      depth: Optional[int] = None) -> List[PVLine]:
+        """
+        MultiPV search backed by the on-disk transposition table
+        
+        The table file is remapped if a compaction replaced it, and the
+        deep results of the search are journaled for the next compaction.
+        """
+        persistent_table = self.engine.persistent_table
+        if persistent_table is not None:
+            persistent_table.refresh()
+        
+        lines = self.engine.search_multipv(board, multipv=multipv, depth=depth)
+        
+        if persistent_table is not None:
+            self.stats["persistent_table_hits"] += self.engine.get_search_stats()['persistent_hits']
+            self.engine.save_deep_results()
+        return lines
+    
+    def _best_move_lines(self, board: ChessBoard, multipv: int) -> List[PVLine]:
+        """
+        Best moves with exact scores, searched in parallel if workers > 1
+        
+        The root-split search scores the root moves on a process pool, so
+        the alternatives get exact scores in about the wall time of one
+        line; its lines hold the move only, which is all a best move
+        response needs.
+        """
+        if self.workers <= 1:
+            return self._search_lines(board, multipv=multipv)
+        
+        results = self.engine.score_root_moves(board, multipv=multipv, processes=self.workers)
+        return [PVLine(result.score, result.depth, [result.move]) for result in results[:multipv]]
+    
+    def _book_move_response(self, book_moves: List[Tuple[Any, int]]) -> BestMoveResponse:
+        """Best move response from the book moves of a position (highest weight first)"""
+        
+        total_weight = sum(weight for _, weight in book_moves)
+        best_move, best_weight = book_moves[0]
+        return BestMoveResponse(
+            move=self._move_to_uci(best_move),
+            san=self._move_to_san(best_move),
+            evaluation=0.0,
+            confidence=best_weight / total_weight,
+            explanation="Opening book move",
+            alternatives=[
+                {
+                    "move": self._move_to_uci(move),
+                    "san": self._move_to_san(move),
+                    "evaluation": 0.0,
+                    "depth": 0,
+                    "confidence": weight / total_weight
+                }
+                for move, weight in book_moves[1:]
+            ]
+        )
+    
     def _move_to_uci(self, move) -> str:
         """Convert move to UCI notation"""
         if not move:
@@ -312,50 +394,32 @@ class AnalysisService:
             total=total_score
         )
     
-    async def _get_best_moves(self, board: ChessBoard, depth: int = 4, count: int = 3) -> List[Dict[str, Any]]:
-        """Get top best moves"""
-        
-        move_gen = MoveGenerator(board)
-        legal_moves = move_gen.generate_legal_moves(board.current_player)
-        
-        move_evaluations = []
-        
-        for move in legal_moves[:10]:  # Limit to first 10 moves for performance
-            temp_board = board.copy()
-            temp_board.make_move(move)
-            
-            # Quick evaluation
-            score = self.evaluator.evaluate(temp_board, board.current_player)
-            
-            move_evaluations.append({
-                "move": self._move_to_uci(move),
-                "san": self._move_to_san(move),
-                "evaluation": score,
+    def _lines_to_moves(self, lines: List[PVLine]) -> List[Dict[str, Any]]:
+        """Convert MultiPV lines to best move entries"""
+        
+        return [
+            {
+                "move": self._move_to_uci(line.move),
+                "san": self._move_to_san(line.move),
+                "evaluation": line.score,
+                "depth": line.depth,
                 "confidence": 0.8  # Simplified
-            })
-        
-        # Sort by evaluation and return top moves
-        move_evaluations.sort(key=lambda x: x["evaluation"], reverse=True)
-        return move_evaluations[:count]
+            }
+            for line in lines
+        ]
     
-    async def _get_variations(self, board: ChessBoard, depth: int = 4) -> List[MoveVariation]:
-        """Get move variations"""
-        
-        variations = []
-        
-        # Get top 3 moves and create simple variations
-        best_moves = await self._get_best_moves(board, depth, 3)
-        
-        for i, move_data in enumerate(best_moves):
-            variation = MoveVariation(
-                moves=[move_data["move"]],
-                evaluation=move_data["evaluation"],
-                depth=1,  # Simplified
-                description=f"Line {i+1}: {move_data['san']}"
+    def _lines_to_variations(self, lines: List[PVLine]) -> List[MoveVariation]:
+        """Convert MultiPV lines to variations with their full principal variations"""
+        
+        return [
+            MoveVariation(
+                moves=[self._move_to_uci(move) for move in line.pv],
+                evaluation=line.score,
+                depth=line.depth,
+                description=f"Line {i+1}: {self._move_to_san(line.move)}"
             )
-            variations.append(variation)
-        
-        return variations
+            for i, line in enumerate(lines)
+        ]
     
     async def _find_tactical_motifs(self, board: ChessBoard) -> List[str]:
         """Find tactical motifs in position"""
@@ -377,6 +441,15 @@ class AnalysisService:
     async def _get_opening_info(self, board: ChessBoard) -> Optional[Dict[str, str]]:
         """Get opening information"""
         
+        if self.opening_book is not None:
+            book_moves = self.opening_book.get_moves(board)
+            if book_moves:
+                return {
+                    "name": "Book position",
+                    "eco": "",
+                    "description": f"{len(book_moves)} book moves, main line {self._move_to_uci(book_moves[0][0])}"
+                }
+        
         # Simplified opening detection
         if board.fullmove_number <= 10:
             return {
@@ -387,20 +460,6 @@ class AnalysisService:
         
         return None
     
-    async def _get_alternative_moves(self, board: ChessBoard, best_move, count: int = 3) -> List[Dict[str, Any]]:
-        """Get alternative moves to the best move"""
-        
-        best_moves = await self._get_best_moves(board, count=count + 1)
-        
-        # Filter out the best move
-        best_move_uci = self._move_to_uci(best_move)
-        alternatives = [
-            move for move in best_moves 
-            if move["move"] != best_move_uci
-        ]
-        
-        return alternatives[:count]
-    
     async def _explain_move(self, board: ChessBoard, move, score: float) -> str:
         """Generate explanation for a move"""
         
@@ -20,6 +20,7 @@ try:
     from chess_engine.board.move_generator import MoveGenerator
     from chess_engine.search.minimax import MinimaxEngine
     from chess_engine.eval.evaluation import EvaluationEngine
+    from chess_engine.book.polyglot import PolyglotBook
 except ImportError:
     # Fallback if chess engine is not available
     print("Warning: Chess engine not found, using mock implementations")
@@ -29,17 +30,28 @@ except ImportError:
     MoveGenerator = None
     MinimaxEngine = None
     EvaluationEngine = None
+    PolyglotBook = None
 
 from ..models.chess_models import (
     GameState, GameMode, Difficulty, PieceColor, GameStatus,
     MoveInfo, EngineInfo, EngineSettings
 )
 
+# Environment variable naming the Polyglot opening book file
+BOOK_FILE_ENV = "CHESS_ENGINE_BOOK_FILE"
+
 class ChessService:
     """Chess game service with AI engine integration"""
     
-    def __init__(self):
-        """Initialize chess service"""
+    def __init__(self, book_file: Optional[str] = None):
+        """
+        Initialize chess service
+        
+        Args:
+            book_file: Polyglot opening book shared by the AI engines of all
+                       games whose difficulty uses it (defaults to
+                       $CHESS_ENGINE_BOOK_FILE)
+        """
         self.games: Dict[str, Any] = {}
         self.engines: Dict[str, Any] = {}
         self.evaluators: Dict[str, Any] = {}
@@ -54,12 +66,18 @@ class ChessService:
             "randomness": 0.1
         }
         
+        # Opening book consulted by the engines before searching
+        self.opening_book = None
+        book_file = book_file or os.environ.get(BOOK_FILE_ENV)
+        if book_file and PolyglotBook:
+            self.opening_book = PolyglotBook(book_file)
+        
         # Initialize engine if available
         if MinimaxEngine:
             self.default_engine = MinimaxEngine(max_depth=4, time_limit=5.0)
         else:
             self.default_engine = None
-            
+        
         if EvaluationEngine:
             self.default_evaluator = EvaluationEngine()
         else:
@@ -96,6 +114,8 @@ class ChessService:
                     max_depth=engine_settings["depth"],
                     time_limit=engine_settings["time_limit"]
                 )
+                if engine_settings.get("use_opening_book") and self.opening_book is not None:
+                    engine.opening_book = self.opening_book
                 self.engines[game_id] = engine
             
             # Create evaluator
@@ -159,7 +179,7 @@ class ChessService:
                 "move_info": move_info,
                 "game_state": game_state
             }
-            
+        
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -180,11 +200,14 @@ class ChessService:
             
             # Get best move from engine (mock if not available)
             if engine and hasattr(engine, 'search'):
-                best_move, score = engine.search(board)
+                result = engine.search(board)
+                best_move, score = result
+                principal_variation = [str(move) for move in result.pv]
             else:
                 # Mock AI move
                 best_move = self._get_mock_move()
                 score = 0.5
+                principal_variation = []
             
             thinking_time = time.time() - start_time
             
@@ -213,9 +236,10 @@ class ChessService:
                 "move_info": move_info,
                 "game_state": game_state,
                 "thinking_time": thinking_time,
-                "evaluation": score
+                "evaluation": score,
+                "principal_variation": principal_variation
             }
-            
+        
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -252,7 +276,7 @@ class ChessService:
                 "success": True,
                 "game_state": game_state
             }
-            
+        
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -276,7 +300,7 @@ class ChessService:
                 },
                 "depth": depth
             }
-            
+        
         except Exception as e:
             return {"error": str(e)}
     
@@ -316,7 +340,7 @@ class ChessService:
                     engine.time_limit = settings.time_limit
             
             return {"success": True, "settings": settings.dict()}
-            
+        
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -356,13 +380,13 @@ class ChessService:
         
         if not difficulty:
             return self.default_settings
-            
+        
         settings_map = {
-            Difficulty.BEGINNER: {"depth": 2, "time_limit": 1.0, "randomness": 0.3},
-            Difficulty.EASY: {"depth": 3, "time_limit": 2.0, "randomness": 0.2},
-            Difficulty.MEDIUM: {"depth": 4, "time_limit": 5.0, "randomness": 0.1},
-            Difficulty.HARD: {"depth": 5, "time_limit": 8.0, "randomness": 0.05},
-            Difficulty.EXPERT: {"depth": 6, "time_limit": 15.0, "randomness": 0.0}
+            Difficulty.BEGINNER: {"depth": 2, "time_limit": 1.0, "randomness": 0.3, "use_opening_book": True},
+            Difficulty.EASY: {"depth": 3, "time_limit": 2.0, "randomness": 0.2, "use_opening_book": True},
+            Difficulty.MEDIUM: {"depth": 4, "time_limit": 5.0, "randomness": 0.1, "use_opening_book": True},
+            Difficulty.HARD: {"depth": 5, "time_limit": 8.0, "randomness": 0.05, "use_opening_book": True},
+            Difficulty.EXPERT: {"depth": 6, "time_limit": 15.0, "randomness": 0.0, "use_opening_book": True}
         }
         
         return settings_map.get(difficulty, self.default_settings)
\ No newline at end of file
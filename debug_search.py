@@ -35,7 +35,7 @@ def debug_search():
             print("\nDebugging search process...")
             
             # Test minimax directly
-            result = engine._minimax(board, 2, float('-inf'), float('inf'), Color.WHITE, 0)
+            result = engine._minimax(board, 2, float('-inf'), float('inf'), Color.WHITE)
             print(f"Direct minimax result: {result}")
             
     except Exception as e:
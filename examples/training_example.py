@@ -14,6 +14,7 @@ from chess_engine.train.tuner import WeightTuner
 from chess_engine.train.dataset import ChessDataset
 from chess_engine.train.trainer import NeuralTrainer
 from chess_engine.eval.evaluation import EvaluationEngine
+from chess_engine.eval.features import FEATURE_NAMES
 
 def example_weight_tuning():
     """Example: Weight tuning using genetic algorithm"""
@@ -76,7 +77,7 @@ def example_neural_training():
     print("=== Neural Network Training Example ===")
     
     # Initialize trainer
-    trainer = NeuralTrainer(input_size=64, hidden_sizes=[128, 64])
+    trainer = NeuralTrainer(input_size=len(FEATURE_NAMES), hidden_sizes=[128, 64])
     
     print("Neural trainer initialized:")
     model_info = trainer.get_model_info()
@@ -96,7 +97,7 @@ def example_neural_training():
     
     # Show training structure
     print("Training structure:")
-    print("- Input: 64 features (8x8 board representation)")
+    print(f"- Input: {len(FEATURE_NAMES)} features (the evaluation terms)")
     print("- Hidden layers: [128, 64] neurons")
     print("- Output: 1 value (position evaluation)")
     print("- Loss function: MSE (Mean Squared Error)")
@@ -2,7 +2,7 @@
 Chess Engine - Main entry point
 
 This is the main entry point for the chess engine with CLI interface.
-Supports multiple modes: engine play, training, tuning, and UCI interface.
+Supports multiple modes: engine play, training, tuning, UCI interface and bench.
 """
 
 import argparse
@@ -26,13 +26,18 @@ def main():
     parser = argparse.ArgumentParser(description="Chess Engine - A modular chess engine with training capabilities")
     
     # Main mode selection
-    parser.add_argument("mode", choices=["play", "uci", "train", "tune", "test"], 
+    parser.add_argument("mode", choices=["play", "uci", "train", "tune", "test", "compact-tt", "bench", "book",
+                                         "endgame-tables"], 
                        help="Mode to run the engine in")
     
     # Common options
-    parser.add_argument("--depth", type=int, default=4, help="Search depth")
+    parser.add_argument("--depth", type=int, default=None, help="Search depth (play: 4, bench: unlimited)")
+    parser.add_argument("--nodes", type=int, default=None, help="Node limit per bench position")
     parser.add_argument("--time", type=float, default=5.0, help="Time limit per move (seconds)")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
+    parser.add_argument("--profile", metavar="FILE", default=None,
+                        help="Sample searches (play, uci, bench) and write collapsed stacks to FILE "
+                             "and a per-module summary to FILE.summary.txt")
     
     # Training options
     parser.add_argument("--data-dir", default="data", help="Directory containing training data")
@@ -43,18 +48,71 @@ def main():
     parser.add_argument("--generations", type=int, default=100, help="Number of generations for tuning")
     parser.add_argument("--population-size", type=int, default=50, help="Population size for genetic algorithm")
     
+    # Persistent transposition table options
+    parser.add_argument("--tt-file", default="data/analysis.tt", help="On-disk transposition table file")
+    parser.add_argument("--min-depth", type=int, default=4, help="Minimum depth of entries kept on disk")
+    
+    # Opening book options
+    parser.add_argument("--pgn", nargs="+", default=None,
+                        help="PGN files for the opening book (default: all .pgn files in --data-dir)")
+    parser.add_argument("--book-file", default="data/book.bin", help="Opening book file to write")
+    parser.add_argument("--book-ply", type=int, default=20, help="Half-moves per game counted in the book")
+    parser.add_argument("--min-games", type=int, default=3, help="Minimum games a book move was played in")
+    parser.add_argument("--workers", type=int, default=None, help="Book builder processes (default: CPU count)")
+    
+    # Endgame table options
+    parser.add_argument("--tables-dir", default="data/endgame", help="Directory of endgame table files")
+    parser.add_argument("--materials", nargs="+", default=None,
+                        help="Endgames to generate, e.g. KQK KBNK (default: all supported)")
+    
     args = parser.parse_args()
     
-    if args.mode == "play":
-        play_mode(args)
-    elif args.mode == "uci":
-        uci_mode(args)
-    elif args.mode == "train":
-        train_mode(args)
-    elif args.mode == "tune":
-        tune_mode(args)
-    elif args.mode == "test":
-        test_mode(args)
+    profiler = None
+    if args.profile:
+        if args.mode not in ("play", "uci", "bench"):
+            parser.error("--profile is only supported in play, uci and bench modes")
+        from chess_engine.bench.profiler import StackSampler
+        profiler = StackSampler()
+        profiler.start()
+    
+    try:
+        if args.mode == "play":
+            play_mode(args)
+        elif args.mode == "uci":
+            uci_mode(args)
+        elif args.mode == "train":
+            train_mode(args)
+        elif args.mode == "tune":
+            tune_mode(args)
+        elif args.mode == "test":
+            test_mode(args)
+        elif args.mode == "compact-tt":
+            compact_tt_mode(args)
+        elif args.mode == "bench":
+            bench_mode(args)
+        elif args.mode == "book":
+            book_mode(args)
+        elif args.mode == "endgame-tables":
+            endgame_tables_mode(args)
+    finally:
+        if profiler is not None:
+            save_profile(profiler, args.profile, echo=args.mode != "uci")
+
+def save_profile(profiler, path: str, echo: bool = True):
+    """
+    Stop the profiler and write its collapsed stacks and summary
+    
+    Args:
+        profiler: Running StackSampler
+        path: Collapsed-stack output file
+        echo: Also print the summary (UCI mode keeps stdout for the protocol)
+    """
+    profiler.stop()
+    summary_path = profiler.save(path)
+    if echo:
+        for line in profiler.format_summary():
+            print(line)
+    print(f"Profile written to {path} (summary: {summary_path})", file=sys.stderr)
 
 def play_mode(args):
     """Interactive play mode"""
@@ -63,7 +121,7 @@ def play_mode(args):
     print()
     
     board = ChessBoard()
-    engine = MinimaxEngine(max_depth=args.depth, time_limit=args.time)
+    engine = MinimaxEngine(max_depth=args.depth if args.depth is not None else 4, time_limit=args.time)
     evaluator = EvaluationEngine()
     
     while True:
@@ -105,7 +163,8 @@ def play_mode(args):
             print("Engine is thinking...")
             best_move, score = engine.search(board)
             if best_move:
-                print(f"Engine plays: {best_move}")
+                stats = engine.get_search_stats()
+                print(f"Engine plays: {best_move} (score: {score}, nodes: {stats['nodes_searched']})")
                 board.make_move(best_move)
             else:
                 print("Engine has no legal moves!")
@@ -221,6 +280,88 @@ def test_mode(args):
     
     print("\nAll basic tests passed!")
 
+def compact_tt_mode(args):
+    """Merge journaled deep search results into the on-disk transposition table"""
+    from chess_engine.search.persistent_tt import compact_table
+    
+    print("Chess Engine - Transposition Table Compaction")
+    print(f"Table file: {args.tt_file}")
+    print(f"Minimum depth: {args.min_depth}")
+    
+    directory = os.path.dirname(args.tt_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    result = compact_table(args.tt_file, min_depth=args.min_depth)
+    print(f"Merged {result['merged']} journal entries")
+    print(f"Table entries: {result['previous_size']} -> {result['size']}")
+
+def bench_mode(args):
+    """Search the bench positions and print node count, signature and speed"""
+    from chess_engine.bench import run_bench, format_bench, BENCH_FENS
+    from chess_engine.bench.search_bench import format_position
+    
+    print("Chess Engine - Bench")
+    
+    def report(index, position):
+        if args.verbose:
+            print(format_position(index, position, len(BENCH_FENS)))
+    
+    result = run_bench(depth=args.depth, nodes=args.nodes, report=report)
+    for line in format_bench(result):
+        print(line)
+
+def book_mode(args):
+    """Build a Polyglot opening book from PGN files"""
+    from chess_engine.book.builder import build_book
+    
+    print("Chess Engine - Opening Book Builder")
+    pgn_files = args.pgn
+    if pgn_files is None:
+        if os.path.isdir(args.data_dir):
+            pgn_files = sorted(os.path.join(args.data_dir, f) for f in os.listdir(args.data_dir)
+                               if f.endswith('.pgn'))
+        else:
+            pgn_files = []
+    if not pgn_files:
+        print("No PGN files found (use --pgn or add .pgn files to the data directory)")
+        return
+    
+    print(f"PGN files: {len(pgn_files)}")
+    print(f"Book file: {args.book_file}")
+    print(f"Maximum ply: {args.book_ply}, minimum games: {args.min_games}")
+    
+    def report(games):
+        if args.verbose:
+            print(f"Counted {games} games")
+    
+    stats = build_book(pgn_files, args.book_file, max_ply=args.book_ply, min_games=args.min_games,
+                       processes=args.workers, report=report)
+    print(f"Games: {stats['games']} counted, {stats['skipped']} skipped")
+    print(f"Book: {stats['positions']} positions, {stats['entries']} moves")
+
+def endgame_tables_mode(args):
+    """Generate endgame tables by retrograde analysis"""
+    from chess_engine.endgame.generator import generate_tables, DEFAULT_MATERIALS
+    
+    print("Chess Engine - Endgame Table Generator")
+    materials = args.materials or DEFAULT_MATERIALS
+    print(f"Tables directory: {args.tables_dir}")
+    print(f"Endgames: {' '.join(materials)}")
+    
+    def report(material, ply):
+        if args.verbose:
+            print(f"{material}: ply {ply}")
+    
+    try:
+        results = generate_tables(args.tables_dir, materials, report=report)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    for material, stats in results.items():
+        print(f"{material}: {stats['positions']} positions, {stats['wins']} won, "
+              f"longest mate {stats['longest']} plies")
+
 def print_help():
     """Print help information"""
     print("Available commands:")
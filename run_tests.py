@@ -85,6 +85,36 @@ def run_specific_test(test_name):
     
     return len(result.failures) == 0 and len(result.errors) == 0
 
+def run_benchmarks(output=None, baseline=None, threshold=None, repeats=5):
+    """Run the micro-benchmarks and compare them against a baseline"""
+    from chess_engine.bench.micro import (
+        run_micro_benchmarks, save_results, load_results, compare_results,
+        format_comparison, BASELINE_PATH, DEFAULT_THRESHOLD
+    )
+    
+    print("Chess Engine - Micro-Benchmarks")
+    print("=" * 50)
+    
+    results = run_micro_benchmarks(repeats=repeats)
+    if output:
+        save_results(results, output)
+        print(f"Results written to {output}")
+    
+    baseline = baseline or BASELINE_PATH
+    if not os.path.exists(baseline):
+        print(f"No baseline at {baseline}")
+        return True
+    
+    comparison = compare_results(results, load_results(baseline),
+                                 DEFAULT_THRESHOLD if threshold is None else threshold)
+    for line in format_comparison(comparison):
+        print(line)
+    
+    regressions = [row['name'] for row in comparison if row['regression']]
+    if regressions:
+        print(f"\nRegressions: {', '.join(regressions)}")
+    return not regressions
+
 def main():
     """Main test runner"""
     import argparse
@@ -94,10 +124,19 @@ def main():
                        default="all", help="Specific test to run")
     parser.add_argument("--verbose", "-v", action="store_true", 
                        help="Verbose output")
+    parser.add_argument("--bench", action="store_true",
+                       help="Run the micro-benchmarks instead of the tests")
+    parser.add_argument("--bench-output", help="Write micro-benchmark results to this JSON file")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against (default: packaged baseline)")
+    parser.add_argument("--threshold", type=float,
+                       help="Allowed slowdown per benchmark before it fails (0.25 = 25%%)")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per benchmark")
     
     args = parser.parse_args()
     
-    if args.test == "all":
+    if args.bench:
+        success = run_benchmarks(args.bench_output, args.baseline, args.threshold, args.repeats)
+    elif args.test == "all":
         success = run_all_tests()
     else:
         success = run_specific_test(args.test)
@@ -57,6 +57,6 @@ setup(
     },
     include_package_data=True,
     package_data={
-        "chess_engine": ["eval/weights.json"],
+        "chess_engine": ["eval/weights.json", "bench/baseline.json"],
     },
 )
\ No newline at end of file